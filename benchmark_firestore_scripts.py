@@ -0,0 +1,151 @@
+import argparse
+import contextlib
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from firestore_backend import MemoryFirestore
+from firestore_rate_limiter import RateLimiter
+from change_log import ChangeLogWriter
+from toeic_course_uploader import create_test_questions, upload_to_firebase
+from update_all_video_urls import update_lesson_videos, update_question_videos
+from cleanup_lessons import delete_duplicate_lessons, move_vocabulary_to_collection
+from verify_firebase_data import display_courses, display_tests
+
+CATALOG_FILE = "remaining_courses_with_vocabulary.json"
+VOCABULARY_FILE = "vocabulary_data.json"
+TARGET_URL = "https://www.youtube.com/watch?v=kFYgLjdSkXE"
+
+def load_base_catalog(catalog_file=CATALOG_FILE, vocabulary_file=VOCABULARY_FILE):
+    """Courses in uploader form, with each lesson's words joined from the vocabulary file"""
+    with open(catalog_file, 'r', encoding='utf-8') as f:
+        catalog = json.load(f)
+    with open(vocabulary_file, 'r', encoding='utf-8') as f:
+        vocabulary = json.load(f)
+
+    words_by_lesson = {}
+    for word in vocabulary:
+        words_by_lesson.setdefault(word["lessonId"], []).append(
+            {"english": word["english"], "vietnamese": word["vietnamese"], "example": ""})
+
+    courses = []
+    for course_id, entry in catalog.items():
+        course = dict(entry["course_data"], courseId=course_id)
+        course["lessons"] = [dict(lesson, vocabulary=words_by_lesson.get(lesson_id, []))
+                             for lesson_id, lesson in entry["lessons"].items()]
+        courses.append(course)
+    return courses
+
+def copy_id(course_id, copy_index):
+    return course_id if copy_index == 0 else f"{course_id}_{copy_index}"
+
+def scale_catalog(base_courses, base_tests, scale):
+    """`scale` copies of the base courses and tests under distinct course IDs.
+
+    Copies share their word lists and questions, so generating the 1000x
+    catalog costs little more memory than the documents themselves.
+    """
+    courses = []
+    tests = []
+    for copy_index in range(scale):
+        for course in base_courses:
+            course_id = copy_id(course["courseId"], copy_index)
+            courses.append(dict(course, courseId=course_id,
+                                lessons=[dict(lesson, courseId=course_id) for lesson in course["lessons"]]))
+        for test in base_tests:
+            course_id = copy_id(test["courseId"], copy_index)
+            tests.append(dict(test, testId=f"{course_id}_test", courseId=course_id))
+    return courses, tests
+
+def fast_limiter():
+    # The in-memory backend has no quota, so pacing would only measure sleeps
+    return RateLimiter(initial_rate=10**9, max_rate=10**9)
+
+def run_stage(db, name, func, trace_memory):
+    before = db.stats()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    # Script progress output would dominate the timings at larger scales
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        func()
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    after = db.stats()
+    delta = {key: after[key] - before[key] for key in after}
+    return {"stage": name, "elapsed_sec": elapsed, "peak_bytes": peak, **delta}
+
+def run_scale(base_courses, base_tests, scale, trace_memory, log_dir):
+    courses, tests = scale_catalog(base_courses, base_tests, scale)
+    lessons = sum(len(course["lessons"]) for course in courses)
+    print(f"\n=== {scale}x: {len(courses)} courses, {lessons} lessons, {len(tests)} tests ===")
+    # Handed over to the upload stage, which drops them once they are written
+    catalog = {"courses": courses, "tests": tests}
+    del courses, tests
+
+    db = MemoryFirestore()
+    limiter = fast_limiter()
+    log_file = os.path.join(log_dir, f"video_url_changes_{scale}x.jsonl")
+
+    def upload():
+        upload_to_firebase(db, catalog.pop("courses"), catalog.pop("tests"))
+
+    def rewrite():
+        with ChangeLogWriter(log_file) as change_log:
+            update_lesson_videos(db, TARGET_URL, change_log, limiter)
+            update_question_videos(db, TARGET_URL, change_log, limiter)
+
+    def cleanup():
+        delete_duplicate_lessons(db, limiter)
+        move_vocabulary_to_collection(db, limiter)
+
+    def verify():
+        display_courses(db)
+        display_tests(db)
+
+    stages = [
+        ("upload", upload),
+        ("video-url rewrite", rewrite),
+        ("cleanup", cleanup),
+        ("verification", verify),
+    ]
+    results = [run_stage(db, name, func, trace_memory) for name, func in stages]
+    print_results(results)
+    return results
+
+def print_results(results):
+    print(f"{'stage':<20}{'wall (s)':>10}{'RPCs':>10}{'reads':>10}{'writes':>10}{'deletes':>10}{'peak MB':>10}")
+    for r in results:
+        peak = f"{r['peak_bytes'] / (1024 * 1024):.1f}" if r["peak_bytes"] is not None else "-"
+        print(f"{r['stage']:<20}{r['elapsed_sec']:>10.3f}{r['rpcs']:>10}{r['reads']:>10}"
+              f"{r['writes']:>10}{r['deletes']:>10}{peak:>10}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the upload, video-URL rewrite, cleanup and verification scripts against the "
+                    "in-memory Firestore and report wall time, RPC counts and peak memory")
+    parser.add_argument("--scales", default="10,100,1000",
+                        help="Comma-separated multiples of the base catalog to load (1000x needs several GB of RAM)")
+    parser.add_argument("--catalog", default=CATALOG_FILE, help="Base course catalog")
+    parser.add_argument("--vocabulary", default=VOCABULARY_FILE, help="Vocabulary joined into the catalog's lessons")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip tracemalloc, which slows the stages down, and report wall time only")
+    args = parser.parse_args()
+
+    base_courses = load_base_catalog(args.catalog, args.vocabulary)
+    base_tests = create_test_questions(base_courses, seed=0)
+    base_lessons = sum(len(course["lessons"]) for course in base_courses)
+    print(f"Base catalog: {len(base_courses)} courses, {base_lessons} lessons")
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        for scale in (int(s) for s in args.scales.split(",")):
+            run_scale(base_courses, base_tests, scale, not args.no_memory, log_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from toeic_course_uploader import iter_toeic_topics
+
+def write_synthetic_dataset(file_path, topics, words_per_topic, seed=0):
+    """Write a dataset in the TOEIC text format and return its line count"""
+    rng = random.Random(seed)
+    tags = ["(v)", "(n)", "(adj)"]
+    line_count = 0
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for t in range(topics):
+            f.write(f"TOPIC {t+1}: Synthetic topic {t+1}\n\n")
+            line_count += 2
+            for w in range(words_per_topic):
+                word = f"word{t}x{w}"
+                f.write(f"{word}\n")
+                f.write(f"{rng.choice(tags)} nghĩa của {word}\n")
+                f.write(f"Ex: This sentence uses {word} in context.\n\n")
+                line_count += 4
+    return line_count
+
+def count_lines(file_paths):
+    total = 0
+    for file_path in file_paths:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            total += sum(1 for _ in f)
+    return total
+
+def run_benchmark(file_paths, repeat):
+    lines = count_lines(file_paths)
+    size_mb = sum(os.path.getsize(p) for p in file_paths) / (1024 * 1024)
+
+    # Throughput: consume the generator without keeping any topics
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        topics = words = 0
+        for topic in iter_toeic_topics(file_paths):
+            topics += 1
+            words += len(topic["vocabulary"])
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Peak memory in a separate pass, since tracing slows parsing down
+    tracemalloc.start()
+    for _ in iter_toeic_topics(file_paths):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Input: {len(file_paths)} file(s), {lines} lines, {size_mb:.1f} MB")
+    print(f"Parsed {topics} topics with {words} words")
+    print(f"Best of {repeat}: {best:.3f}s ({lines / best:,.0f} lines/sec, {size_mb / best:.1f} MB/sec)")
+    print(f"Peak traced memory: {peak / 1024:.0f} KB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the parse rate of iter_toeic_topics")
+    parser.add_argument("datasets", nargs="*",
+                        help="Dataset files to parse (defaults to a generated synthetic dataset)")
+    parser.add_argument("--topics", type=int, default=200, help="Topics in the synthetic dataset")
+    parser.add_argument("--words", type=int, default=500, help="Words per topic in the synthetic dataset")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs")
+    args = parser.parse_args()
+
+    if args.datasets:
+        run_benchmark(args.datasets, args.repeat)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dataset_file = os.path.join(tmp_dir, "synthetic_dataset.txt")
+        print(f"Generating synthetic dataset ({args.topics} topics x {args.words} words)...")
+        write_synthetic_dataset(dataset_file, args.topics, args.words)
+        run_benchmark([dataset_file], args.repeat)
+
+if __name__ == "__main__":
+    main()
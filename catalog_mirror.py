@@ -0,0 +1,291 @@
+import argparse
+import os
+import queue
+import sqlite3
+import time
+from datetime import datetime, timezone
+from firestore_backend import connect
+from snapshot_cache import SnapshotCache, SCOPES, DEFAULT_CACHE_FILE, updated_at
+
+# Every cached scope: Courses, Tests and the Lessons, Vocabulary and QuestionChunks groups
+MIRROR_SCOPES = tuple(SCOPES)
+# Seconds between marking the mirrored scopes as synced for --cache-max-age readers
+DEFAULT_HEARTBEAT = 30.0
+
+def course_of(path, data=None):
+    """Course a document belongs to: from a Courses/{courseId}/... path, else its courseId field"""
+    parts = path.split("/")
+    if parts[0] == "Courses":
+        return parts[1]
+    return (data or {}).get("courseId")
+
+def lesson_of(path, data=None):
+    """Lesson a document belongs to: from a .../Lessons/{lessonId} path, else its lessonId field"""
+    parts = path.split("/")
+    for i in range(0, len(parts) - 1, 2):
+        if parts[i] == "Lessons":
+            return parts[i + 1]
+    return (data or {}).get("lessonId")
+
+def _lesson_courses(conn):
+    """{lesson_id: {course IDs}} from the cached Courses/*/Lessons/* documents"""
+    courses = {}
+    for (path,) in conn.execute("SELECT path FROM documents WHERE scope = 'Lessons'"):
+        parts = path.split("/")
+        if len(parts) == 4 and parts[0] == "Courses":
+            courses.setdefault(parts[3], set()).add(parts[1])
+    return courses
+
+def iter_changes(cache_path=DEFAULT_CACHE_FILE, after=0):
+    """Yield change feed entries with seq > after, oldest first.
+
+    Each entry is {"seq", "ts", "scope", "path", "change", "courseId",
+    "lessonId", "updateTime"}, with change one of "added", "modified" or
+    "removed". courseId is None for documents outside a course that no
+    course could be found for, e.g. Lessons/{lessonId}/Vocabulary, whose
+    lessonId may be shared by several courses. Consumers remember the last
+    seq they handled and pass it next time.
+    """
+    if not os.path.exists(cache_path):
+        return
+    conn = sqlite3.connect(f"file:{cache_path}?mode=ro", uri=True)
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(changes)")}
+        if not columns:
+            return
+        # Feeds written before lesson IDs were recorded have no lesson_id column
+        lesson_column = "lesson_id" if "lesson_id" in columns else "NULL"
+        rows = conn.execute(f"SELECT seq, ts, scope, path, change, course_id, {lesson_column}, update_time "
+                            "FROM changes WHERE seq > ? ORDER BY seq", (after,))
+        for seq, ts, scope, path, change, course_id, lesson_id, update_time in rows:
+            yield {"seq": seq, "ts": ts, "scope": scope, "path": path, "change": change,
+                   "courseId": course_id, "lessonId": lesson_id, "updateTime": update_time}
+    finally:
+        conn.close()
+
+def courses_changed_since(cache_path=DEFAULT_CACHE_FILE, after=0):
+    """(set of course IDs with changes after `after`, latest seq in the feed).
+
+    Entries without a course but with a lesson ID count for every cached
+    course that has a lesson with that ID.
+    """
+    courses = set()
+    lessons = set()
+    latest = after
+    for entry in iter_changes(cache_path, after):
+        if entry["courseId"]:
+            courses.add(entry["courseId"])
+        elif entry["lessonId"]:
+            lessons.add(entry["lessonId"])
+        latest = entry["seq"]
+    if lessons:
+        conn = sqlite3.connect(f"file:{cache_path}?mode=ro", uri=True)
+        try:
+            lesson_courses = _lesson_courses(conn)
+        finally:
+            conn.close()
+        for lesson_id in lessons:
+            courses |= lesson_courses.get(lesson_id, set())
+    return courses, latest
+
+class CatalogMirror:
+    """Keeps a SnapshotCache current from on_snapshot listeners and publishes a change feed.
+
+    Every scope gets one listener. Its first snapshot holds the whole scope
+    and is compared with the store, so changes made while the mirror was
+    down are picked up (Firestore bills that first load like a full read);
+    after it only changed documents are sent. Entries are decided against
+    the update time the feed last published for each document, not the
+    cached copy, which readers' syncs update too. Callbacks run on
+    Firestore's listener threads and only queue what they get; apply()
+    writes the documents and their feed entries in one SQLite transaction,
+    on the thread that owns the connection.
+    """
+
+    def __init__(self, db, path=DEFAULT_CACHE_FILE, scopes=MIRROR_SCOPES, verbose=True):
+        self.db = db
+        self.scopes = scopes
+        self.verbose = verbose
+        self.cache = SnapshotCache(db, path, verbose=False)
+        with self.cache.conn:
+            self.cache.conn.execute("CREATE TABLE IF NOT EXISTS changes ("
+                                    "seq INTEGER PRIMARY KEY AUTOINCREMENT, ts TEXT NOT NULL, scope TEXT NOT NULL, "
+                                    "path TEXT NOT NULL, change TEXT NOT NULL, course_id TEXT, update_time TEXT, "
+                                    "lesson_id TEXT)")
+            columns = {row[1] for row in self.cache.conn.execute("PRAGMA table_info(changes)")}
+            if "lesson_id" not in columns:
+                # Feeds written before lesson IDs were recorded
+                self.cache.conn.execute("ALTER TABLE changes ADD COLUMN lesson_id TEXT")
+            # What the feed last said about each document. Readers' syncs also
+            # write the documents table, so it can't tell what was published.
+            self.cache.conn.execute("CREATE TABLE IF NOT EXISTS published ("
+                                    "path TEXT PRIMARY KEY, scope TEXT NOT NULL, update_time TEXT, "
+                                    "course_id TEXT, lesson_id TEXT)")
+        self._queue = queue.Queue()
+        self._watches = {}
+        self._loaded = set()
+        self.changes_written = 0
+
+    def _owner(self, path, data):
+        """(course ID, lesson ID) of a document, looking at its cached parent when it has no course itself.
+
+        Question chunks get the course of their test. Root
+        Lessons/{lessonId}/... documents keep only the lesson ID: every
+        course with that lesson reads their vocabulary, and
+        courses_changed_since maps it back to those courses.
+        """
+        course_id = course_of(path, data)
+        parts = path.split("/")
+        if course_id is None and parts[0] != "Lessons" and len(parts) > 2:
+            parent = self.cache.get_cached("/".join(parts[:2]))
+            if parent.exists:
+                course_id = course_of(parent.reference.path, parent.to_dict())
+        return course_id, lesson_of(path, data)
+
+    def _published_paths(self, scope):
+        return {row[0] for row in self.cache.conn.execute("SELECT path FROM published WHERE scope = ?", (scope,))}
+
+    def _unpublish(self, path):
+        """(course ID, lesson ID) a removed document was published with, or None if it never was"""
+        row = self.cache.conn.execute("SELECT course_id, lesson_id FROM published WHERE path = ?",
+                                      (path,)).fetchone()
+        if row is not None:
+            self.cache.conn.execute("DELETE FROM published WHERE path = ?", (path,))
+        return row
+
+    def _listener(self, scope):
+        def on_snapshot(docs, changes, read_time):
+            self._queue.put((scope, docs, changes))
+        return on_snapshot
+
+    def _listen(self, scope):
+        self._loaded.discard(scope)
+        self._watches[scope] = self.cache.query(scope).on_snapshot(self._listener(scope))
+
+    def start(self):
+        for scope in self.scopes:
+            self._listen(scope)
+
+    def stop(self):
+        for watch in self._watches.values():
+            watch.unsubscribe()
+        self._watches = {}
+        self.apply(timeout=0)
+        self.cache.close()
+
+    def _apply_snapshot(self, scope, docs, changes, entries):
+        """Store one listener snapshot; append (scope, path, change, course, lesson, update time) entries"""
+        updates = []
+        if scope not in self._loaded:
+            # First snapshot: the whole scope, compared with what was published
+            self._loaded.add(scope)
+            present = {doc.reference.path for doc in docs}
+            for path in sorted(self._published_paths(scope) - present):
+                self.cache.remove(path)
+                entries.append((scope, path, "removed") + tuple(self._unpublish(path)) + (None,))
+            updates = docs
+        else:
+            for change in changes:
+                document = change.document
+                if change.type.name == "REMOVED":
+                    self.cache.remove(document.reference.path)
+                    owner = self._unpublish(document.reference.path)
+                    if owner is not None:
+                        entries.append((scope, document.reference.path, "removed") + tuple(owner) + (None,))
+                else:
+                    updates.append(document)
+
+        watermark = None
+        for document in updates:
+            path = document.reference.path
+            self.cache.store(scope, document)
+            stamp = updated_at(document)
+            if stamp is not None and (watermark is None or stamp > watermark):
+                watermark = stamp
+            update_time = document.update_time.isoformat() if document.update_time else None
+            row = self.cache.conn.execute("SELECT update_time FROM published WHERE path = ?", (path,)).fetchone()
+            if row is not None and row[0] == update_time and update_time is not None:
+                continue
+            owner = self._owner(path, document.to_dict())
+            self.cache.conn.execute("INSERT OR REPLACE INTO published (path, scope, update_time, course_id, lesson_id) "
+                                    "VALUES (?, ?, ?, ?, ?)", (path, scope, update_time) + owner)
+            entries.append((scope, path, "added" if row is None else "modified") + owner + (update_time,))
+        self.cache.mark_synced(scope, watermark)
+
+    def apply(self, timeout=None):
+        """Apply every queued listener snapshot, waiting up to `timeout` for the first; return the feed entries written"""
+        try:
+            batch = [self._queue.get(timeout=timeout) if timeout else self._queue.get_nowait()]
+        except queue.Empty:
+            return 0
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        entries = []
+        now = datetime.now(timezone.utc).isoformat()
+        with self.cache.conn:
+            for scope, docs, changes in batch:
+                self._apply_snapshot(scope, docs, changes, entries)
+            self.cache.conn.executemany(
+                "INSERT INTO changes (ts, scope, path, change, course_id, lesson_id, update_time) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(now,) + entry for entry in entries])
+        self.changes_written += len(entries)
+        if self.verbose and entries:
+            counts = {}
+            for entry in entries:
+                counts[entry[2]] = counts.get(entry[2], 0) + 1
+            print(f"{now}: " + ", ".join(f"{count} {kind}" for kind, count in sorted(counts.items())))
+        return len(entries)
+
+    def heartbeat(self):
+        """Mark loaded scopes as synced; restart listeners that stopped"""
+        with self.cache.conn:
+            for scope, watch in list(self._watches.items()):
+                if not getattr(watch, "is_active", True):
+                    print(f"Listener for {scope} stopped, restarting it")
+                    self._listen(scope)
+                elif scope in self._loaded:
+                    self.cache.mark_synced(scope)
+
+    def run(self, duration=None, heartbeat=DEFAULT_HEARTBEAT):
+        """Mirror until interrupted (or for `duration` seconds)"""
+        self.start()
+        started = time.monotonic()
+        last_beat = started
+        try:
+            while duration is None or time.monotonic() - started < duration:
+                self.apply(timeout=1.0)
+                if time.monotonic() - last_beat >= heartbeat:
+                    self.heartbeat()
+                    last_beat = time.monotonic()
+        except KeyboardInterrupt:
+            print("\nStopping mirror...")
+        finally:
+            self.stop()
+        print(f"Mirror stopped after {time.monotonic() - started:.0f}s, {self.changes_written} changes recorded")
+
+def main():
+    parser = argparse.ArgumentParser(description="Mirror the catalog into the local snapshot cache with listeners")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_FILE, help="Cache file the mirror keeps current")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument("--heartbeat", type=float, default=DEFAULT_HEARTBEAT,
+                        help="Seconds between marking the mirrored scopes as synced")
+    parser.add_argument("--changes-after", type=int, default=None, metavar="SEQ",
+                        help="Print the change feed after SEQ and exit instead of mirroring")
+    args = parser.parse_args()
+
+    if args.changes_after is not None:
+        for entry in iter_changes(args.cache, args.changes_after):
+            print(f"{entry['seq']}\t{entry['ts']}\t{entry['change']}\t{entry['path']}")
+        return
+
+    db = connect(["firebase_config.json", "scripts/firebase_config.json"])
+    print(f"Mirroring {', '.join(MIRROR_SCOPES)} into {args.cache} (Ctrl+C to stop)")
+    CatalogMirror(db, args.cache).run(args.duration, args.heartbeat)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
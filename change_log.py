@@ -0,0 +1,95 @@
+import atexit
+import gzip
+import json
+import threading
+import time
+from datetime import datetime, timezone
+
+def _open_log(path, mode):
+    # Logs ending in .gz are compressed transparently
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+class ChangeLogWriter:
+    """Buffered JSON Lines log of document field changes.
+
+    Each record holds the collection path, document ID, field path, old and
+    new value and a UTC timestamp. If the field did not exist before, the
+    record has "created": true instead of "old"; if the change removed the
+    field, it has "deleted": true instead of "new". Records are buffered and
+    written when `flush_every` records are queued or `flush_interval`
+    seconds have passed. Anything still buffered is written on close() or at
+    interpreter exit.
+    """
+
+    def __init__(self, path, flush_every=1000, flush_interval=5.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.records_written = 0
+
+        self._file = _open_log(path, "a")
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def record(self, collection_path, doc_id, field, old_value, new_value, created=False, deleted=False):
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "collection": collection_path,
+            "doc": doc_id,
+            "field": field,
+        }
+        if created:
+            entry["created"] = True
+        else:
+            entry["old"] = old_value
+        if deleted:
+            entry["deleted"] = True
+        else:
+            entry["new"] = new_value
+
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+        with self._lock:
+            self._buffer.append(line)
+            if (len(self._buffer) >= self.flush_every
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer and self._file is not None:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._file.flush()
+            self.records_written += len(self._buffer)
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            self._flush_locked()
+            self._file.close()
+            self._file = None
+        atexit.unregister(self.close)
+
+def iter_change_log(path):
+    """Stream the records of a change log one at a time"""
+    with _open_log(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
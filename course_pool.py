@@ -0,0 +1,119 @@
+import json
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_GENERATION_WORKERS = os.cpu_count() or 1
+# Items a pipeline stage may run ahead of the next one
+DEFAULT_QUEUE_SIZE = 4
+
+def course_seed(run_seed, course_id):
+    """Seed for one course's random.Random.
+
+    It depends only on the run seed and the course ID, so a course's output
+    doesn't change with the worker count, the course order or the other
+    courses in the run.
+    """
+    return f"{run_seed}:{course_id}"
+
+def ordered_map(func, items, max_workers=DEFAULT_GENERATION_WORKERS, window=None):
+    """Yield func(item) for every item, in input order, computed on a process pool.
+
+    Results are yielded as soon as they and every earlier result are done,
+    so callers can write them out while later items are still running. At
+    most `window` items (default 2 * max_workers) are submitted ahead, which
+    keeps memory bounded however many items there are. func must be a
+    module-level function and items and results must be picklable. With
+    max_workers=1 everything runs in this process.
+    """
+    if max_workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    window = window or max_workers * 2
+    in_flight = deque()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for item in items:
+                in_flight.append(executor.submit(func, item))
+                if len(in_flight) >= window:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+def stream_json_array(path, items, indent=2, key=None):
+    """Write items to `path` as a JSON array one at a time, yielding each after it is written.
+
+    The file reads the same as json.dump(list(items), f, indent=indent), but
+    no list is built and items can be passed on (e.g. to an uploader) while
+    the file is written. With `key` the file gets key(item) instead of item.
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("[")
+        first = True
+        for item in items:
+            text = json.dumps(item if key is None else key(item), ensure_ascii=False, indent=indent)
+            if indent:
+                # Nest the item one level into the array, as json.dump would
+                text = text.replace("\n", "\n" + " " * indent)
+                f.write(("\n" if first else ",\n") + " " * indent + text)
+            else:
+                f.write(("" if first else ", ") + text)
+            first = False
+            yield item
+        f.write("]" if first or not indent else "\n]")
+
+class _StageFailed:
+    def __init__(self, error):
+        self.error = error
+
+_STAGE_DONE = object()
+
+def buffered(items, maxsize=DEFAULT_QUEUE_SIZE, name="stage"):
+    """Run the `items` iterator on its own thread, at most `maxsize` items ahead of the consumer.
+
+    Chaining buffered() generators gives a pipeline whose stages run
+    concurrently while memory stays bounded by the queue sizes: a producer
+    blocks once its queue is full. An exception in a stage is re-raised in
+    the consumer. If the consumer stops early the producer is told to stop
+    at its next item.
+    """
+    pipe = queue.Queue(maxsize)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                pipe.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_STAGE_DONE)
+        except BaseException as e:
+            put(_StageFailed(e))
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = pipe.get()
+            if item is _STAGE_DONE:
+                break
+            if isinstance(item, _StageFailed):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
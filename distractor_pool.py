@@ -0,0 +1,76 @@
+import random
+from course_pool import course_seed
+
+class DistractorPool:
+    """Deduplicated array of candidate answers used to draw wrong options.
+
+    The pool is built once per course. Each draw picks k distinct indices
+    with random.sample over a range, which is O(k) and never copies or
+    shuffles the pool. Duplicate answers are collapsed, so a wrong option can
+    never repeat another option or equal the correct answer.
+    """
+
+    def __init__(self, answers, rng=None):
+        # dict.fromkeys keeps the first occurrence order, so draws are stable for a seed
+        self.answers = list(dict.fromkeys(answers))
+        self._index = {answer: i for i, answer in enumerate(self.answers)}
+        self.rng = rng if rng is not None else random.Random()
+
+    def __len__(self):
+        return len(self.answers)
+
+    def sample(self, correct, k=3):
+        """Return up to k distinct answers that differ from `correct`"""
+        excluded = self._index.get(correct)
+        size = len(self.answers) - (excluded is not None)
+        picks = self.rng.sample(range(size), min(k, size))
+
+        # Sample from a range one shorter than the pool and step over the correct answer
+        if excluded is None:
+            return [self.answers[i] for i in picks]
+        return [self.answers[i + 1 if i >= excluded else i] for i in picks]
+
+class VocabularyPool:
+    """Vocabulary of a course, flattened once and shared by the question generators.
+
+    Holds every word entry plus one DistractorPool per answer field, all
+    drawing from the same random.Random, so a seeded pool produces the same
+    questions on every run. Picking n words is a random.sample of n, and
+    wrong options come from DistractorPool.sample, so both are O(k) and
+    always terminate, even when a course has fewer than four distinct answers.
+    """
+
+    def __init__(self, words, rng=None, fields=("english", "vietnamese")):
+        self.words = list(words)
+        self.rng = rng if rng is not None else random.Random()
+        self.pools = {field: DistractorPool([w[field] for w in self.words if field in w], self.rng)
+                      for field in fields}
+
+    @classmethod
+    def from_lessons(cls, lessons, rng=None):
+        """Pool the words of a {lesson_id: {'vocabulary': [...]}} mapping"""
+        return cls((word for lesson in lessons.values() for word in lesson.get('vocabulary', [])), rng)
+
+    @classmethod
+    def seeded(cls, lessons, seed, course_id=""):
+        # Each course gets its own stream, as in create_test_questions
+        return cls.from_lessons(lessons, random.Random(course_seed(seed, course_id) if seed is not None else None))
+
+    def __len__(self):
+        return len(self.words)
+
+    def pick(self, n):
+        """Up to n distinct word entries in random order"""
+        return self.rng.sample(self.words, min(n, len(self.words)))
+
+    def choice(self, options):
+        return options[self.rng.randrange(len(options))]
+
+    def distractors(self, field, correct, k=3):
+        return self.pools[field].sample(correct, k)
+
+    def options(self, field, correct, k=3):
+        """The correct answer plus up to k wrong ones, shuffled; returns (options, correct index)"""
+        options = [correct] + self.distractors(field, correct, k)
+        self.rng.shuffle(options)
+        return options, options.index(correct)
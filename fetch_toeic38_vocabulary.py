@@ -1,261 +1,397 @@
-import firebase_admin
-from firebase_admin import credentials
-from firebase_admin import firestore
-import json
-import os
-import sys
-
-def initialize_firebase():
-    """Initialize Firebase connection"""
-    try:
-        # Check if already initialized
-        try:
-            app = firebase_admin.get_app()
-        except ValueError:
-            # Try different locations for the Firebase config file
-            config_paths = [
-                'firebase_config.json',
-                'scripts/firebase_config.json',
-                os.path.join(os.path.dirname(__file__), 'firebase_config.json')
-            ]
-            
-            config_path = None
-            for path in config_paths:
-                if os.path.exists(path):
-                    config_path = path
-                    break
-                    
-            if not config_path:
-                print("Error: Firebase configuration file not found.")
-                print("Please place firebase_config.json in the current directory or scripts/ folder.")
-                sys.exit(1)
-                
-            cred = credentials.Certificate(config_path)
-            firebase_admin.initialize_app(cred)
-        
-        db = firestore.client()
-        return db
-    except Exception as e:
-        print(f"Error initializing Firebase: {e}")
-        sys.exit(1)
-
-def fetch_toeic38_course_data(db):
-    """Fetches the course data for TOEIC38"""
-    try:
-        course_doc = db.collection('Courses').document('toeic38').get()
-        if not course_doc.exists:
-            print("Error: TOEIC38 course not found in Firebase.")
-            return None
-            
-        course_data = course_doc.to_dict()
-        print(f"Course: {course_data.get('title', 'TOEIC38')}")
-        return course_data
-    except Exception as e:
-        print(f"Error fetching course data: {e}")
-        return None
-
-def fetch_toeic38_lessons(db):
-    """Fetches all lessons for TOEIC38 course"""
-    try:
-        lessons_ref = db.collection('Courses').document('toeic38').collection('Lessons')
-        lessons = lessons_ref.get()
-        
-        lesson_list = []
-        for lesson in lessons:
-            lesson_data = lesson.to_dict()
-            lesson_data['id'] = lesson.id
-            lesson_list.append(lesson_data)
-            
-        # Sort lessons by lesson number
-        lesson_list.sort(key=lambda x: x.get('lessonNumber', 0))
-        
-        print(f"Found {len(lesson_list)} lessons for TOEIC38 course")
-        return lesson_list
-    except Exception as e:
-        print(f"Error fetching lessons: {e}")
-        return []
-
-def fetch_vocabulary_for_lesson(db, lesson_id):
-    """Fetches vocabulary items for a specific lesson"""
-    try:
-        # Path 1: Courses/toeic38/Lessons/{lessonId}/Vocabulary
-        vocabulary_ref = db.collection('Courses').document('toeic38').collection('Lessons').document(lesson_id).collection('Vocabulary')
-        vocabulary_docs = vocabulary_ref.get()
-        
-        vocabulary_items = []
-        for doc in vocabulary_docs:
-            vocab_item = doc.to_dict()
-            vocabulary_items.append(vocab_item)
-            
-        if vocabulary_items:
-            print(f"Found {len(vocabulary_items)} vocabulary items for lesson {lesson_id} from Courses collection")
-            return vocabulary_items
-            
-        # Path 2: Try the Lessons collection directly if no results from Courses
-        vocabulary_ref = db.collection('Lessons').document(lesson_id).collection('Vocabulary')
-        vocabulary_docs = vocabulary_ref.get()
-        
-        vocabulary_items = []
-        for doc in vocabulary_docs:
-            vocab_item = doc.to_dict()
-            vocabulary_items.append(vocab_item)
-            
-        print(f"Found {len(vocabulary_items)} vocabulary items for lesson {lesson_id} from Lessons collection")
-        return vocabulary_items
-    except Exception as e:
-        print(f"Error fetching vocabulary for lesson {lesson_id}: {e}")
-        return []
-
-def load_company_structures_vocabulary():
-    """Load vocabulary related to company structures from a local JSON file if available"""
-    vocab_files = ['vocabulary_data.json', 'lessons_with_vocabulary.json']
-    
-    all_vocabulary = []
-    for file_path in vocab_files:
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                # Extract vocabulary items for toeic38
-                if isinstance(data, list):
-                    # vocabulary_data.json format
-                    for item in data:
-                        if item.get('courseId') == 'toeic38':
-                            all_vocabulary.append(item)
-                            
-                elif isinstance(data, dict) and 'toeic38' in data:
-                    # lessons_with_vocabulary.json format
-                    toeic38_data = data['toeic38']
-                    if 'lessons' in toeic38_data:
-                        for lesson_id, lesson_data in toeic38_data['lessons'].items():
-                            if 'vocabulary' in lesson_data:
-                                for vocab in lesson_data['vocabulary']:
-                                    vocab['lessonId'] = lesson_id
-                                    all_vocabulary.append(vocab)
-                
-                if all_vocabulary:
-                    print(f"Loaded {len(all_vocabulary)} vocabulary items from {file_path}")
-                    return all_vocabulary
-                    
-            except Exception as e:
-                print(f"Error loading vocabulary from {file_path}: {e}")
-    
-    return all_vocabulary
-
-def process_meeting_vocabulary():
-    """Create a list of essential meeting vocabulary based on screenshots"""
-    meeting_vocabulary = [
-        {"english": "Schedule", "vietnamese": "Lịch trình", "phonetic": "/ˈʃɛdjuːl/"},
-        {"english": "Agenda", "vietnamese": "Chương trình nghị sự", "phonetic": "/əˈdʒɛndə/"},
-        {"english": "Conference Call", "vietnamese": "Cuộc gọi hội nghị", "phonetic": "/ˈkɒnfərəns kɔːl/"},
-        {"english": "Minutes", "vietnamese": "Biên bản", "phonetic": "/ˈmɪnɪts/"},
-        {"english": "Deadline", "vietnamese": "Hạn chót", "phonetic": "/ˈdɛdlaɪn/"},
-        {"english": "Meeting Room", "vietnamese": "Phòng họp", "phonetic": "/ˈmiːtɪŋ ruːm/"},
-        {"english": "Appointment", "vietnamese": "Cuộc hẹn", "phonetic": "/əˈpɔɪntmənt/"},
-        {"english": "Reschedule", "vietnamese": "Sắp xếp lại lịch", "phonetic": "/riːˈʃɛdjuːl/"}
-    ]
-    return meeting_vocabulary
-
-def main():
-    print("Connecting to Firebase to fetch TOEIC38 vocabulary data...")
-    
-    # Try to initialize Firebase
-    try:
-        db = initialize_firebase()
-    except Exception as e:
-        print(f"Failed to connect to Firebase: {e}")
-        # Fall back to local data if Firebase connection fails
-        meeting_vocabulary = process_meeting_vocabulary()
-        print("Using local meeting vocabulary data instead:")
-        for item in meeting_vocabulary:
-            print(f"{item['english']} - {item['vietnamese']} ({item['phonetic']})")
-        return
-    
-    # Fetch course data
-    course_data = fetch_toeic38_course_data(db)
-    if not course_data:
-        # Fall back to local data
-        meeting_vocabulary = process_meeting_vocabulary()
-        print("Using local meeting vocabulary data instead:")
-        for item in meeting_vocabulary:
-            print(f"{item['english']} - {item['vietnamese']} ({item['phonetic']})")
-        return
-    
-    # Fetch lessons
-    lessons = fetch_toeic38_lessons(db)
-    if not lessons:
-        print("No lessons found for TOEIC38 course.")
-        # Try loading from local file
-        vocabulary = load_company_structures_vocabulary()
-        if vocabulary:
-            print_vocabulary_by_lesson(vocabulary)
-        else:
-            meeting_vocabulary = process_meeting_vocabulary()
-            print("Using local meeting vocabulary data instead:")
-            for item in meeting_vocabulary:
-                print(f"{item['english']} - {item['vietnamese']} ({item['phonetic']})")
-        return
-    
-    # Fetch vocabulary for each lesson
-    results = {}
-    for lesson in lessons:
-        lesson_id = lesson['id']
-        lesson_title = lesson.get('title', f"Lesson {lesson.get('lessonNumber', '?')}")
-        
-        vocabulary = fetch_vocabulary_for_lesson(db, lesson_id)
-        if vocabulary:
-            results[lesson_id] = {
-                'title': lesson_title,
-                'vocabulary': vocabulary
-            }
-    
-    if not results:
-        print("No vocabulary data found in Firebase for TOEIC38 lessons.")
-        # Try loading from local file
-        vocabulary = load_company_structures_vocabulary()
-        if vocabulary:
-            print_vocabulary_by_lesson(vocabulary)
-        else:
-            meeting_vocabulary = process_meeting_vocabulary()
-            print("\nUsing local meeting vocabulary data instead:")
-            for item in meeting_vocabulary:
-                print(f"{item['english']} - {item['vietnamese']} ({item['phonetic']})")
-        return
-    
-    # Display vocabulary by lesson
-    print("\n===== TOEIC38 Vocabulary by Lesson =====")
-    for lesson_id, data in results.items():
-        print(f"\n{data['title']} ({lesson_id}):")
-        for item in data['vocabulary']:
-            english = item.get('english', '')
-            vietnamese = item.get('vietnamese', '')
-            phonetic = item.get('phonetic', '')
-            print(f"  {english} - {vietnamese} ({phonetic})")
-    
-    # Save vocabulary to JSON file
-    output_file = "toeic38_vocabulary.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
-    print(f"\nVocabulary data saved to {output_file}")
-
-def print_vocabulary_by_lesson(vocabulary_items):
-    """Print vocabulary items grouped by lesson"""
-    lessons = {}
-    for item in vocabulary_items:
-        lesson_id = item.get('lessonId', 'unknown')
-        if lesson_id not in lessons:
-            lessons[lesson_id] = []
-        lessons[lesson_id].append(item)
-    
-    print("\n===== TOEIC38 Vocabulary by Lesson (from local data) =====")
-    for lesson_id, items in lessons.items():
-        print(f"\n{lesson_id}:")
-        for item in items:
-            english = item.get('english', '')
-            vietnamese = item.get('vietnamese', '')
-            phonetic = item.get('phonetic', '')
-            print(f"  {english} - {vietnamese} ({phonetic})")
-
-if __name__ == "__main__":
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from firestore_backend import connect
+from lesson_iterator import iter_documents, iter_lessons_by_course, DEFAULT_PAGE_SIZE, DOCUMENT_ID
+from scan_executor import ScanExecutor, DEFAULT_SCAN_WORKERS
+from snapshot_cache import add_cache_arguments, open_cache
+from catalog_mirror import courses_changed_since
+
+DEFAULT_COURSE_ID = 'toeic38'
+DEFAULT_SNAPSHOT_FILE = 'vocabulary_snapshot.json'
+TOEIC38_OUTPUT_FILE = 'toeic38_vocabulary.json'
+
+# Where a lesson's vocabulary can live, in the order they are tried
+SOURCE_COURSE_LESSON = 'Courses/{courseId}/Lessons/{lessonId}/Vocabulary'
+SOURCE_ROOT_LESSON = 'Lessons/{lessonId}/Vocabulary'
+SOURCE_COLLECTION = 'Vocabulary'
+SOURCE_LESSON_ARRAY = 'vocabularyItems'
+
+def initialize_firebase():
+    """Initialize Firebase connection"""
+    try:
+        # Try different locations for the Firebase config file
+        config_paths = [
+            'firebase_config.json',
+            'scripts/firebase_config.json',
+            os.path.join(os.path.dirname(__file__), 'firebase_config.json')
+        ]
+        return connect(config_paths)
+    except FileNotFoundError:
+        print("Error: Firebase configuration file not found.")
+        print("Please place firebase_config.json in the current directory or scripts/ folder.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error initializing Firebase: {e}")
+        sys.exit(1)
+
+def fetch_vocabulary_index(db, page_size=DEFAULT_PAGE_SIZE, documents=None):
+    """Every vocabulary document, from one paged collection-group query over `Vocabulary`.
+
+    This reads the vocabulary of the whole catalog, so it is only used when
+    exporting every course; see fetch_lesson_vocabulary for a few courses.
+
+    Returns ({lesson_id: {(source, course_id): [items]}}, document count).
+    Documents under Courses/*/Lessons/* and Lessons/* are placed by their
+    parent path; documents in the top-level Vocabulary collection by their
+    courseId/lessonId fields. Pass `documents` to index another stream of
+    vocabulary snapshots instead.
+    """
+    if documents is None:
+        documents = iter_documents(db.collection_group('Vocabulary'), page_size)
+    index = {}
+    count = 0
+    for doc in documents:
+        item = doc.to_dict()
+        lesson_ref = doc.reference.parent.parent
+        if lesson_ref is None:
+            source, course_id, lesson_id = SOURCE_COLLECTION, item.get('courseId'), item.get('lessonId')
+        else:
+            course_ref = lesson_ref.parent.parent
+            if course_ref is not None and course_ref.parent.id == 'Courses':
+                source, course_id = SOURCE_COURSE_LESSON, course_ref.id
+            else:
+                source, course_id = SOURCE_ROOT_LESSON, None
+            lesson_id = lesson_ref.id
+        if not lesson_id:
+            continue
+        index.setdefault(lesson_id, {}).setdefault((source, course_id), []).append(item)
+        count += 1
+    return index, count
+
+def course_vocabulary_query(db, course_id):
+    """Collection-group query over the Vocabulary documents under Courses/{course_id} only.
+
+    Paths sort segment by segment, so every document below the course lies
+    between the course itself and the next possible course ID.
+    """
+    end = db.document(f'Courses/{course_id}\x00')
+    return db.collection_group('Vocabulary').end_before({DOCUMENT_ID: end})
+
+def fetch_lesson_vocabulary(db, courses, max_workers=DEFAULT_SCAN_WORKERS, page_size=DEFAULT_PAGE_SIZE):
+    """Vocabulary of the lessons in `courses` only, indexed like fetch_vocabulary_index.
+
+    `courses` is {course_id: (course data, [lesson snapshots])}. Each course
+    is one paged collection-group query over the Vocabulary documents under
+    its path, with the courses run concurrently. Lessons that still have no
+    vocabulary are looked up in Lessons/{lessonId}/Vocabulary, and courses
+    with lessons lacking it after that get one query on the top-level
+    Vocabulary collection filtered by courseId.
+    """
+    def fetch_course(course_id, log):
+        start = {DOCUMENT_ID: db.document(f'Courses/{course_id}')}
+        return list(iter_documents(course_vocabulary_query(db, course_id), page_size, start_after=start))
+    
+    def fetch_root_lesson(lesson_id, log):
+        return list(iter_documents(db.collection('Lessons').document(lesson_id).collection('Vocabulary'), page_size))
+    
+    def missing(documents):
+        found = {doc.reference.parent.parent.path for doc in documents if doc.reference.parent.parent is not None}
+        return {(course_id, lesson.id) for course_id, (_, lessons) in courses.items() for lesson in lessons
+                if f'Courses/{course_id}/Lessons/{lesson.id}' not in found and f'Lessons/{lesson.id}' not in found}
+    
+    documents = []
+    with ScanExecutor(max_workers) as executor:
+        for _, docs in executor.map(fetch_course, list(courses)):
+            documents.extend(docs)
+        lesson_ids = sorted({lesson_id for _, lesson_id in missing(documents)})
+        for _, docs in executor.map(fetch_root_lesson, lesson_ids):
+            documents.extend(docs)
+    for course_id in sorted({course_id for course_id, _ in missing(documents)}):
+        query = db.collection(SOURCE_COLLECTION).where('courseId', '==', course_id)
+        documents.extend(iter_documents(query, page_size))
+    return fetch_vocabulary_index(db, documents=documents)
+
+def fetch_courses_with_lessons(db, course_ids=None, max_workers=DEFAULT_SCAN_WORKERS, page_size=DEFAULT_PAGE_SIZE,
+                               cache=None):
+    """{course_id: (course data or None, [lesson snapshots])} for the given courses.
+
+    The whole catalog (course_ids=None) is two paged queries: the Courses
+    collection and a collection-group query over Lessons. A list of courses
+    is fetched with one lessons query per course, run concurrently. With a
+    SnapshotCache everything is served from the cache.
+    """
+    if cache:
+        courses = {doc.id: doc.to_dict() for doc in cache.documents('Courses')}
+        lessons = dict(cache.lessons_by_course())
+        wanted = sorted(set(courses) | set(lessons)) if course_ids is None else course_ids
+        return {course_id: (courses.get(course_id), lessons.get(course_id, [])) for course_id in wanted}
+    
+    if course_ids is None:
+        courses = {doc.id: doc.to_dict() for doc in iter_documents(db.collection('Courses'), page_size)}
+        lessons = dict(iter_lessons_by_course(db, page_size))
+        return {course_id: (courses.get(course_id), lessons.get(course_id, []))
+                for course_id in sorted(set(courses) | set(lessons))}
+    
+    def fetch_course(course_id, log):
+        course_ref = db.collection('Courses').document(course_id)
+        course_doc = course_ref.get()
+        lessons = list(iter_documents(course_ref.collection('Lessons'), page_size))
+        return (course_doc.to_dict() if course_doc.exists else None), lessons
+    
+    with ScanExecutor(max_workers) as executor:
+        return dict(executor.map(fetch_course, course_ids))
+
+def lesson_vocabulary(course_id, lesson_id, lesson_data, vocabulary_index):
+    """(source, items) for one lesson: the Vocabulary documents, else the lesson's vocabularyItems"""
+    found = vocabulary_index.get(lesson_id, {})
+    for key in ((SOURCE_COURSE_LESSON, course_id), (SOURCE_ROOT_LESSON, None),
+                (SOURCE_COLLECTION, course_id), (SOURCE_COLLECTION, None)):
+        if found.get(key):
+            return key[0], found[key]
+    items = lesson_data.get('vocabularyItems') or []
+    return (SOURCE_LESSON_ARRAY if items else None), items
+
+def build_course_export(course_id, course_data, lessons, vocabulary_index):
+    """Course title plus {lesson_id: {title, lessonNumber, source, vocabulary}}, in lesson order"""
+    lesson_data = sorted(((lesson.id, lesson.to_dict()) for lesson in lessons),
+                         key=lambda pair: pair[1].get('lessonNumber', 0))
+    exported = {}
+    for lesson_id, data in lesson_data:
+        source, vocabulary = lesson_vocabulary(course_id, lesson_id, data, vocabulary_index)
+        exported[lesson_id] = {
+            'title': data.get('title', f"Lesson {data.get('lessonNumber', '?')}"),
+            'lessonNumber': data.get('lessonNumber'),
+            'source': source,
+            'vocabulary': vocabulary
+        }
+    return {'title': (course_data or {}).get('title', course_id), 'lessons': exported}
+
+def export_vocabulary(db, course_ids=None, max_workers=DEFAULT_SCAN_WORKERS, page_size=DEFAULT_PAGE_SIZE,
+                      cache=None):
+    """Vocabulary of the given courses (all when None) as {course_id: course export}.
+
+    For the whole catalog the vocabulary collection-group scan and the
+    course/lesson fetch run at the same time, so it costs a few paged
+    queries instead of up to two queries per lesson. A list of courses reads
+    only those courses' vocabulary, one path-range query per course. With a SnapshotCache
+    only documents that changed since its last sync are read.
+    """
+    if cache:
+        # The cache's SQLite connection belongs to this thread
+        results = {'vocabulary': fetch_vocabulary_index(db, page_size, cache.documents('Vocabulary')),
+                   'courses': fetch_courses_with_lessons(db, course_ids, cache=cache)}
+    elif course_ids is not None:
+        courses = fetch_courses_with_lessons(db, course_ids, max_workers, page_size)
+        results = {'vocabulary': fetch_lesson_vocabulary(db, courses, max_workers, page_size),
+                   'courses': courses}
+    else:
+        def scan(name, log):
+            if name == 'vocabulary':
+                return fetch_vocabulary_index(db, page_size)
+            return fetch_courses_with_lessons(db, course_ids, max_workers, page_size)
+        
+        with ScanExecutor(2) as executor:
+            results = dict(executor.map(scan, ['vocabulary', 'courses']))
+    vocabulary_index, vocabulary_docs = results['vocabulary']
+    print(f"Read {vocabulary_docs} vocabulary documents")
+    
+    exports = {}
+    for course_id, (course_data, lessons) in results['courses'].items():
+        if course_data is None and not lessons:
+            print(f"Course {course_id} not found in Firebase")
+            continue
+        exports[course_id] = build_course_export(course_id, course_data, lessons, vocabulary_index)
+    return exports
+
+def save_vocabulary_snapshot(exports, output_file=DEFAULT_SNAPSHOT_FILE):
+    """Write every exported course to one JSON snapshot"""
+    snapshot = {'exportedAt': datetime.now(timezone.utc).isoformat(), 'courses': exports}
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False, indent=2, default=str)
+
+def update_vocabulary_snapshot(exports, course_ids, output_file=DEFAULT_SNAPSHOT_FILE):
+    """Replace `course_ids` in an existing snapshot with `exports`, dropping those that weren't exported"""
+    courses = {}
+    if os.path.exists(output_file):
+        with open(output_file, 'r', encoding='utf-8') as f:
+            courses = json.load(f).get('courses', {})
+    for course_id in course_ids:
+        courses.pop(course_id, None)
+    courses.update(exports)
+    save_vocabulary_snapshot(dict(sorted(courses.items())), output_file)
+
+def save_toeic38_vocabulary(export, output_file=TOEIC38_OUTPUT_FILE):
+    """Write one course in the {lesson_id: {title, vocabulary}} form generate_toeic38_test_data reads"""
+    results = {lesson_id: {'title': lesson['title'], 'vocabulary': lesson['vocabulary']}
+               for lesson_id, lesson in export['lessons'].items() if lesson['vocabulary']}
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2, default=str)
+    return results
+
+def load_company_structures_vocabulary():
+    """Load vocabulary related to company structures from a local JSON file if available"""
+    vocab_files = ['vocabulary_data.json', 'lessons_with_vocabulary.json']
+    
+    all_vocabulary = []
+    for file_path in vocab_files:
+        if os.path.exists(file_path):
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    
+                # Extract vocabulary items for toeic38
+                if isinstance(data, list):
+                    # vocabulary_data.json format
+                    for item in data:
+                        if item.get('courseId') == 'toeic38':
+                            all_vocabulary.append(item)
+                            
+                elif isinstance(data, dict) and 'toeic38' in data:
+                    # lessons_with_vocabulary.json format
+                    toeic38_data = data['toeic38']
+                    if 'lessons' in toeic38_data:
+                        for lesson_id, lesson_data in toeic38_data['lessons'].items():
+                            if 'vocabulary' in lesson_data:
+                                for vocab in lesson_data['vocabulary']:
+                                    vocab['lessonId'] = lesson_id
+                                    all_vocabulary.append(vocab)
+                
+                if all_vocabulary:
+                    print(f"Loaded {len(all_vocabulary)} vocabulary items from {file_path}")
+                    return all_vocabulary
+                    
+            except Exception as e:
+                print(f"Error loading vocabulary from {file_path}: {e}")
+    
+    return all_vocabulary
+
+def process_meeting_vocabulary():
+    """Create a list of essential meeting vocabulary based on screenshots"""
+    meeting_vocabulary = [
+        {"english": "Schedule", "vietnamese": "Lịch trình", "phonetic": "/ˈʃɛdjuːl/"},
+        {"english": "Agenda", "vietnamese": "Chương trình nghị sự", "phonetic": "/əˈdʒɛndə/"},
+        {"english": "Conference Call", "vietnamese": "Cuộc gọi hội nghị", "phonetic": "/ˈkɒnfərəns kɔːl/"},
+        {"english": "Minutes", "vietnamese": "Biên bản", "phonetic": "/ˈmɪnɪts/"},
+        {"english": "Deadline", "vietnamese": "Hạn chót", "phonetic": "/ˈdɛdlaɪn/"},
+        {"english": "Meeting Room", "vietnamese": "Phòng họp", "phonetic": "/ˈmiːtɪŋ ruːm/"},
+        {"english": "Appointment", "vietnamese": "Cuộc hẹn", "phonetic": "/əˈpɔɪntmənt/"},
+        {"english": "Reschedule", "vietnamese": "Sắp xếp lại lịch", "phonetic": "/riːˈʃɛdjuːl/"}
+    ]
+    return meeting_vocabulary
+
+def print_local_fallback():
+    """Print vocabulary from local files, or the built-in meeting vocabulary"""
+    vocabulary = load_company_structures_vocabulary()
+    if vocabulary:
+        print_vocabulary_by_lesson(vocabulary)
+        return
+    meeting_vocabulary = process_meeting_vocabulary()
+    print("\nUsing local meeting vocabulary data instead:")
+    for item in meeting_vocabulary:
+        print(f"{item['english']} - {item['vietnamese']} ({item['phonetic']})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Export course vocabulary from Firebase to one snapshot file")
+    parser.add_argument("courses", nargs="*", default=[DEFAULT_COURSE_ID],
+                        help=f"Course IDs to export (default: {DEFAULT_COURSE_ID})")
+    parser.add_argument("--all", action="store_true", help="Export every course in the catalog")
+    parser.add_argument("--output", default=DEFAULT_SNAPSHOT_FILE,
+                        help=f"Combined snapshot file (default: {DEFAULT_SNAPSHOT_FILE})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_SCAN_WORKERS,
+                        help="Courses and lessons fetched concurrently when exporting a list of courses")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Documents per query page")
+    add_cache_arguments(parser)
+    parser.add_argument("--changes-after", type=int, default=None, metavar="SEQ",
+                        help="Only re-export courses with catalog_mirror feed entries after SEQ (needs --cache)")
+    args = parser.parse_args()
+    course_ids = None if args.all else list(dict.fromkeys(args.courses))
+    
+    feed_position = None
+    if args.changes_after is not None:
+        if not args.cache:
+            parser.error("--changes-after needs --cache")
+        changed, feed_position = courses_changed_since(args.cache, args.changes_after)
+        course_ids = sorted(changed if course_ids is None else changed & set(course_ids))
+        print(f"{len(course_ids)} courses changed since feed entry {args.changes_after} "
+              f"(pass --changes-after {feed_position} next time)")
+        if not course_ids:
+            return
+    
+    print("Connecting to Firebase to fetch vocabulary data...")
+    try:
+        db = initialize_firebase()
+    except Exception as e:
+        print(f"Failed to connect to Firebase: {e}")
+        print_local_fallback()
+        return
+    
+    start = time.perf_counter()
+    cache = open_cache(db, args.cache, args.full_sync, args.cache_max_age)
+    exports = export_vocabulary(db, course_ids, args.workers, args.page_size, cache)
+    elapsed = time.perf_counter() - start
+    if cache:
+        print(f"Firestore reads for the cache: {cache.reads}")
+        cache.close()
+    
+    if feed_position is not None:
+        update_vocabulary_snapshot(exports, course_ids, args.output)
+        print(f"Updated {len(exports)} courses in {args.output}"
+              + (f", removed {len(course_ids) - len(exports)}" if len(course_ids) > len(exports) else ""))
+        if DEFAULT_COURSE_ID in exports:
+            save_toeic38_vocabulary(exports[DEFAULT_COURSE_ID])
+        return
+    
+    if not exports:
+        print("No courses found in Firebase.")
+        print_local_fallback()
+        return
+    
+    total_lessons = total_words = 0
+    for course_id, export in exports.items():
+        lessons = export['lessons']
+        words = sum(len(lesson['vocabulary']) for lesson in lessons.values())
+        fallback = sum(1 for lesson in lessons.values() if lesson['source'] == SOURCE_LESSON_ARRAY)
+        missing = sum(1 for lesson in lessons.values() if not lesson['vocabulary'])
+        print(f"{course_id} ({export['title']}): {len(lessons)} lessons, {words} words"
+              + (f", {fallback} lessons from {SOURCE_LESSON_ARRAY}" if fallback else "")
+              + (f", {missing} lessons without vocabulary" if missing else ""))
+        total_lessons += len(lessons)
+        total_words += words
+    
+    save_vocabulary_snapshot(exports, args.output)
+    print(f"\nExported {len(exports)} courses, {total_lessons} lessons, {total_words} words "
+          f"in {elapsed:.2f}s to {args.output}")
+    
+    # import_toeic38_vocabulary_to_android and generate_toeic38_test_data read this file
+    if DEFAULT_COURSE_ID in exports:
+        results = save_toeic38_vocabulary(exports[DEFAULT_COURSE_ID])
+        if results:
+            print(f"TOEIC38 vocabulary ({len(results)} lessons) saved to {TOEIC38_OUTPUT_FILE}")
+        elif course_ids == [DEFAULT_COURSE_ID]:
+            print("No vocabulary data found in Firebase for TOEIC38 lessons.")
+            print_local_fallback()
+
+def print_vocabulary_by_lesson(vocabulary_items):
+    """Print vocabulary items grouped by lesson"""
+    lessons = {}
+    for item in vocabulary_items:
+        lesson_id = item.get('lessonId', 'unknown')
+        if lesson_id not in lessons:
+            lessons[lesson_id] = []
+        lessons[lesson_id].append(item)
+    
+    print("\n===== TOEIC38 Vocabulary by Lesson (from local data) =====")
+    for lesson_id, items in lessons.items():
+        print(f"\n{lesson_id}:")
+        for item in items:
+            english = item.get('english', '')
+            vietnamese = item.get('vietnamese', '')
+            phonetic = item.get('phonetic', '')
+            print(f"  {english} - {vietnamese} ({phonetic})")
+
+if __name__ == "__main__":
     main() 
\ No newline at end of file
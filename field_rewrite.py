@@ -0,0 +1,416 @@
+import argparse
+import csv
+import fnmatch
+import json
+import re
+import time
+
+from firestore_backend import connect
+from firestore_batch_writer import BatchWriter
+from firestore_rate_limiter import RateLimiter
+from firestore_query_planner import plan_field_rewrite, ReadSavings
+from change_log import ChangeLogWriter
+from migration_checkpoint import MigrationCheckpoint, DEFAULT_CHECKPOINT_FILE
+from scan_executor import ScanExecutor, DEFAULT_SCAN_WORKERS
+
+# Array wildcard in a field path, e.g. partQuestions[*][*].videoUrl
+WILDCARD = "[*]"
+FIELD_TOKEN = re.compile(r"\[\*\]|[^.\[\]]+")
+
+class RewriteRule:
+    """Set `field` of every document matching `path` to a new value.
+
+    path     document path pattern, e.g. "Courses/*/Lessons/*" or "Tests/*".
+             Segments may use fnmatch wildcards; the last collection ID must
+             be literal.
+    field    field path; "." walks into maps and "[*]" into every array
+             element, e.g. "partQuestions[*][*].videoUrl".
+    value    the new value, or
+    mapping  a dict from a key to the new value. The key is the document ID,
+             or the value of `key_field` when given; documents without an
+             entry are left alone.
+    predicate  optional callable(old_value, snapshot) that must return True
+             for a value to be rewritten. Values already equal to the new
+             value are never rewritten.
+    add_missing  also set the field where it does not exist yet.
+    """
+
+    def __init__(self, path, field, value=None, mapping=None, key_field=None, predicate=None,
+                 add_missing=False):
+        if (value is None) == (mapping is None):
+            raise ValueError("A rule needs either a value or a mapping")
+        self.path = path.strip("/")
+        self.segments = self.path.split("/")
+        if len(self.segments) % 2 != 0:
+            raise ValueError(f"'{path}' is not a document path pattern")
+        if any(c in self.segments[-2] for c in "*?["):
+            raise ValueError(f"The collection ID in '{path}' must not be a wildcard")
+
+        self.field = field
+        self.tokens = FIELD_TOKEN.findall(field)
+        if not self.tokens or self.tokens[0] == WILDCARD or "".join(self.tokens) != field.replace(".", ""):
+            raise ValueError(f"Invalid field path: {field}")
+        self.top_field = self.tokens[0]
+        self.nested = WILDCARD in self.tokens
+        self.value = value
+        self.mapping = mapping
+        self.key_field = key_field
+        self.predicate = predicate
+        self.add_missing = add_missing
+
+    def __repr__(self):
+        target = f"mapping of {len(self.mapping)}" if self.mapping is not None else repr(self.value)
+        return f"RewriteRule({self.path} {self.field} -> {target})"
+
+    def is_filterable(self):
+        """Whether `field != value` can be pushed down to Firestore for this rule"""
+        return (self.mapping is None and self.predicate is None and not self.add_missing
+                and not self.nested)
+
+    def new_value(self, snapshot, data):
+        if self.mapping is None:
+            return self.value
+        key = snapshot.id if self.key_field is None else data.get(self.key_field)
+        return self.mapping.get(key)
+
+    def apply(self, snapshot, data):
+        """Rewrite `data` in place; return [(field path, old, new, created)]"""
+        new = self.new_value(snapshot, data)
+        if new is None:
+            return []
+        changes = []
+        self._rewrite(data, self.tokens, "", snapshot, new, changes)
+        return changes
+
+    def _accepts(self, old, new, snapshot):
+        return old != new and (self.predicate is None or self.predicate(old, snapshot))
+
+    def _rewrite(self, container, tokens, prefix, snapshot, new, changes):
+        token, rest = tokens[0], tokens[1:]
+        if token == WILDCARD:
+            if not isinstance(container, list):
+                return
+            for index, item in enumerate(container):
+                path = f"{prefix}[{index}]"
+                if rest:
+                    self._rewrite(item, rest, path, snapshot, new, changes)
+                elif self._accepts(item, new, snapshot):
+                    container[index] = new
+                    changes.append((path, item, new, False))
+            return
+
+        if not isinstance(container, dict):
+            return
+        path = f"{prefix}.{token}" if prefix else token
+        if rest:
+            if token in container:
+                self._rewrite(container[token], rest, path, snapshot, new, changes)
+        elif token in container:
+            old = container[token]
+            if self._accepts(old, new, snapshot):
+                container[token] = new
+                changes.append((path, old, new, False))
+        elif self.add_missing and (self.predicate is None or self.predicate(None, snapshot)):
+            container[token] = new
+            changes.append((path, None, new, True))
+
+def load_mapping_csv(path, key_column=None, value_column=None):
+    """Read a key -> value table from a CSV file with a header row.
+
+    The first two columns are used unless key_column/value_column name others,
+    e.g. a file with the header "lessonId,videoUrl".
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        columns = reader.fieldnames or []
+        if len(columns) < 2 and not (key_column and value_column):
+            raise ValueError(f"{path} needs a header row with a key and a value column")
+        key_column = key_column or columns[0]
+        value_column = value_column or columns[1]
+        return {row[key_column].strip(): row[value_column].strip()
+                for row in reader if row.get(key_column) and row.get(value_column)}
+
+class _RuleGroup:
+    """Rules sharing a path pattern, applied together in one traversal"""
+
+    def __init__(self, pattern, rules):
+        self.pattern = pattern
+        self.rules = rules
+        self.segments = rules[0].segments
+        # A fixed parent path reads one collection; wildcards in it need a collection-group query
+        self.collection_group = any(any(c in s for c in "*?[") for s in self.segments[:-2])
+
+    def source(self, db):
+        if self.collection_group:
+            return db.collection_group(self.segments[-2])
+        return db.collection("/".join(self.segments[:-1]))
+
+    def matches(self, path):
+        segments = path.split("/")
+        return (len(segments) == len(self.segments)
+                and all(fnmatch.fnmatchcase(s, p) for s, p in zip(segments, self.segments)))
+
+    def plan(self, db, page_size):
+        rules = self.rules
+        needed = {r.top_field for r in rules} | {r.key_field for r in rules if r.key_field}
+        extra_fields = sorted(needed - {rules[0].top_field})
+        first = rules[0]
+        if len(rules) == 1 and first.is_filterable():
+            return plan_field_rewrite(self.source(db), first.field, first.value, page_size=page_size)
+        if len(rules) > 1:
+            reason = f"{len(rules)} rules share one traversal"
+        elif first.mapping is not None:
+            reason = "new values come from a mapping table"
+        elif first.nested:
+            reason = "values nested in arrays cannot be filtered"
+        elif first.add_missing:
+            reason = "documents without the field must be found"
+        else:
+            reason = "a custom predicate decides which values change"
+        return plan_field_rewrite(self.source(db), first.top_field, None, scan_reason=reason,
+                                  extra_fields=extra_fields, page_size=page_size)
+
+class GroupResult:
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.docs_read = 0
+        self.docs_updated = 0
+        self.fields_changed = 0
+        self.conflicts = 0
+        self.plan = None
+        self.complete = False
+
+class RewriteEngine:
+    """Apply a rule set to Firestore with batched, rate-limited writes.
+
+    Rules are grouped by path pattern. Each group is read once, with only
+    the fields its rules need, and every document that changes gets a single
+    update covering all of its rules. Groups run in parallel on a
+    ScanExecutor. Updates are committed through a BatchWriter and carry the
+    document's update time as a precondition, so a document edited after it
+    was read is skipped rather than overwritten.
+
+    Changes are written to `change_log` and progress to `checkpoint` only
+    once the batch holding them has committed; a checkpoint stage is kept
+    per path pattern. With dry_run=True nothing is written.
+    """
+
+    def __init__(self, db, limiter=None, change_log=None, checkpoint=None, max_workers=DEFAULT_SCAN_WORKERS,
+                 page_size=500, dry_run=False, verbose=True):
+        self.db = db
+        self.limiter = limiter or RateLimiter()
+        self.change_log = change_log
+        self.checkpoint = checkpoint or MigrationCheckpoint(None)
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.dry_run = dry_run
+        self.verbose = verbose
+        self.results = []
+
+    def run(self, rules):
+        """Apply `rules`; return a list of GroupResult, one per path pattern.
+
+        Results of finished groups are also kept in `results`, so they can
+        be reported when another group fails.
+        """
+        groups = {}
+        for rule in rules:
+            groups.setdefault(rule.path, []).append(rule)
+        groups = [_RuleGroup(pattern, group_rules) for pattern, group_rules in groups.items()]
+
+        # Created up front so a failed group still reports what it wrote before failing
+        self.results = [GroupResult(group.pattern) for group in groups]
+        with ScanExecutor(self.max_workers) as executor:
+            for _ in executor.map(self._run_group, list(zip(groups, self.results))):
+                pass
+        return self.results
+
+    def _run_group(self, task, log=print):
+        group, result = task
+        log(f"\nRewriting {group.pattern}: {', '.join(rule.field for rule in group.rules)}")
+        if self.checkpoint.is_complete(group.pattern):
+            log("Already done in the resumed run")
+            result.complete = True
+            return result
+
+        plan = group.plan(self.db, self.page_size)
+        result.plan = plan
+        log(f"Query plan: {plan.describe()}")
+        start_after = self.checkpoint.position(group.pattern, plan.strategy, self.db)
+        if start_after:
+            log(f"Resuming after {start_after['__name__'].path}")
+
+        writer = None if self.dry_run else BatchWriter(self.db, limiter=self.limiter, verbose=False)
+        pending = []
+        last_doc = None
+
+        def commit_pending():
+            # Log and checkpoint only what was actually written
+            if writer:
+                writer.flush()
+            conflicts = set(writer.conflicts) if writer else set()
+            for snapshot, changes in pending:
+                if snapshot.reference.path in conflicts:
+                    log(f"  Skipped {snapshot.reference.path}: it was modified after it was read")
+                    continue
+                result.docs_updated += 1
+                result.fields_changed += len(changes)
+                if self.change_log and not self.dry_run:
+                    collection_path = snapshot.reference.path.rsplit('/', 1)[0]
+                    for field, old, new, created in changes:
+                        self.change_log.record(collection_path, snapshot.id, field, old, new, created=created)
+            pending.clear()
+            if last_doc is not None and not self.dry_run:
+                self.checkpoint.advance(group.pattern, plan.strategy, plan.cursor_of(last_doc))
+
+        try:
+            for snapshot in plan.stream(start_after):
+                result.docs_read += 1
+                last_doc = snapshot
+                if group.collection_group and not group.matches(snapshot.reference.path):
+                    continue
+
+                data = snapshot.to_dict()
+                changes = []
+                updates = {}
+                for rule in group.rules:
+                    rule_changes = rule.apply(snapshot, data)
+                    if not rule_changes:
+                        continue
+                    changes.extend(rule_changes)
+                    if rule.nested:
+                        # Array elements can't be addressed, so the whole top-level field is rewritten
+                        updates[rule.top_field] = data[rule.top_field]
+                    else:
+                        updates[rule.field] = rule_changes[0][2]
+
+                if updates:
+                    if self.verbose:
+                        for field, old, new, created in changes:
+                            action = "Adding" if created else "Updating"
+                            log(f"  {action} {snapshot.reference.path} {field}: {old} -> {new}")
+                    if writer:
+                        writer.update(snapshot.reference, updates,
+                                      option=self.db.write_option(last_update_time=snapshot.update_time))
+                    pending.append((snapshot, changes))
+
+                if result.docs_read % self.page_size == 0:
+                    commit_pending()
+            commit_pending()
+        finally:
+            if writer:
+                writer.close()
+
+        result.conflicts = len(writer.conflicts) if writer else 0
+        if not self.dry_run:
+            if result.conflicts:
+                # A resumed run reads the pattern again; documents already rewritten no longer change
+                self.checkpoint.restart(group.pattern)
+            else:
+                self.checkpoint.complete(group.pattern)
+        result.complete = not result.conflicts
+        log(f"{group.pattern}: {result.docs_read} read, {result.docs_updated} documents and "
+            f"{result.fields_changed} fields {'would change' if self.dry_run else 'updated'}")
+        if result.conflicts:
+            log(f"  {result.conflicts} documents changed while the rewrite ran and were left as they are; "
+                f"run it again to update them")
+        return result
+
+def print_report(results, label="Rewrite"):
+    savings = ReadSavings()
+    for result in results:
+        if result.plan is not None:
+            savings.add(result.plan)
+    docs = sum(r.docs_updated for r in results)
+    fields = sum(r.fields_changed for r in results)
+    conflicts = sum(r.conflicts for r in results)
+    print(f"\n{label}: {docs} documents, {fields} fields changed"
+          + (f", {conflicts} skipped after concurrent edits" if conflicts else ""))
+    savings.print_summary(f"{label} reads")
+
+def load_rules(path):
+    """Read rules from a JSON list of objects with the RewriteRule arguments.
+
+    Besides path/field/value/keyField/addMissing, an entry may give
+    "mappingCsv" (with optional "keyColumn"/"valueColumn") instead of a value,
+    and "match": a regular expression old values must match.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    return [rule_from_options(entry["path"], entry["field"], value=entry.get("value"),
+                              mapping_csv=entry.get("mappingCsv"), key_field=entry.get("keyField"),
+                              key_column=entry.get("keyColumn"), value_column=entry.get("valueColumn"),
+                              match=entry.get("match"), add_missing=entry.get("addMissing", False))
+            for entry in entries]
+
+def rule_from_options(path, field, value=None, mapping_csv=None, key_field=None, key_column=None,
+                      value_column=None, match=None, add_missing=False):
+    mapping = load_mapping_csv(mapping_csv, key_column, value_column) if mapping_csv else None
+    predicate = None
+    if match:
+        pattern = re.compile(match)
+        predicate = lambda old, snapshot: isinstance(old, str) and pattern.search(old) is not None
+    return RewriteRule(path, field, value=value, mapping=mapping, key_field=key_field,
+                       predicate=predicate, add_missing=add_missing)
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite Firestore fields in bulk from declarative rules")
+    parser.add_argument("--rules", help="JSON file with a list of rules")
+    parser.add_argument("--path", help="Document path pattern, e.g. 'Courses/*/Lessons/*'")
+    parser.add_argument("--field", help="Field path, e.g. videoUrl or 'partQuestions[*][*].videoUrl'")
+    parser.add_argument("--value", help="New value for the field")
+    parser.add_argument("--mapping", help="CSV file mapping a key (document ID by default) to the new value")
+    parser.add_argument("--key-field", help="Document field holding the mapping key, e.g. lessonId")
+    parser.add_argument("--key-column", help="CSV column with the keys (default: first column)")
+    parser.add_argument("--value-column", help="CSV column with the values (default: second column)")
+    parser.add_argument("--match", help="Only rewrite old values matching this regular expression")
+    parser.add_argument("--add-missing", action="store_true", help="Also set the field where it is missing")
+    parser.add_argument("--dry-run", action="store_true", help="Report the changes without writing them")
+    parser.add_argument("--workers", type=int, default=DEFAULT_SCAN_WORKERS,
+                        help="Path patterns processed in parallel")
+    parser.add_argument("--resume", action="store_true", help="Continue a failed run from its checkpoint")
+    parser.add_argument("--state-file", default=DEFAULT_CHECKPOINT_FILE, help="Checkpoint file")
+    args = parser.parse_args()
+
+    rules = load_rules(args.rules) if args.rules else []
+    if args.path or args.field:
+        if not (args.path and args.field and (args.value is not None or args.mapping)):
+            parser.error("--path and --field need --value or --mapping")
+        rules.append(rule_from_options(args.path, args.field, value=args.value, mapping_csv=args.mapping,
+                                       key_field=args.key_field, key_column=args.key_column,
+                                       value_column=args.value_column, match=args.match,
+                                       add_missing=args.add_missing))
+    if not rules:
+        parser.error("give --rules or --path/--field")
+
+    db = connect()
+    signature = json.dumps([repr(rule) for rule in rules])
+    checkpoint = MigrationCheckpoint(args.state_file, target=signature, resume=args.resume)
+    limiter = RateLimiter()
+    log_file = f"field_rewrite_changes_{time.strftime('%Y%m%d_%H%M%S')}.jsonl"
+
+    change_log = None if args.dry_run else ChangeLogWriter(log_file)
+    engine = RewriteEngine(db, limiter, change_log, checkpoint, max_workers=args.workers, dry_run=args.dry_run)
+    finished = False
+    try:
+        finished = all(result.complete for result in engine.run(rules))
+    except Exception as e:
+        print(f"Rewrite stopped early: {e}")
+    finally:
+        checkpoint.save(force=True)
+        if change_log:
+            change_log.close()
+
+    print_report(engine.results)
+    limiter.print_stats()
+    if finished and not args.dry_run:
+        # A state file this run neither resumed nor wrote belongs to another rewrite
+        if checkpoint.resumed or checkpoint.saved:
+            checkpoint.clear()
+    elif not args.dry_run:
+        print(f"Progress was saved to {args.state_file}; run again with --resume to continue.")
+    if change_log:
+        print(f"Change log created: {log_file} ({change_log.records_written} records)")
+
+if __name__ == "__main__":
+    main()
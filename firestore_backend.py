@@ -0,0 +1,732 @@
+import bisect
+import copy
+import enum
+import functools
+import os
+import pickle
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Environment variable that selects the database backend for every script
+BACKEND_ENV = "FIRESTORE_BACKEND"
+FIREBASE_BACKEND = "firebase"
+MEMORY_BACKEND = "memory"
+
+DEFAULT_CREDENTIAL_PATHS = [
+    "firebase_config.json",
+    "scripts/firebase_config.json",
+]
+
+class MemoryFirestoreError(Exception):
+    pass
+
+class FailedPrecondition(MemoryFirestoreError):
+    pass
+
+class NotFound(MemoryFirestoreError):
+    pass
+
+class _Sentinel:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+    def __deepcopy__(self, memo):
+        return self
+
+# Sentinel the in-memory backend accepts in update() to remove a field
+MEMORY_DELETE_FIELD = _Sentinel("DELETE_FIELD")
+# Sentinel the in-memory backend replaces with the commit time
+MEMORY_SERVER_TIMESTAMP = _Sentinel("SERVER_TIMESTAMP")
+
+def selected_backend(backend=None):
+    return backend or os.environ.get(BACKEND_ENV, FIREBASE_BACKEND)
+
+def connect(credential_paths=DEFAULT_CREDENTIAL_PATHS, backend=None):
+    """Return a Firestore client for the selected backend.
+
+    FIRESTORE_BACKEND=memory (or backend="memory") returns the process-wide
+    in-memory stand-in, so scripts run without credentials or network.
+    Otherwise firebase_admin is initialised from the first credential file
+    that exists, unless an app is already initialised.
+    """
+    backend = selected_backend(backend)
+    if backend == MEMORY_BACKEND:
+        return memory_client()
+    if backend != FIREBASE_BACKEND:
+        raise ValueError(f"Unknown {BACKEND_ENV} '{backend}', expected '{FIREBASE_BACKEND}' or '{MEMORY_BACKEND}'")
+
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    if not firebase_admin._apps:
+        credential_file = next((path for path in credential_paths if os.path.exists(path)), None)
+        if credential_file is None:
+            raise FileNotFoundError(f"No Firebase credential file found (looked for: {', '.join(credential_paths)})")
+        firebase_admin.initialize_app(credentials.Certificate(credential_file))
+    return firestore.client()
+
+def delete_field_sentinel(db):
+    """The value that removes a field in update() for this client"""
+    if isinstance(db, MemoryFirestore):
+        return MEMORY_DELETE_FIELD
+    from google.cloud import firestore
+    return firestore.DELETE_FIELD
+
+def server_timestamp_sentinel(db):
+    """The value that a write replaces with its commit time for this client"""
+    if isinstance(db, MemoryFirestore):
+        return MEMORY_SERVER_TIMESTAMP
+    from google.cloud import firestore
+    return firestore.SERVER_TIMESTAMP
+
+def precondition_errors():
+    """Exception types raised when a write precondition does not hold"""
+    errors = [FailedPrecondition]
+    try:
+        from google.api_core.exceptions import FailedPrecondition as GoogleFailedPrecondition
+        errors.append(GoogleFailedPrecondition)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+_memory_client = None
+_memory_client_lock = threading.Lock()
+
+def memory_client():
+    """The shared in-memory client, created on first use"""
+    global _memory_client
+    with _memory_client_lock:
+        if _memory_client is None:
+            _memory_client = MemoryFirestore()
+        return _memory_client
+
+# ---------------------------------------------------------------------------
+# In-memory stand-in for the subset of the Firestore client these scripts use
+# ---------------------------------------------------------------------------
+
+_MISSING = object()
+
+def _get_field(data, field_path):
+    value = data
+    for part in field_path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+def _type_rank(value):
+    # Firestore orders values of different types by type first
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, datetime):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, (list, tuple)):
+        return 6
+    if isinstance(value, dict):
+        return 7
+    return 5
+
+def _sort_key(value):
+    if isinstance(value, (list, tuple)):
+        return (_type_rank(value), [_sort_key(v) for v in value])
+    if isinstance(value, dict):
+        return (_type_rank(value), sorted((k, _sort_key(v)) for k, v in value.items()))
+    return (_type_rank(value), value)
+
+def _path_key(path):
+    return tuple(path.split("/"))
+
+def _compare(op, value, operand):
+    if op == "==":
+        return value == operand
+    if op == "!=":
+        return value is not None and value != operand
+    if op == "in":
+        return value in operand
+    if op == "not-in":
+        return value is not None and value not in operand
+    if op == "array-contains":
+        return isinstance(value, list) and operand in value
+    if op == "array-contains-any":
+        return isinstance(value, list) and any(v in value for v in operand)
+    if _type_rank(value) != _type_rank(operand):
+        return False
+    if op == "<":
+        return value < operand
+    if op == "<=":
+        return value <= operand
+    if op == ">":
+        return value > operand
+    if op == ">=":
+        return value >= operand
+    raise ValueError(f"Unsupported operator: {op}")
+
+class MemoryDocumentSnapshot:
+    def __init__(self, reference, data, create_time=None, update_time=None, read_time=None):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self.exists = data is not None
+        self.create_time = create_time
+        self.update_time = update_time
+        self.read_time = read_time
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field_path):
+        value = _get_field(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+class _StoredDocument:
+    # Documents are kept serialised, like on the server: a blob is far smaller
+    # than nested dicts, and decoding one is cheaper than a deep copy
+    __slots__ = ("blob", "create_time", "update_time")
+
+    def __init__(self, data, create_time, update_time):
+        self.blob = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        self.create_time = create_time
+        self.update_time = update_time
+
+    @property
+    def data(self):
+        return pickle.loads(self.blob)
+
+class MemoryFirestore:
+    """Thread-safe in-memory Firestore with RPC and billing counters.
+
+    Implements collection/document/collection_group, get/set/update/delete,
+    queries with where/order_by/limit/start_after/end_before/select/count, batches,
+    get_all, update-time write preconditions and on_snapshot listeners.
+    Counters follow Firestore billing: a query costs one read per returned
+    document (at least one), a listener one read per document in its first
+    snapshot and per added or modified document after that, and every
+    commit, get and query is one RPC.
+    """
+
+    def __init__(self):
+        self._docs = {}
+        # Paths per collection and per collection group, sorted lazily
+        self._members = {}
+        self._sorted = {}
+        self._lock = threading.RLock()
+        self._clock = datetime.now(timezone.utc)
+        self._watches = []
+        self.reset_stats()
+
+    # -- counters ---------------------------------------------------------
+
+    def reset_stats(self):
+        with getattr(self, "_lock", threading.RLock()):
+            self.counters = {"rpcs": 0, "reads": 0, "writes": 0, "deletes": 0,
+                             "gets": 0, "queries": 0, "commits": 0, "aggregations": 0}
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def _count(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self.counters[key] += value
+
+    def _tick(self):
+        # Strictly increasing timestamps, so update-time preconditions are reliable
+        self._clock = max(self._clock + timedelta(microseconds=1), datetime.now(timezone.utc))
+        return self._clock
+
+    # -- references -------------------------------------------------------
+
+    def collection(self, *path):
+        return MemoryCollectionReference(self, "/".join(path))
+
+    def document(self, *path):
+        return MemoryDocumentReference(self, "/".join(path))
+
+    def collection_group(self, collection_id):
+        return MemoryQuery(self, group=collection_id)
+
+    def batch(self):
+        return MemoryWriteBatch(self)
+
+    def write_option(self, last_update_time=None, exists=None):
+        return ("last_update_time", last_update_time) if last_update_time is not None else ("exists", exists)
+
+    def get_all(self, references, field_paths=None):
+        references = list(references)
+        self._count(rpcs=1, gets=1, reads=len(references))
+        for reference in references:
+            yield reference._snapshot(field_paths)
+
+    # -- storage ----------------------------------------------------------
+
+    def _read(self, path):
+        with self._lock:
+            return self._docs.get(path)
+
+    def _commit(self, writes):
+        """Apply (kind, reference, data, option) writes atomically"""
+        self._apply(writes)
+        # Listeners are called after the commit, outside the lock, like Firestore's watch thread
+        for watch in list(self._watches):
+            watch._notify([reference.path for _, reference, _, _ in writes])
+
+    def _apply(self, writes):
+        with self._lock:
+            for kind, reference, data, option in writes:
+                stored = self._docs.get(reference.path)
+                if option is not None:
+                    name, expected = option
+                    if name == "last_update_time" and (stored is None or stored.update_time != expected):
+                        raise FailedPrecondition(f"{reference.path} was modified after {expected}")
+                    if name == "exists" and (stored is not None) != bool(expected):
+                        raise FailedPrecondition(f"{reference.path} existence precondition failed")
+                if kind == "update" and stored is None:
+                    raise NotFound(f"No document to update: {reference.path}")
+
+            now = self._tick()
+            for kind, reference, data, option in writes:
+                stored = self._docs.get(reference.path)
+                if kind == "delete":
+                    if self._docs.pop(reference.path, None) is not None:
+                        self._index(reference.path, add=False)
+                    self.counters["deletes"] += 1
+                    continue
+                data = _resolve_server_timestamps(data, now)
+                if kind == "set":
+                    new_data = data
+                elif kind == "merge":
+                    new_data = stored.data if stored else {}
+                    _deep_merge(new_data, copy.deepcopy(data))
+                else:
+                    new_data = stored.data
+                    for field_path, value in data.items():
+                        _set_field(new_data, field_path, value)
+                self._docs[reference.path] = _StoredDocument(
+                    new_data, stored.create_time if stored else now, now)
+                if stored is None:
+                    self._index(reference.path, add=True)
+                self.counters["writes"] += 1
+            self.counters["rpcs"] += 1
+            self.counters["commits"] += 1
+
+    def _index(self, path, add):
+        collection_path = path.rpartition("/")[0]
+        for key in (("collection", collection_path), ("group", collection_path.rpartition("/")[2])):
+            members = self._members.setdefault(key, set())
+            if add:
+                members.add(path)
+            else:
+                members.discard(path)
+            self._sorted.pop(key, None)
+
+    def _sorted_paths(self, collection_path=None, group=None):
+        """[(path key, path)] of a collection or collection group in document order"""
+        key = ("group", group) if group is not None else ("collection", collection_path)
+        with self._lock:
+            paths = self._sorted.get(key)
+            if paths is None:
+                paths = sorted((_path_key(path), path) for path in self._members.get(key, ()))
+                self._sorted[key] = paths
+            return paths
+
+    def _stored(self, path):
+        return self._docs.get(path)
+
+def _resolve_server_timestamps(data, now):
+    # Top-level fields (field paths in update()) only, which is all these scripts stamp
+    if not any(value is MEMORY_SERVER_TIMESTAMP for value in data.values()):
+        return data
+    return {key: now if value is MEMORY_SERVER_TIMESTAMP else value for key, value in data.items()}
+
+def _deep_merge(target, source):
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _deep_merge(target[key], value)
+        elif value is MEMORY_DELETE_FIELD:
+            target.pop(key, None)
+        else:
+            target[key] = value
+
+def _set_field(data, field_path, value):
+    parts = field_path.split(".")
+    target = data
+    for part in parts[:-1]:
+        if not isinstance(target.get(part), dict):
+            target[part] = {}
+        target = target[part]
+    if value is MEMORY_DELETE_FIELD:
+        target.pop(parts[-1], None)
+    else:
+        target[parts[-1]] = value
+
+class MemoryDocumentReference:
+    def __init__(self, client, path):
+        if path.count("/") % 2 != 1:
+            raise ValueError(f"Not a document path: {path}")
+        self._client = client
+        self.path = path
+        self.id = path.rpartition("/")[2]
+
+    def __eq__(self, other):
+        return isinstance(other, MemoryDocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    @property
+    def parent(self):
+        return MemoryCollectionReference(self._client, self.path.rpartition("/")[0])
+
+    def collection(self, collection_id):
+        return MemoryCollectionReference(self._client, f"{self.path}/{collection_id}")
+
+    def _snapshot(self, field_paths=None):
+        stored = self._client._read(self.path)
+        if stored is None:
+            return MemoryDocumentSnapshot(self, None, read_time=self._client._clock)
+        data = stored.data
+        if field_paths is not None:
+            data = {key: value for key, value in data.items() if key in field_paths}
+        return MemoryDocumentSnapshot(self, data, stored.create_time, stored.update_time, self._client._clock)
+
+    def get(self, field_paths=None):
+        self._client._count(rpcs=1, gets=1, reads=1)
+        return self._snapshot(field_paths)
+
+    def set(self, document_data, merge=False):
+        self._client._commit([("merge" if merge else "set", self, document_data, None)])
+
+    def create(self, document_data):
+        self._client._commit([("set", self, document_data, ("exists", False))])
+
+    def update(self, field_updates, option=None):
+        self._client._commit([("update", self, field_updates, option)])
+
+    def delete(self, option=None):
+        self._client._commit([("delete", self, None, option)])
+
+class MemoryQuery:
+    def __init__(self, client, collection_path=None, group=None, filters=(), orders=(),
+                 limit_count=None, cursor=None, end_cursor=None, projection=None):
+        self._client = client
+        self._collection_path = collection_path
+        self._group = group
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit_count
+        self._cursor = cursor
+        self._end_cursor = end_cursor
+        self._projection = projection
+
+    def _copy(self, **changes):
+        state = dict(collection_path=self._collection_path, group=self._group, filters=self._filters,
+                     orders=self._orders, limit_count=self._limit, cursor=self._cursor,
+                     end_cursor=self._end_cursor, projection=self._projection)
+        state.update(changes)
+        return MemoryQuery(self._client, **state)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction="ASCENDING"):
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._copy(limit_count=count)
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy(cursor=document_fields_or_snapshot)
+
+    def end_before(self, document_fields_or_snapshot):
+        return self._copy(end_cursor=document_fields_or_snapshot)
+
+    def select(self, field_paths):
+        return self._copy(projection=list(field_paths))
+
+    def _order_fields(self):
+        orders = list(self._orders)
+        # Inequality filters imply an order on the filtered field
+        if not orders:
+            for field_path, op, _ in self._filters:
+                if op in ("!=", "<", "<=", ">", ">=", "not-in"):
+                    orders.append((field_path, "ASCENDING"))
+                    break
+        if not any(field == "__name__" for field, _ in orders):
+            orders.append(("__name__", orders[-1][1] if orders else "ASCENDING"))
+        return orders
+
+    def _key(self, path, data, orders):
+        key = []
+        for field_path, direction in orders:
+            value = _path_key(path) if field_path == "__name__" else _sort_key(_get_field(data, field_path))
+            key.append(_Descending(value) if direction == "DESCENDING" else value)
+        return tuple(key)
+
+    def _cursor_key(self, orders, cursor=None):
+        cursor = self._cursor if cursor is None else cursor
+        if hasattr(cursor, "reference"):
+            data = cursor._data or {}
+            return self._key(cursor.reference.path, data, orders)
+        values = []
+        for field_path, direction in orders:
+            value = cursor.get(field_path, _MISSING)
+            if value is _MISSING:
+                break
+            if field_path == "__name__":
+                path = value.path if hasattr(value, "path") else value
+                values.append(_path_key(path))
+            else:
+                values.append(_Descending(_sort_key(value)) if direction == "DESCENDING" else _sort_key(value))
+        return tuple(values)
+
+    def _accepts(self, data, orders):
+        for field_path, op, value in self._filters:
+            field_value = _get_field(data, field_path)
+            if field_value is _MISSING or not _compare(op, field_value, value):
+                return False
+        # Documents without an order-by field are excluded, as in Firestore
+        return all(f == "__name__" or _get_field(data, f) is not _MISSING for f, _ in orders)
+
+    def _matching(self):
+        orders = self._order_fields()
+        paths = self._client._sorted_paths(self._collection_path, self._group)
+        if orders == [("__name__", "ASCENDING")]:
+            return self._matching_in_document_order(paths, orders)
+
+        matches = []
+        for key, path in paths:
+            stored = self._client._stored(path)
+            if stored is None:
+                continue
+            data = stored.data
+            if self._accepts(data, orders):
+                matches.append((self._key(path, data, orders), path, stored, data))
+        matches.sort(key=lambda item: item[0])
+
+        if self._cursor is not None:
+            cursor_key = self._cursor_key(orders)
+            matches = [m for m in matches if m[0][:len(cursor_key)] > cursor_key]
+        if self._end_cursor is not None:
+            end_key = self._cursor_key(orders, self._end_cursor)
+            matches = [m for m in matches if m[0][:len(end_key)] < end_key]
+        if self._limit is not None:
+            matches = matches[:self._limit]
+        return matches
+
+    def _matching_in_document_order(self, paths, orders):
+        # Paths are already sorted: seek to the cursor and stop at the limit
+        start = 0
+        if self._cursor is not None:
+            start = bisect.bisect_right(paths, (self._cursor_key(orders)[0], "\uffff"))
+        end = len(paths)
+        if self._end_cursor is not None:
+            end = bisect.bisect_left(paths, (self._cursor_key(orders, self._end_cursor)[0],))
+        matches = []
+        for index in range(start, end):
+            if self._limit is not None and len(matches) >= self._limit:
+                break
+            key, path = paths[index]
+            stored = self._client._stored(path)
+            if stored is None:
+                continue
+            # Unfiltered scans decode documents only when they are returned
+            data = stored.data if self._filters else None
+            if data is None or self._accepts(data, orders):
+                matches.append(((key,), path, stored, data))
+        return matches
+
+    def stream(self, transaction=None):
+        matches = self._matching()
+        self._client._count(rpcs=1, queries=1, reads=max(1, len(matches)))
+        for _, path, stored, data in matches:
+            if data is None:
+                data = stored.data
+            if self._projection is not None:
+                data = {key: value for key, value in data.items() if key in self._projection}
+            yield MemoryDocumentSnapshot(MemoryDocumentReference(self._client, path), data,
+                                         stored.create_time, stored.update_time, self._client._clock)
+
+    def get(self, transaction=None):
+        return list(self.stream())
+
+    def count(self, alias=None):
+        return _MemoryCountQuery(self)
+
+    def _contains(self, path, stored):
+        """Whether a stored document is in this query's results (ignoring limit and cursor)"""
+        collection_path = path.rpartition("/")[0]
+        if self._group is not None:
+            member = collection_path.rpartition("/")[2] == self._group
+        else:
+            member = collection_path == self._collection_path
+        return member and self._accepts(stored.data, self._order_fields())
+
+    def on_snapshot(self, callback):
+        """Call callback(docs, changes, read_time) now and after every commit that changes the results"""
+        return _MemoryWatch(self, callback)
+
+class ChangeType(enum.Enum):
+    ADDED = 1
+    REMOVED = 2
+    MODIFIED = 3
+
+class _DocumentChange:
+    def __init__(self, change_type, document):
+        self.type = change_type
+        self.document = document
+
+class _MemoryWatch:
+    """Listener from MemoryQuery.on_snapshot; unsubscribe() stops it"""
+
+    def __init__(self, query, callback):
+        self._query = query
+        self._client = query._client
+        self._callback = callback
+        self._lock = threading.Lock()
+        with self._lock:
+            with self._client._lock:
+                matches = self._query._matching()
+                self._client._watches.append(self)
+            self._known = {}
+            changes = []
+            for _, path, stored, data in matches:
+                snapshot = self._snapshot(path, stored)
+                self._known[path] = snapshot
+                changes.append(_DocumentChange(ChangeType.ADDED, snapshot))
+            self._client._count(rpcs=1, queries=1, reads=max(1, len(changes)))
+            self._deliver(changes)
+
+    @property
+    def is_active(self):
+        return self in self._client._watches
+
+    def _snapshot(self, path, stored):
+        data = stored.data
+        if self._query._projection is not None:
+            data = {key: value for key, value in data.items() if key in self._query._projection}
+        return MemoryDocumentSnapshot(MemoryDocumentReference(self._client, path), data,
+                                      stored.create_time, stored.update_time, self._client._clock)
+
+    def _deliver(self, changes):
+        docs = sorted(self._known.values(), key=lambda snapshot: _path_key(snapshot.reference.path))
+        self._callback(docs, changes, self._client._clock)
+
+    def _notify(self, paths):
+        # Compares the current state of each written path, so racing commits still converge
+        with self._lock:
+            changes = []
+            for path in dict.fromkeys(paths):
+                stored = self._client._read(path)
+                known = self._known.get(path)
+                if stored is not None and self._query._contains(path, stored):
+                    if known is not None and known.update_time == stored.update_time:
+                        continue
+                    snapshot = self._snapshot(path, stored)
+                    self._known[path] = snapshot
+                    changes.append(_DocumentChange(ChangeType.MODIFIED if known else ChangeType.ADDED, snapshot))
+                elif known is not None:
+                    del self._known[path]
+                    changes.append(_DocumentChange(ChangeType.REMOVED, known))
+            if not changes:
+                return
+            self._client._count(reads=sum(1 for c in changes if c.type is not ChangeType.REMOVED))
+            self._deliver(changes)
+
+    def unsubscribe(self):
+        with self._client._lock:
+            if self in self._client._watches:
+                self._client._watches.remove(self)
+
+@functools.total_ordering
+class _Descending:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+class _AggregationResult:
+    def __init__(self, alias, value):
+        self.alias = alias
+        self.value = value
+
+class _MemoryCountQuery:
+    def __init__(self, query):
+        self._query = query
+
+    def get(self):
+        count = len(self._query._matching())
+        # Billed as one read per 1000 index entries
+        self._query._client._count(rpcs=1, aggregations=1, reads=max(1, -(-count // 1000)))
+        return [[_AggregationResult("count", count)]]
+
+class MemoryCollectionReference(MemoryQuery):
+    def __init__(self, client, path):
+        if path.count("/") % 2 != 0:
+            raise ValueError(f"Not a collection path: {path}")
+        super().__init__(client, collection_path=path)
+        self.id = path.rpartition("/")[2]
+        self._path = path
+
+    @property
+    def parent(self):
+        parent_path = self._path.rpartition("/")[0]
+        return MemoryDocumentReference(self._client, parent_path) if parent_path else None
+
+    def document(self, document_id=None):
+        return MemoryDocumentReference(self._client, f"{self._path}/{document_id or uuid.uuid4().hex[:20]}")
+
+    def add(self, document_data, document_id=None):
+        reference = self.document(document_id)
+        reference.set(document_data)
+        return self._client._clock, reference
+
+    def list_documents(self):
+        return [MemoryDocumentReference(self._client, path)
+                for _, path in self._client._sorted_paths(self._path)]
+
+class MemoryWriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def __len__(self):
+        return len(self._writes)
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append(("merge" if merge else "set", reference, document_data, None))
+
+    def create(self, reference, document_data):
+        self._writes.append(("set", reference, document_data, ("exists", False)))
+
+    def update(self, reference, field_updates, option=None):
+        self._writes.append(("update", reference, field_updates, option))
+
+    def delete(self, reference, option=None):
+        self._writes.append(("delete", reference, None, option))
+
+    def commit(self):
+        if len(self._writes) > 500:
+            raise MemoryFirestoreError("A batch can contain at most 500 writes")
+        self._client._commit(self._writes)
+        self._writes = []
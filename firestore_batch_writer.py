@@ -0,0 +1,201 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from firestore_backend import precondition_errors, server_timestamp_sentinel
+
+# Raised when an update's last_update_time precondition no longer holds
+PRECONDITION_ERRORS = precondition_errors()
+
+# Firestore rejects write batches with more than 500 operations
+MAX_BATCH_SIZE = 500
+DEFAULT_MAX_WORKERS = 8
+
+# Set to the commit time on every written document; snapshot_cache syncs by it
+UPDATED_AT_FIELD = "updatedAt"
+
+class BatchWriter:
+    """Collect Firestore writes into batches and commit them concurrently.
+
+    Writes are queued with set/update/delete and committed in batches of up to
+    `batch_size` operations. At most `max_workers` commits run at the same time;
+    producers block once that many batches are waiting, so memory stays bounded.
+    When a RateLimiter is given, every commit is paced and retried through it.
+
+    update() accepts a write option such as
+    db.write_option(last_update_time=snapshot.update_time). A batch fails as a
+    whole when one of its preconditions does not hold, so the writes of such a
+    batch are then committed one at a time; documents that were changed by
+    someone else are left alone and listed in `conflicts`.
+
+    Every set() and update() also sets UPDATED_AT_FIELD to the server commit
+    time, unless stamp_updates is False.
+    """
+
+    def __init__(self, db, batch_size=MAX_BATCH_SIZE, max_workers=DEFAULT_MAX_WORKERS, verbose=True,
+                 limiter=None, stamp_updates=True):
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
+        self.db = db
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.verbose = verbose
+        self.limiter = limiter
+        self._timestamp = server_timestamp_sentinel(db) if stamp_updates else None
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Allow one queued batch per worker on top of the running ones
+        self._slots = threading.BoundedSemaphore(max_workers * 2)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._futures = []
+
+        self.batches_committed = 0
+        self.docs_written = 0
+        self.conflicts = []
+        self.batch_latencies = []
+        self.started_at = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._executor.shutdown(wait=True)
+        return False
+
+    def set(self, ref, data, merge=False):
+        self._add(("set", ref, self._stamped(data), merge))
+
+    def update(self, ref, data, option=None):
+        self._add(("update", ref, self._stamped(data), option))
+
+    def _stamped(self, data):
+        if self._timestamp is None:
+            return data
+        return dict(data, **{UPDATED_AT_FIELD: self._timestamp})
+
+    def delete(self, ref):
+        self._add(("delete", ref, None, None))
+
+    def _add(self, op):
+        with self._lock:
+            self._pending.append(op)
+            if len(self._pending) < self.batch_size:
+                return
+            ops, self._pending = self._pending, []
+        self._submit(ops)
+
+    def _submit(self, ops):
+        if not ops:
+            return
+        self._slots.acquire()
+        future = self._executor.submit(self._commit, ops)
+        future.add_done_callback(lambda _: self._slots.release())
+        with self._lock:
+            # Drop finished commits, surfacing the first failure to the producer
+            done = [f for f in self._futures if f.done()]
+            self._futures = [f for f in self._futures if not f.done()]
+            self._futures.append(future)
+        for f in done:
+            f.result()
+
+    def _write_batch(self, ops):
+        # A fresh batch per attempt, so a retried commit never resends stale state
+        batch = self.db.batch()
+        for kind, ref, data, extra in ops:
+            if kind == "set":
+                batch.set(ref, data, merge=extra)
+            elif kind == "update" and extra is not None:
+                batch.update(ref, data, option=extra)
+            elif kind == "update":
+                batch.update(ref, data)
+            else:
+                batch.delete(ref)
+        batch.commit()
+
+    def _run(self, ops):
+        if self.limiter:
+            self.limiter.run(self._write_batch, ops, tokens=len(ops))
+        else:
+            self._write_batch(ops)
+
+    def _commit_individually(self, ops):
+        """Commit ops one by one after a precondition failed; return the number written"""
+        written = 0
+        for op in ops:
+            try:
+                self._run([op])
+                written += 1
+            except PRECONDITION_ERRORS:
+                if op[0] != "update" or op[3] is None:
+                    raise
+                with self._lock:
+                    self.conflicts.append(op[1].path)
+                if self.verbose:
+                    print(f"  Skipped {op[1].path}: modified since it was read")
+        return written
+
+    def _commit(self, ops):
+        start = time.perf_counter()
+        try:
+            self._run(ops)
+            written = len(ops)
+        except PRECONDITION_ERRORS:
+            if not any(kind == "update" and extra is not None for kind, _, _, extra in ops):
+                raise
+            written = self._commit_individually(ops)
+        latency = time.perf_counter() - start
+
+        with self._lock:
+            self.batches_committed += 1
+            self.docs_written += written
+            self.batch_latencies.append(latency)
+            batch_number = self.batches_committed
+
+        if self.verbose:
+            print(f"  Committed batch {batch_number}: {written} writes in {latency * 1000:.1f} ms")
+
+    def flush(self):
+        """Commit any queued writes and wait for all in-flight batches"""
+        with self._lock:
+            ops, self._pending = self._pending, []
+        self._submit(ops)
+
+        with self._lock:
+            futures, self._futures = self._futures, []
+        for f in futures:
+            f.result()
+
+    def close(self):
+        """Flush, shut down the worker pool and return the summary"""
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+        return self.summary()
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started_at
+        latencies = self.batch_latencies
+        return {
+            "batches": self.batches_committed,
+            "docs": self.docs_written,
+            "elapsed_sec": elapsed,
+            "docs_per_sec": self.docs_written / elapsed if elapsed > 0 else 0.0,
+            "avg_batch_ms": (sum(latencies) / len(latencies) * 1000) if latencies else 0.0,
+            "max_batch_ms": max(latencies) * 1000 if latencies else 0.0,
+            "conflicts": len(self.conflicts),
+        }
+
+    def print_summary(self):
+        stats = self.summary()
+        print(f"Wrote {stats['docs']} documents in {stats['batches']} batches "
+              f"({stats['elapsed_sec']:.2f}s, {stats['docs_per_sec']:.1f} docs/sec)")
+        print(f"Batch latency: avg {stats['avg_batch_ms']:.1f} ms, max {stats['max_batch_ms']:.1f} ms")
+        if stats['conflicts']:
+            print(f"Skipped {stats['conflicts']} documents that were modified since they were read")
@@ -0,0 +1,138 @@
+from lesson_iterator import iter_documents, DEFAULT_PAGE_SIZE, DOCUMENT_ID
+
+try:
+    from google.api_core.exceptions import FailedPrecondition
+    # Raised by Firestore when a filtered query needs an index that does not exist
+    INDEX_ERRORS = (FailedPrecondition,)
+except ImportError:
+    INDEX_ERRORS = ()
+
+FILTERED = "filtered"
+SCAN = "scan"
+
+class FieldRewritePlan:
+    """Query plan for finding documents whose `field` should become `target`.
+
+    The filtered strategy pushes `field != target` down to Firestore, so only
+    documents that actually need a write are read. `!=` never matches null,
+    so a `field == null` query runs first to pick those up as well.
+    Firestore cannot match documents where a field is missing, so finding
+    those (include_missing) or rewriting values nested inside arrays needs a
+    full scan, as does any other case the caller explains with
+    `scan_reason`. In every case only the fields needed for the decision are
+    fetched.
+    """
+
+    def __init__(self, source, field, target, include_missing=False, nested=False, extra_fields=(),
+                 page_size=DEFAULT_PAGE_SIZE, scan_reason=None):
+        self.source = source
+        self.page_size = page_size
+        self.field = field
+        self.target = target
+        self.fields = [field.split(".")[0]] + list(extra_fields)
+        self.strategy = SCAN if include_missing or nested or scan_reason else FILTERED
+        self.reason = (scan_reason if scan_reason
+                       else "documents without the field must be found" if include_missing
+                       else "values nested in arrays cannot be filtered" if nested
+                       else f"{field} == null and {field} != target pushed down to Firestore")
+        self.docs_read = 0
+        self.total_docs = None
+
+    def _query(self):
+        query = self.source
+        if self.strategy == FILTERED:
+            query = query.where(self.field, "!=", self.target)
+        return query.select(self.fields)
+
+    def _null_query(self):
+        return self.source.where(self.field, "==", None).select(self.fields)
+
+    def _iter_filtered(self, start_after):
+        # Null values first: a cursor whose field is null is still in that pass
+        if start_after is None or start_after.get(self.field) is None:
+            null_start = None if start_after is None else {DOCUMENT_ID: start_after[DOCUMENT_ID]}
+            yield from iter_documents(self._null_query(), self.page_size, (), null_start)
+            start_after = None
+        yield from iter_documents(self._query(), self.page_size, self._order_fields(), start_after)
+
+    def _order_fields(self):
+        # An inequality filter must also be the first sort order
+        return [self.field] if self.strategy == FILTERED else []
+
+    def stream(self, start_after=None):
+        """Yield the snapshots selected by the plan in pages, counting reads.
+
+        `start_after` is a cursor from cursor_of() to continue after.
+        """
+        if self.strategy == FILTERED:
+            snapshots = self._iter_filtered(start_after)
+        else:
+            snapshots = iter_documents(self._query(), self.page_size, self._order_fields(), start_after)
+        try:
+            for snapshot in snapshots:
+                self.docs_read += 1
+                yield snapshot
+        except INDEX_ERRORS as e:
+            if self.strategy != FILTERED or self.docs_read:
+                raise
+            # A filtered cursor is ordered by value (or is in the null pass), so
+            # documents before its path may not have been handled yet: the scan
+            # starts over, and documents already rewritten are read but not written
+            restart = " from the beginning" if start_after is not None else ""
+            print(f"  Filtered query unavailable ({e}), falling back to a full scan{restart}")
+            self.strategy = SCAN
+            self.reason = "filtered query needs a missing index"
+            yield from self.stream()
+
+    def cursor_of(self, snapshot):
+        """JSON-friendly cursor values that resume this plan right after `snapshot`"""
+        cursor = {field: snapshot.get(field) for field in self._order_fields()}
+        cursor[DOCUMENT_ID] = snapshot.reference.path
+        return cursor
+
+    def count_total(self):
+        """Count the documents in the source with a single aggregation query"""
+        if self.total_docs is None:
+            try:
+                self.total_docs = self.source.count().get()[0][0].value
+            except (AttributeError, IndexError):
+                # Older client libraries have no aggregation queries
+                self.total_docs = None
+        return self.total_docs
+
+    def reads_avoided(self):
+        if self.strategy == SCAN:
+            return 0
+        total = self.count_total()
+        return None if total is None else max(0, total - self.docs_read)
+
+    def describe(self):
+        return f"{self.strategy} ({self.reason})"
+
+def plan_field_rewrite(source, field, target, include_missing=False, nested=False, extra_fields=(),
+                       page_size=DEFAULT_PAGE_SIZE, scan_reason=None):
+    """Choose the cheapest way to find documents that need `field` set to `target`"""
+    return FieldRewritePlan(source, field, target, include_missing=include_missing,
+                            nested=nested, extra_fields=extra_fields, page_size=page_size,
+                            scan_reason=scan_reason)
+
+class ReadSavings:
+    """Totals of documents read and reads avoided across several plans"""
+
+    def __init__(self):
+        self.docs_read = 0
+        self.reads_avoided = 0
+        self.unknown = 0
+
+    def add(self, plan):
+        self.docs_read += plan.docs_read
+        avoided = plan.reads_avoided()
+        if avoided is None:
+            self.unknown += 1
+        else:
+            self.reads_avoided += avoided
+
+    def print_summary(self, label):
+        print(f"{label}: {self.docs_read} documents read, {self.reads_avoided} reads avoided by server-side filtering")
+        if self.unknown:
+            print(f"  ({self.unknown} queries could not be counted)")
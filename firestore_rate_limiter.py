@@ -0,0 +1,118 @@
+import random
+import threading
+import time
+
+try:
+    from google.api_core import exceptions as api_exceptions
+    # gRPC errors that mean "slow down and try again" rather than a bad request
+    RETRYABLE_ERRORS = (
+        api_exceptions.ResourceExhausted,
+        api_exceptions.DeadlineExceeded,
+        api_exceptions.ServiceUnavailable,
+        api_exceptions.Aborted,
+    )
+except ImportError:
+    RETRYABLE_ERRORS = ()
+
+class RateLimiter:
+    """Token bucket that paces Firestore writes and retries transient errors.
+
+    The allowed rate starts at `initial_rate` writes per second and grows by
+    `ramp_factor` after every `ramp_interval` seconds without errors, up to
+    `max_rate`. A retryable gRPC error (RESOURCE_EXHAUSTED, DEADLINE_EXCEEDED,
+    UNAVAILABLE, ABORTED) halves the rate and the call is retried after an
+    exponential backoff with full jitter. The limiter is thread-safe.
+    """
+
+    def __init__(self, initial_rate=100.0, max_rate=500.0, min_rate=1.0,
+                 ramp_factor=1.5, ramp_interval=5.0, max_retries=8,
+                 base_delay=0.5, max_delay=30.0, retryable_errors=RETRYABLE_ERRORS):
+        self.rate = float(initial_rate)
+        self.max_rate = float(max_rate)
+        self.min_rate = float(min_rate)
+        self.ramp_factor = ramp_factor
+        self.ramp_interval = ramp_interval
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable_errors = tuple(retryable_errors)
+
+        self._lock = threading.Lock()
+        self._tokens = self.rate
+        self._last_refill = time.monotonic()
+        self._last_change = self._last_refill
+
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.retry_counts = {}
+        self.throttled_sec = 0.0
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` writes may be sent"""
+        with self._lock:
+            now = time.monotonic()
+            self._maybe_ramp_up(now)
+            # The bucket holds at most one second of writes
+            self._tokens = min(self.rate, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            # Requests larger than the bucket go into debt instead of waiting forever
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.throttled_sec += wait
+        if wait > 0:
+            time.sleep(wait)
+
+    def _maybe_ramp_up(self, now):
+        if now - self._last_change >= self.ramp_interval and self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate * self.ramp_factor)
+            self._last_change = now
+
+    def _back_off(self, error, attempt):
+        name = type(error).__name__
+        with self._lock:
+            self.retries += 1
+            self.retry_counts[name] = self.retry_counts.get(name, 0) + 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+            self._last_change = time.monotonic()
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        print(f"  {name} from Firestore, retrying in {delay:.2f}s (rate now {self.rate:.1f}/s)")
+        time.sleep(delay)
+
+    def run(self, func, *args, tokens=1, **kwargs):
+        """Call `func` once the bucket allows it, retrying transient errors"""
+        attempt = 0
+        while True:
+            self.acquire(tokens)
+            try:
+                result = func(*args, **kwargs)
+            except self.retryable_errors as e:
+                if attempt >= self.max_retries:
+                    with self._lock:
+                        self.failures += 1
+                    raise
+                self._back_off(e, attempt)
+                attempt += 1
+                continue
+            with self._lock:
+                self.calls += 1
+            return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "current_rate": self.rate,
+                "calls": self.calls,
+                "retries": self.retries,
+                "failures": self.failures,
+                "retry_counts": dict(self.retry_counts),
+                "throttled_sec": self.throttled_sec,
+            }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"Rate limiter: {stats['calls']} calls, current rate {stats['current_rate']:.1f} writes/sec, "
+              f"{stats['retries']} retries, {stats['throttled_sec']:.1f}s throttled")
+        for name, count in sorted(stats["retry_counts"].items()):
+            print(f"  {name}: {count}")
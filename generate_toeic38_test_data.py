@@ -1,353 +1,404 @@
-import firebase_admin
-from firebase_admin import credentials
-from firebase_admin import firestore
-import json
-import os
-import random
-import sys
-
-def initialize_firebase():
-    """Initialize Firebase connection"""
-    try:
-        # Check if already initialized
-        try:
-            app = firebase_admin.get_app()
-        except ValueError:
-            # Try different locations for the Firebase config file
-            config_paths = [
-                'firebase_config.json',
-                'scripts/firebase_config.json',
-                os.path.join(os.path.dirname(__file__), 'firebase_config.json')
-            ]
-            
-            config_path = None
-            for path in config_paths:
-                if os.path.exists(path):
-                    config_path = path
-                    break
-                    
-            if not config_path:
-                print("Error: Firebase configuration file not found.")
-                print("Please place firebase_config.json in the current directory or scripts/ folder.")
-                sys.exit(1)
-                
-            cred = credentials.Certificate(config_path)
-            firebase_admin.initialize_app(cred)
-        
-        db = firestore.client()
-        return db
-    except Exception as e:
-        print(f"Error initializing Firebase: {e}")
-        sys.exit(1)
-
-def load_vocabulary_data():
-    """Load vocabulary data from toeic38_vocabulary.json"""
-    try:
-        with open('toeic38_vocabulary.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        print(f"Loaded vocabulary data with {len(data)} lessons")
-        return data
-    except Exception as e:
-        print(f"Error loading vocabulary data: {e}")
-        sys.exit(1)
-
-def create_listening_questions(vocabulary_data):
-    """Create listening test questions based on vocabulary"""
-    listening_questions = []
-    all_vocab = []
-    
-    # Extract all vocabulary items
-    for lesson_id, lesson_data in vocabulary_data.items():
-        for vocab in lesson_data['vocabulary']:
-            all_vocab.append(vocab)
-    
-    # Shuffle to randomize questions
-    random.shuffle(all_vocab)
-    
-    # Create listening questions (listen to audio, select the correct English word)
-    for i, vocab in enumerate(all_vocab[:10]):  # Create 10 questions
-        english_word = vocab['english']
-        vietnamese = vocab['vietnamese']
-        phonetic = vocab.get('phonetic', '')
-        
-        # Create wrong options by selecting random English words
-        wrong_options = []
-        while len(wrong_options) < 3:
-            random_vocab = random.choice(all_vocab)
-            if random_vocab['english'] != english_word and random_vocab['english'] not in wrong_options:
-                wrong_options.append(random_vocab['english'])
-        
-        # Combine correct and wrong options
-        options = [english_word] + wrong_options
-        random.shuffle(options)
-        
-        # Find index of correct answer in shuffled options
-        correct_answer = options.index(english_word)
-        
-        question = {
-            'questionText': "Bạn nghe từ. Chọn từ tiếng Anh đúng với từ bạn vừa nghe.",
-            'options': options,
-            'correctAnswer': correct_answer,
-            'audioUrl': '',  # In a real app, this would be a URL to audio file
-            'explanation': f"Từ bạn nghe là '{english_word}' ({phonetic}) có nghĩa là '{vietnamese}'.",
-            'word': english_word,
-            'phoneticText': phonetic,
-            'questionType': 'listening'
-        }
-        listening_questions.append(question)
-    
-    return listening_questions
-
-def create_reading_questions(vocabulary_data):
-    """Create reading test questions based on vocabulary"""
-    reading_questions = []
-    all_vocab = []
-    
-    # Extract all vocabulary items
-    for lesson_id, lesson_data in vocabulary_data.items():
-        for vocab in lesson_data['vocabulary']:
-            all_vocab.append(vocab)
-    
-    # Shuffle to randomize questions
-    random.shuffle(all_vocab)
-    
-    # Create reading questions (show English word, select Vietnamese meaning)
-    for i, vocab in enumerate(all_vocab[:10]):  # Create 10 questions
-        english_word = vocab['english']
-        correct_vietnamese = vocab['vietnamese']
-        phonetic = vocab.get('phonetic', '')
-        
-        # Create wrong options by selecting random Vietnamese translations
-        wrong_options = []
-        while len(wrong_options) < 3:
-            random_vocab = random.choice(all_vocab)
-            if random_vocab['vietnamese'] != correct_vietnamese and random_vocab['vietnamese'] not in wrong_options:
-                wrong_options.append(random_vocab['vietnamese'])
-        
-        # Combine and shuffle options
-        options = [correct_vietnamese] + wrong_options
-        random.shuffle(options)
-        
-        # Find index of correct answer
-        correct_answer = options.index(correct_vietnamese)
-        
-        question = {
-            'questionText': f"Đâu là nghĩa của '{english_word}' ({phonetic})?",
-            'options': options,
-            'correctAnswer': correct_answer,
-            'explanation': f"'{english_word}' ({phonetic}) có nghĩa là '{correct_vietnamese}'.",
-            'word': english_word,
-            'phoneticText': phonetic,
-            'questionType': 'reading'
-        }
-        reading_questions.append(question)
-    
-    return reading_questions
-
-def create_speaking_questions(vocabulary_data):
-    """Create speaking test questions based on vocabulary"""
-    speaking_questions = []
-    all_vocab = []
-    
-    # Extract all vocabulary items
-    for lesson_id, lesson_data in vocabulary_data.items():
-        for vocab in lesson_data['vocabulary']:
-            all_vocab.append(vocab)
-    
-    # Shuffle to randomize questions
-    random.shuffle(all_vocab)
-    
-    # Speaking questions (repeat pronunciation and use in a sentence)
-    for i, vocab in enumerate(all_vocab[:10]):  # Create 10 questions
-        english_word = vocab['english']
-        vietnamese = vocab['vietnamese']
-        phonetic = vocab.get('phonetic', '')
-        
-        # Create example sentences for the words
-        business_contexts = [
-            f"Please {english_word.lower()} the meeting for tomorrow.",
-            f"We need to {english_word.lower()} our strategy before the deadline.",
-            f"The {english_word.lower()} will be held in the main conference room.",
-            f"Can you {english_word.lower()} this information to the team?",
-            f"Our company {english_word.lower()} requires approval from management."
-        ]
-        
-        example_sentence = random.choice(business_contexts)
-        
-        # For speaking, we provide conversation responses as options
-        options = [
-            f"I can pronounce '{english_word}' correctly.",
-            f"I need more practice with this word.",
-            f"Let me try again with '{english_word}'.",
-            f"I understand how to use '{english_word}' in a sentence."
-        ]
-        
-        question = {
-            'questionText': f"Hãy phát âm từ '{english_word}' ({phonetic}) và sử dụng nó trong câu sau: '{example_sentence}'",
-            'options': options,
-            'correctAnswer': 0,  # First option is always correct for speaking practice
-            'audioUrl': '',  # In a real app, this would be a URL to audio file
-            'explanation': f"'{english_word}' ({phonetic}) có nghĩa là '{vietnamese}'.",
-            'word': english_word,
-            'phoneticText': phonetic,
-            'exampleText': example_sentence,
-            'questionType': 'speaking'
-        }
-        speaking_questions.append(question)
-    
-    return speaking_questions
-
-def create_writing_questions(vocabulary_data):
-    """Create writing test questions based on vocabulary"""
-    writing_questions = []
-    all_vocab = []
-    
-    # Extract all vocabulary items
-    for lesson_id, lesson_data in vocabulary_data.items():
-        for vocab in lesson_data['vocabulary']:
-            all_vocab.append(vocab)
-    
-    # Shuffle to randomize questions
-    random.shuffle(all_vocab)
-    
-    # Writing questions (complete sentences using vocabulary)
-    for i, vocab in enumerate(all_vocab[:10]):  # Create 10 questions
-        english_word = vocab['english']
-        vietnamese = vocab['vietnamese']
-        phonetic = vocab.get('phonetic', '')
-        
-        # Create sentence templates with blanks
-        sentence_templates = [
-            f"We need to _____ a meeting with the clients next week.",
-            f"Please _____ the document before sending it to the manager.",
-            f"The team will _____ the new project next month.",
-            f"Can you _____ this information in your report?",
-            f"Our company needs to _____ new employees for the project."
-        ]
-        
-        sentence = random.choice(sentence_templates)
-        
-        # For writing, options are possible words to complete the sentence
-        options = [english_word]
-        while len(options) < 4:
-            random_vocab = random.choice(all_vocab)
-            if random_vocab['english'] != english_word and random_vocab['english'] not in options:
-                options.append(random_vocab['english'])
-        
-        random.shuffle(options)
-        correct_answer = options.index(english_word)
-        
-        question = {
-            'questionText': f"Hoàn thành câu sau bằng từ vựng phù hợp: '{sentence}'",
-            'options': options,
-            'correctAnswer': correct_answer,
-            'explanation': f"Từ '{english_word}' ({phonetic}) có nghĩa là '{vietnamese}' và phù hợp để điền vào chỗ trống.",
-            'word': english_word,
-            'phoneticText': phonetic,
-            'exampleText': sentence.replace("_____", english_word),
-            'questionType': 'writing'
-        }
-        writing_questions.append(question)
-    
-    return writing_questions
-
-def create_test_data(vocabulary_data):
-    """Create test data structure with all question types"""
-    test_data = {
-        'nameTest': 'TOEIC38 Vocabulary Practice Test',
-        'description': 'Luyện tập từ vựng TOEIC về Business Meetings',
-        'parts': {
-            'part_1': {
-                'title': 'Listening Practice',
-                'description': 'Listen to the word and select the correct meaning',
-                'questions': create_listening_questions(vocabulary_data)
-            },
-            'part_2': {
-                'title': 'Reading Practice',
-                'description': 'Read and understand the vocabulary meaning',
-                'questions': create_reading_questions(vocabulary_data)
-            },
-            'part_3': {
-                'title': 'Writing Practice',
-                'description': 'Complete sentences with appropriate vocabulary',
-                'questions': create_writing_questions(vocabulary_data)
-            },
-            'part_4': {
-                'title': 'Speaking Practice',
-                'description': 'Practice pronunciation and using vocabulary in context',
-                'questions': create_speaking_questions(vocabulary_data)
-            }
-        }
-    }
-    return test_data
-
-def upload_test_data_to_firebase(db, test_data):
-    """Upload test data to Firebase"""
-    try:
-        # Create test document reference
-        test_ref = db.collection('Tests').document('toeic38_test')
-        
-        # Upload main test data (excluding parts)
-        test_info = {
-            'nameTest': test_data['nameTest'],
-            'description': test_data['description'],
-            'courseId': 'toeic38'
-        }
-        test_ref.set(test_info)
-        
-        # Upload each part separately
-        for part_id, part_data in test_data['parts'].items():
-            part_ref = test_ref.collection('Parts').document(part_id)
-            
-            # Add part info without questions
-            part_info = {
-                'title': part_data['title'],
-                'description': part_data['description']
-            }
-            part_ref.set(part_info)
-            
-            # Add questions as subcollection
-            for i, question in enumerate(part_data['questions']):
-                question_ref = part_ref.collection('Questions').document(f'question_{i+1}')
-                question_ref.set(question)
-        
-        print(f"Successfully uploaded test data to Firebase")
-        return True
-    except Exception as e:
-        print(f"Error uploading test data to Firebase: {e}")
-        return False
-
-def save_test_data_locally(test_data):
-    """Save test data to a local JSON file"""
-    try:
-        with open('toeic38_test_data.json', 'w', encoding='utf-8') as f:
-            json.dump(test_data, f, ensure_ascii=False, indent=2)
-        print("Test data saved to toeic38_test_data.json")
-        return True
-    except Exception as e:
-        print(f"Error saving test data locally: {e}")
-        return False
-
-def main():
-    print("Generating test data for TOEIC38 vocabulary...")
-    
-    # Load vocabulary data
-    vocabulary_data = load_vocabulary_data()
-    
-    # Create test data structure
-    test_data = create_test_data(vocabulary_data)
-    
-    # Save test data locally
-    save_test_data_locally(test_data)
-    
-    # Try to initialize Firebase and upload data
-    try:
-        db = initialize_firebase()
-        upload_test_data_to_firebase(db, test_data)
-    except Exception as e:
-        print(f"Failed to connect to Firebase: {e}")
-        print("Test data was saved locally but not uploaded to Firebase.")
-        return
-
-if __name__ == "__main__":
-    main() 
\ No newline at end of file
+import argparse
+import json
+import os
+import random
+import sys
+from firestore_backend import connect
+from firestore_batch_writer import BatchWriter, DEFAULT_MAX_WORKERS
+from distractor_pool import VocabularyPool
+from course_pool import ordered_map, DEFAULT_GENERATION_WORKERS
+
+DEFAULT_COURSE_ID = 'toeic38'
+TOEIC38_VOCABULARY_FILE = 'toeic38_vocabulary.json'
+TOEIC38_TOPIC = 'Business Meetings'
+# Vocabulary and course titles for the rest of the catalog
+VOCABULARY_FILE = 'vocabulary_data.json'
+CATALOG_FILE = 'remaining_courses_with_vocabulary.json'
+QUESTIONS_PER_PART = 10
+
+def initialize_firebase():
+    """Initialize Firebase connection"""
+    try:
+        # Try different locations for the Firebase config file
+        config_paths = [
+            'firebase_config.json',
+            'scripts/firebase_config.json',
+            os.path.join(os.path.dirname(__file__), 'firebase_config.json')
+        ]
+        return connect(config_paths)
+    except FileNotFoundError:
+        print("Error: Firebase configuration file not found.")
+        print("Please place firebase_config.json in the current directory or scripts/ folder.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error initializing Firebase: {e}")
+        sys.exit(1)
+
+def load_vocabulary_data():
+    """Load vocabulary data from toeic38_vocabulary.json"""
+    try:
+        with open('toeic38_vocabulary.json', 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        print(f"Loaded vocabulary data with {len(data)} lessons")
+        return data
+    except Exception as e:
+        print(f"Error loading vocabulary data: {e}")
+        sys.exit(1)
+
+def load_course_vocabularies(course_ids=None, vocabulary_file=VOCABULARY_FILE, catalog_file=CATALOG_FILE):
+    """Vocabulary grouped per course, in the lesson form load_vocabulary_data returns.
+
+    Returns {course_id: {'topic': ..., 'lessons': {lesson_id: {'title', 'vocabulary'}}}}
+    for the given courses, or every course with vocabulary when course_ids
+    is None. toeic38 comes from toeic38_vocabulary.json, the rest from
+    vocabulary_data.json with titles from the course catalog.
+    """
+    catalog = {}
+    if os.path.exists(catalog_file):
+        with open(catalog_file, 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+    
+    courses = {}
+    if os.path.exists(vocabulary_file):
+        with open(vocabulary_file, 'r', encoding='utf-8') as f:
+            words = json.load(f)
+        for word in words:
+            course_id = word['courseId']
+            if course_id not in courses:
+                title = catalog.get(course_id, {}).get('course_data', {}).get('title', course_id)
+                courses[course_id] = {'topic': title.split(': ', 1)[-1], 'lessons': {}}
+            lesson_id = word['lessonId']
+            lessons = courses[course_id]['lessons']
+            if lesson_id not in lessons:
+                lesson_title = catalog.get(course_id, {}).get('lessons', {}).get(lesson_id, {}).get('title', lesson_id)
+                lessons[lesson_id] = {'title': lesson_title, 'vocabulary': []}
+            lessons[lesson_id]['vocabulary'].append(
+                {key: word[key] for key in ('english', 'vietnamese', 'phonetic') if key in word})
+    
+    if os.path.exists(TOEIC38_VOCABULARY_FILE):
+        with open(TOEIC38_VOCABULARY_FILE, 'r', encoding='utf-8') as f:
+            courses[DEFAULT_COURSE_ID] = {'topic': TOEIC38_TOPIC, 'lessons': json.load(f)}
+    
+    if course_ids is None:
+        return dict(sorted(courses.items()))
+    
+    selected = {}
+    for course_id in course_ids:
+        if course_id in courses:
+            selected[course_id] = courses[course_id]
+        else:
+            print(f"No vocabulary found for course {course_id}, skipping it")
+    return selected
+
+def create_listening_questions(vocabulary_data, pool=None, count=QUESTIONS_PER_PART):
+    """Create listening test questions based on vocabulary"""
+    listening_questions = []
+    if pool is None:
+        pool = VocabularyPool.from_lessons(vocabulary_data)
+    
+    # Create listening questions (listen to audio, select the correct English word)
+    for i, vocab in enumerate(pool.pick(count)):  # Create 10 questions by default
+        english_word = vocab['english']
+        vietnamese = vocab['vietnamese']
+        phonetic = vocab.get('phonetic', '')
+        
+        # Correct word plus three other English words, shuffled
+        options, correct_answer = pool.options('english', english_word)
+        
+        question = {
+            'questionText': "Bạn nghe từ. Chọn từ tiếng Anh đúng với từ bạn vừa nghe.",
+            'options': options,
+            'correctAnswer': correct_answer,
+            'audioUrl': '',  # In a real app, this would be a URL to audio file
+            'explanation': f"Từ bạn nghe là '{english_word}' ({phonetic}) có nghĩa là '{vietnamese}'.",
+            'word': english_word,
+            'phoneticText': phonetic,
+            'questionType': 'listening'
+        }
+        listening_questions.append(question)
+    
+    return listening_questions
+
+def create_reading_questions(vocabulary_data, pool=None, count=QUESTIONS_PER_PART):
+    """Create reading test questions based on vocabulary"""
+    reading_questions = []
+    if pool is None:
+        pool = VocabularyPool.from_lessons(vocabulary_data)
+    
+    # Create reading questions (show English word, select Vietnamese meaning)
+    for i, vocab in enumerate(pool.pick(count)):  # Create 10 questions by default
+        english_word = vocab['english']
+        correct_vietnamese = vocab['vietnamese']
+        phonetic = vocab.get('phonetic', '')
+        
+        # Correct meaning plus three other Vietnamese translations, shuffled
+        options, correct_answer = pool.options('vietnamese', correct_vietnamese)
+        
+        question = {
+            'questionText': f"Đâu là nghĩa của '{english_word}' ({phonetic})?",
+            'options': options,
+            'correctAnswer': correct_answer,
+            'explanation': f"'{english_word}' ({phonetic}) có nghĩa là '{correct_vietnamese}'.",
+            'word': english_word,
+            'phoneticText': phonetic,
+            'questionType': 'reading'
+        }
+        reading_questions.append(question)
+    
+    return reading_questions
+
+def create_speaking_questions(vocabulary_data, pool=None, count=QUESTIONS_PER_PART):
+    """Create speaking test questions based on vocabulary"""
+    speaking_questions = []
+    if pool is None:
+        pool = VocabularyPool.from_lessons(vocabulary_data)
+    
+    # Speaking questions (repeat pronunciation and use in a sentence)
+    for i, vocab in enumerate(pool.pick(count)):  # Create 10 questions by default
+        english_word = vocab['english']
+        vietnamese = vocab['vietnamese']
+        phonetic = vocab.get('phonetic', '')
+        
+        # Create example sentences for the words
+        business_contexts = [
+            f"Please {english_word.lower()} the meeting for tomorrow.",
+            f"We need to {english_word.lower()} our strategy before the deadline.",
+            f"The {english_word.lower()} will be held in the main conference room.",
+            f"Can you {english_word.lower()} this information to the team?",
+            f"Our company {english_word.lower()} requires approval from management."
+        ]
+        
+        example_sentence = pool.choice(business_contexts)
+        
+        # For speaking, we provide conversation responses as options
+        options = [
+            f"I can pronounce '{english_word}' correctly.",
+            f"I need more practice with this word.",
+            f"Let me try again with '{english_word}'.",
+            f"I understand how to use '{english_word}' in a sentence."
+        ]
+        
+        question = {
+            'questionText': f"Hãy phát âm từ '{english_word}' ({phonetic}) và sử dụng nó trong câu sau: '{example_sentence}'",
+            'options': options,
+            'correctAnswer': 0,  # First option is always correct for speaking practice
+            'audioUrl': '',  # In a real app, this would be a URL to audio file
+            'explanation': f"'{english_word}' ({phonetic}) có nghĩa là '{vietnamese}'.",
+            'word': english_word,
+            'phoneticText': phonetic,
+            'exampleText': example_sentence,
+            'questionType': 'speaking'
+        }
+        speaking_questions.append(question)
+    
+    return speaking_questions
+
+def create_writing_questions(vocabulary_data, pool=None, count=QUESTIONS_PER_PART):
+    """Create writing test questions based on vocabulary"""
+    writing_questions = []
+    if pool is None:
+        pool = VocabularyPool.from_lessons(vocabulary_data)
+    
+    # Writing questions (complete sentences using vocabulary)
+    for i, vocab in enumerate(pool.pick(count)):  # Create 10 questions by default
+        english_word = vocab['english']
+        vietnamese = vocab['vietnamese']
+        phonetic = vocab.get('phonetic', '')
+        
+        # Create sentence templates with blanks
+        sentence_templates = [
+            f"We need to _____ a meeting with the clients next week.",
+            f"Please _____ the document before sending it to the manager.",
+            f"The team will _____ the new project next month.",
+            f"Can you _____ this information in your report?",
+            f"Our company needs to _____ new employees for the project."
+        ]
+        
+        sentence = pool.choice(sentence_templates)
+        
+        # For writing, options are possible words to complete the sentence
+        options, correct_answer = pool.options('english', english_word)
+        
+        question = {
+            'questionText': f"Hoàn thành câu sau bằng từ vựng phù hợp: '{sentence}'",
+            'options': options,
+            'correctAnswer': correct_answer,
+            'explanation': f"Từ '{english_word}' ({phonetic}) có nghĩa là '{vietnamese}' và phù hợp để điền vào chỗ trống.",
+            'word': english_word,
+            'phoneticText': phonetic,
+            'exampleText': sentence.replace("_____", english_word),
+            'questionType': 'writing'
+        }
+        writing_questions.append(question)
+    
+    return writing_questions
+
+def create_test_data(vocabulary_data, course_id=DEFAULT_COURSE_ID, topic=TOEIC38_TOPIC, seed=None):
+    """Create test data structure with all question types.
+    
+    The vocabulary is pooled once for all four parts. With a seed the test
+    is the same on every run; each course gets its own seeded generator.
+    """
+    pool = VocabularyPool.seeded(vocabulary_data, seed, course_id)
+    test_data = {
+        'testId': f'{course_id}_test',
+        'courseId': course_id,
+        'nameTest': f'{course_id.upper()} Vocabulary Practice Test',
+        'description': f'Luyện tập từ vựng TOEIC về {topic}',
+        'parts': {
+            'part_1': {
+                'title': 'Listening Practice',
+                'description': 'Listen to the word and select the correct meaning',
+                'questions': create_listening_questions(vocabulary_data, pool)
+            },
+            'part_2': {
+                'title': 'Reading Practice',
+                'description': 'Read and understand the vocabulary meaning',
+                'questions': create_reading_questions(vocabulary_data, pool)
+            },
+            'part_3': {
+                'title': 'Writing Practice',
+                'description': 'Complete sentences with appropriate vocabulary',
+                'questions': create_writing_questions(vocabulary_data, pool)
+            },
+            'part_4': {
+                'title': 'Speaking Practice',
+                'description': 'Practice pronunciation and using vocabulary in context',
+                'questions': create_speaking_questions(vocabulary_data, pool)
+            }
+        }
+    }
+    return test_data
+
+def _course_test_task(task):
+    # Module-level so it can run on a process pool
+    course_id, course, seed = task
+    return create_test_data(course['lessons'], course_id, course['topic'], seed=seed)
+
+def iter_test_data(courses, seed, max_workers=DEFAULT_GENERATION_WORKERS):
+    """Yield the test of every course in `courses`, in order, generated on a process pool.
+
+    Every course is seeded from `seed` and its course ID, so the tests are
+    the same whatever the number of workers.
+    """
+    tasks = ((course_id, course, seed) for course_id, course in courses.items())
+    yield from ordered_map(_course_test_task, tasks, max_workers)
+
+def write_test_data(writer, db, test_data):
+    """Queue the test header, its parts and their questions on a BatchWriter; return the document count"""
+    test_id = test_data.get('testId', f'{DEFAULT_COURSE_ID}_test')
+    test_ref = db.collection('Tests').document(test_id)
+    
+    # Main test data (excluding parts). Merged, so the header the course
+    # uploader keeps in the same document is not wiped out.
+    test_info = {
+        'nameTest': test_data['nameTest'],
+        'description': test_data['description'],
+        'courseId': test_data.get('courseId', DEFAULT_COURSE_ID)
+    }
+    writer.set(test_ref, test_info, merge=True)
+    written = 1
+    
+    # Each part with its questions as a subcollection
+    for part_id, part_data in test_data['parts'].items():
+        part_ref = test_ref.collection('Parts').document(part_id)
+        writer.set(part_ref, {
+            'title': part_data['title'],
+            'description': part_data['description']
+        })
+        written += 1
+        
+        for i, question in enumerate(part_data['questions']):
+            writer.set(part_ref.collection('Questions').document(f'question_{i+1}'), question)
+            written += 1
+    return written
+
+def upload_test_data_to_firebase(db, test_data, max_workers=DEFAULT_MAX_WORKERS):
+    """Upload one test, or a list of tests, to Firebase.
+
+    All documents go through one BatchWriter: batches of up to 500 writes
+    committed by up to `max_workers` threads at once. Tests may be a
+    generator, so uploading starts while later tests are still generated.
+    """
+    tests = [test_data] if isinstance(test_data, dict) else test_data
+    try:
+        uploaded = 0
+        # Leaving the block flushes the writer, or shuts its threads down after an error
+        with BatchWriter(db, max_workers=max_workers, verbose=False) as writer:
+            for test in tests:
+                written = write_test_data(writer, db, test)
+                uploaded += 1
+                print(f"Queued test {test.get('testId', DEFAULT_COURSE_ID + '_test')}: {written} documents")
+        print(f"Successfully uploaded {uploaded} tests to Firebase")
+        writer.print_summary()
+        return True
+    except Exception as e:
+        print(f"Error uploading test data to Firebase: {e}")
+        return False
+
+def save_test_data_locally(test_data, output_dir='.'):
+    """Save test data to <courseId>_test_data.json"""
+    file_path = os.path.join(output_dir, f"{test_data.get('courseId', DEFAULT_COURSE_ID)}_test_data.json")
+    try:
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(test_data, f, ensure_ascii=False, indent=2)
+        print(f"Test data saved to {file_path}")
+        return True
+    except Exception as e:
+        print(f"Error saving test data locally: {e}")
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate vocabulary practice tests and upload them to Firebase")
+    parser.add_argument("courses", nargs="*", default=[DEFAULT_COURSE_ID],
+                        help=f"Course IDs to build tests for (default: {DEFAULT_COURSE_ID})")
+    parser.add_argument("--all", action="store_true", help="Build tests for every course with vocabulary")
+    parser.add_argument("--output-dir", default=".", help="Where the <courseId>_test_data.json files are saved")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="Maximum number of batch commits running at the same time")
+    parser.add_argument("--no-upload", action="store_true", help="Only save the tests locally")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Random seed for test generation (same seed gives the same tests)")
+    parser.add_argument("--gen-workers", type=int, default=DEFAULT_GENERATION_WORKERS,
+                        help="Processes generating tests in parallel (the tests don't depend on it)")
+    args = parser.parse_args()
+    
+    if args.courses == [DEFAULT_COURSE_ID] and not args.all:
+        print("Generating test data for TOEIC38 vocabulary...")
+        courses = {DEFAULT_COURSE_ID: {'topic': TOEIC38_TOPIC, 'lessons': load_vocabulary_data()}}
+    else:
+        courses = load_course_vocabularies(None if args.all else args.courses)
+        print(f"Generating test data for {len(courses)} courses...")
+    if not courses:
+        return
+    os.makedirs(args.output_dir, exist_ok=True)
+    
+    if args.seed is None:
+        args.seed = random.randrange(2**32)
+        print(f"Test generation seed: {args.seed} (pass --seed {args.seed} to get the same tests again)")
+    
+    def generate_tests():
+        # Each test is saved as soon as it and the ones before it are done
+        for test_data in iter_test_data(courses, args.seed, args.gen_workers):
+            save_test_data_locally(test_data, args.output_dir)
+            yield test_data
+    
+    if args.no_upload:
+        for _ in generate_tests():
+            pass
+        return
+    
+    # Try to initialize Firebase and upload data
+    try:
+        db = initialize_firebase()
+    except SystemExit:
+        # initialize_firebase has already printed why
+        for _ in generate_tests():
+            pass
+        print("Test data was saved locally but not uploaded to Firebase.")
+        return
+    # Tests are generated while earlier ones are being committed
+    upload_test_data_to_firebase(db, generate_tests(), max_workers=args.workers)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,212 +1,435 @@
-import json
-import os
-
-# Define the path to the Android app's assets folder
-ANDROID_ASSETS_PATH = "app/src/main/assets/"
-
-def create_android_vocabulary_data():
-    """Format vocabulary data for Android app"""
-    # Check if the vocabulary JSON file exists
-    if not os.path.exists("toeic38_vocabulary.json"):
-        print("Error: toeic38_vocabulary.json file not found!")
-        print("Please run fetch_toeic38_vocabulary.py first.")
-        return False
-    
-    try:
-        # Load the TOEIC38 vocabulary data
-        with open("toeic38_vocabulary.json", "r", encoding="utf-8") as f:
-            toeic38_data = json.load(f)
-        
-        print(f"Loaded vocabulary data for {len(toeic38_data)} lessons")
-        
-        # Create the assets directory if it doesn't exist
-        os.makedirs(ANDROID_ASSETS_PATH, exist_ok=True)
-        
-        # Process vocabulary data for each lesson
-        all_vocabulary = []
-        course_id = "toeic38"
-        
-        for lesson_id, lesson_data in toeic38_data.items():
-            lesson_vocabulary = []
-            title = lesson_data.get("title", f"Lesson {lesson_id}")
-            
-            # Process each vocabulary item
-            for item in lesson_data.get("vocabulary", []):
-                english = item.get("english", "")
-                vietnamese = item.get("vietnamese", "")
-                phonetic = item.get("phonetic", "")
-                
-                if not english or not vietnamese:
-                    continue
-                
-                vocab_item = {
-                    "english": english.strip(),
-                    "vietnamese": vietnamese.strip(),
-                    "phonetic": phonetic.strip(),
-                    "isSelected": False
-                }
-                
-                lesson_vocabulary.append(vocab_item)
-            
-            # Create lesson-specific vocabulary file
-            lesson_output = {
-                "lessonId": lesson_id,
-                "courseId": course_id,
-                "title": title,
-                "vocabulary": lesson_vocabulary
-            }
-            
-            # Save lesson vocabulary to a separate file in assets
-            lesson_filename = f"{ANDROID_ASSETS_PATH}{lesson_id}_vocabulary.json"
-            with open(lesson_filename, "w", encoding="utf-8") as f:
-                json.dump(lesson_output, f, ensure_ascii=False, indent=2)
-            
-            print(f"Created vocabulary file for {title} with {len(lesson_vocabulary)} words")
-            
-            # Add vocabulary to the complete list
-            for item in lesson_vocabulary:
-                item_with_ids = item.copy()
-                item_with_ids["lessonId"] = lesson_id
-                item_with_ids["courseId"] = course_id
-                all_vocabulary.append(item_with_ids)
-        
-        # Create a combined file with all vocabulary
-        all_vocab_output = {
-            "courseId": course_id,
-            "title": "TOEIC Advanced: Essential Meeting Vocabulary",
-            "vocabulary": all_vocabulary
-        }
-        
-        combined_filename = f"{ANDROID_ASSETS_PATH}toeic38_all_vocabulary.json"
-        with open(combined_filename, "w", encoding="utf-8") as f:
-            json.dump(all_vocab_output, f, ensure_ascii=False, indent=2)
-        
-        print(f"Created combined vocabulary file with {len(all_vocabulary)} words")
-        
-        # Create a snippet of code to load this vocabulary in VocabularyActivity
-        create_code_snippet()
-        
-        return True
-        
-    except Exception as e:
-        print(f"Error creating Android vocabulary data: {e}")
-        return False
-
-def create_code_snippet():
-    """Create a code snippet to load the vocabulary data in the Android app"""
-    code_snippet = """
-    // Method to load TOEIC38 vocabulary from assets
-    private void loadToeic38VocabularyFromAssets() {
-        try {
-            // Determine the appropriate file to load based on lessonId
-            String assetFileName;
-            if (lessonId != null) {
-                assetFileName = lessonId + "_vocabulary.json";
-            } else {
-                assetFileName = "toeic38_all_vocabulary.json";
-            }
-            
-            Log.d(TAG, "Loading vocabulary from assets: " + assetFileName);
-            
-            // Load vocabulary from assets
-            String jsonString = loadJSONFromAsset(assetFileName);
-            if (jsonString == null) {
-                // Try the combined file if specific lesson file not found
-                jsonString = loadJSONFromAsset("toeic38_all_vocabulary.json");
-                if (jsonString == null) {
-                    Log.e(TAG, "Could not load vocabulary from assets");
-                    loadSampleVocabulary();
-                    return;
-                }
-            }
-            
-            // Parse JSON
-            JSONObject jsonObject = new JSONObject(jsonString);
-            
-            // If lesson-specific file, extract vocabulary array
-            if (lessonId != null && jsonObject.has("vocabulary")) {
-                JSONArray vocabularyArray = jsonObject.getJSONArray("vocabulary");
-                parseVocabularyArray(vocabularyArray);
-            } 
-            // If all vocabulary file, filter by lessonId
-            else if (jsonObject.has("vocabulary")) {
-                JSONArray allVocabulary = jsonObject.getJSONArray("vocabulary");
-                List<VocabularyItem> filteredList = new ArrayList<>();
-                
-                for (int i = 0; i < allVocabulary.length(); i++) {
-                    JSONObject item = allVocabulary.getJSONObject(i);
-                    if (lessonId == null || lessonId.equals(item.optString("lessonId"))) {
-                        VocabularyItem vocabItem = new VocabularyItem(
-                            item.optString("english", ""),
-                            item.optString("vietnamese", ""),
-                            item.optString("phonetic", "")
-                        );
-                        filteredList.add(vocabItem);
-                    }
-                }
-                
-                if (!filteredList.isEmpty()) {
-                    vocabularyList.clear();
-                    vocabularyList.addAll(filteredList);
-                    updateVocabularyUI();
-                    return;
-                }
-            }
-            
-            // If we couldn't load or parse the vocabulary, load sample data
-            if (vocabularyList.isEmpty()) {
-                loadSampleVocabulary();
-            }
-        } catch (Exception e) {
-            Log.e(TAG, "Error loading vocabulary from assets: " + e.getMessage());
-            loadSampleVocabulary();
-        }
-    }
-    
-    private void parseVocabularyArray(JSONArray vocabularyArray) throws JSONException {
-        vocabularyList.clear();
-        
-        for (int i = 0; i < vocabularyArray.length(); i++) {
-            JSONObject item = vocabularyArray.getJSONObject(i);
-            VocabularyItem vocabItem = new VocabularyItem(
-                item.optString("english", ""),
-                item.optString("vietnamese", ""),
-                item.optString("phonetic", "")
-            );
-            vocabularyList.add(vocabItem);
-        }
-        
-        updateVocabularyUI();
-    }
-    
-    private String loadJSONFromAsset(String fileName) {
-        String json = null;
-        try {
-            InputStream is = getAssets().open(fileName);
-            int size = is.available();
-            byte[] buffer = new byte[size];
-            is.read(buffer);
-            is.close();
-            json = new String(buffer, "UTF-8");
-        } catch (IOException e) {
-            Log.e(TAG, "Error loading JSON from assets: " + e.getMessage());
-            return null;
-        }
-        return json;
-    }
-    """
-    
-    # Write the code snippet to a file
-    with open("load_toeic38_vocabulary_code.java", "w", encoding="utf-8") as f:
-        f.write(code_snippet)
-    
-    print("Created Java code snippet in load_toeic38_vocabulary_code.java")
-    print("You can copy this code into VocabularyActivity.java")
-
-if __name__ == "__main__":
-    print("Creating vocabulary data files for Android app...")
-    if create_android_vocabulary_data():
-        print("\nSuccess! Vocabulary files have been created in the Android assets folder.")
-        print("You can now implement the code to load these files in your VocabularyActivity.")
-    else:
-        print("\nFailed to create vocabulary files. Please check the error messages above.") 
\ No newline at end of file
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from vocabulary_asset_db import (build_vocabulary_database, clean_vocabulary_item, load_vocabulary_snapshot,
+                                 load_local_courses, DEFAULT_DATABASE_FILE, VERSION_SUFFIX)
+
+# Define the path to the Android app's assets folder
+ANDROID_ASSETS_PATH = "app/src/main/assets/"
+DATABASE_CODE_FILE = "vocabulary_database_helper.java"
+# Folder under the assets holding the lesson shards and their manifest
+SHARD_DIRECTORY = "vocabulary"
+SHARD_MANIFEST_FILE = "manifest.json"
+# Hex digits of the content hash used in shard names
+SHARD_HASH_LENGTH = 16
+
+def load_courses(snapshot_file=None, course_ids=None):
+    """Courses to put in the assets, from a snapshot or the local vocabulary files; None if missing"""
+    if snapshot_file:
+        if not os.path.exists(snapshot_file):
+            print(f"Error: {snapshot_file} not found!")
+            print("Please run fetch_toeic38_vocabulary.py --all first.")
+            return None
+        courses = load_vocabulary_snapshot(snapshot_file)
+        if course_ids:
+            courses = {course_id: courses[course_id] for course_id in course_ids if course_id in courses}
+    else:
+        courses = load_local_courses(course_ids)
+    
+    if not courses:
+        print("Error: no vocabulary found to put in the assets.")
+        return None
+    return courses
+
+def create_android_vocabulary_database(snapshot_file=None, course_ids=None):
+    """Build one SQLite vocabulary asset for all courses (or `course_ids`) and its Java helper"""
+    courses = load_courses(snapshot_file, course_ids)
+    if courses is None:
+        return False
+    
+    os.makedirs(ANDROID_ASSETS_PATH, exist_ok=True)
+    database_path = os.path.join(ANDROID_ASSETS_PATH, DEFAULT_DATABASE_FILE)
+    lessons, words, version = build_vocabulary_database(courses, database_path)
+    size_kb = os.path.getsize(database_path) / 1024
+    print(f"Created {database_path} with {len(courses)} courses, {lessons} lessons and {words} words "
+          f"({size_kb:.0f} KB, version {version})")
+    
+    create_database_code_snippet()
+    return True
+
+def lesson_shard(course_id, lesson_id, lesson, compress=True):
+    """(file name, bytes, word count) of one lesson's shard: minified JSON, gzipped unless compress is False.
+
+    The name is a hash of the JSON, so a lesson keeps its file until its
+    vocabulary or title changes. gzip's timestamp is fixed at 0 so the same
+    JSON always compresses to the same bytes.
+    """
+    vocabulary = []
+    for word in map(clean_vocabulary_item, lesson.get("vocabulary", [])):
+        if word:
+            english, vietnamese, phonetic, _ = word
+            vocabulary.append({"english": english, "vietnamese": vietnamese, "phonetic": phonetic})
+    
+    data = json.dumps({"lessonId": lesson_id, "courseId": course_id, "title": lesson.get("title") or lesson_id,
+                       "vocabulary": vocabulary},
+                      ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    name = hashlib.sha256(data).hexdigest()[:SHARD_HASH_LENGTH] + ".json"
+    if compress:
+        return name + ".gz", gzip.compress(data, compresslevel=9, mtime=0), len(vocabulary)
+    return name, data, len(vocabulary)
+
+def write_if_changed(path, data):
+    """Write `data` to `path` unless the file already holds exactly that; return True if written"""
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+def create_android_vocabulary_data(snapshot_file=None, course_ids=None, compress=True):
+    """Write every lesson's vocabulary as a content-addressed shard plus a manifest.
+
+    Shards go to assets/vocabulary/, named by the hash of their content;
+    manifest.json maps courses[courseId].lessons[lessonId] to its shard,
+    with course and lesson titles (lesson IDs are only unique within a
+    course). Shards that already exist are not rewritten and shards no lesson
+    uses any more are removed, so rebuilding after one lesson changed
+    touches that lesson's shard and the manifest only.
+    """
+    courses = load_courses(snapshot_file, course_ids)
+    if courses is None:
+        return False
+    
+    shard_dir = os.path.join(ANDROID_ASSETS_PATH, SHARD_DIRECTORY)
+    os.makedirs(shard_dir, exist_ok=True)
+    manifest = {"courses": {}}
+    in_use = set()
+    written = unchanged = total_bytes = word_count = lesson_count = 0
+    
+    for course_id, course in sorted(courses.items()):
+        lessons = sorted(course["lessons"].items(), key=lambda pair: pair[1].get("lessonNumber") or 0)
+        entries = {}
+        manifest["courses"][course_id] = {"title": course.get("title") or course_id, "lessons": entries}
+        for number, (lesson_id, lesson) in enumerate(lessons, 1):
+            name, data, words = lesson_shard(course_id, lesson_id, lesson, compress)
+            entries[lesson_id] = {"title": lesson.get("title") or lesson_id,
+                                  "lessonNumber": lesson.get("lessonNumber") or number, "shard": name, "words": words}
+            in_use.add(name)
+            lesson_count += 1
+            if write_if_changed(os.path.join(shard_dir, name), data):
+                written += 1
+            else:
+                unchanged += 1
+            total_bytes += len(data)
+            word_count += words
+    
+    # Shards of lessons that changed or were dropped
+    removed = 0
+    for name in os.listdir(shard_dir):
+        if name != SHARD_MANIFEST_FILE and name not in in_use:
+            os.remove(os.path.join(shard_dir, name))
+            removed += 1
+    
+    manifest_data = json.dumps(manifest, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    manifest_written = write_if_changed(os.path.join(shard_dir, SHARD_MANIFEST_FILE), manifest_data)
+    
+    print(f"{lesson_count} lessons, {word_count} words in {shard_dir}: "
+          f"{written} shards written, {unchanged} unchanged, {removed} removed, "
+          f"manifest {'updated' if manifest_written else 'unchanged'}")
+    print(f"Vocabulary payload: {(total_bytes + len(manifest_data)) / 1024:.0f} KB")
+    
+    create_code_snippet()
+    return True
+
+def create_code_snippet():
+    """Create a code snippet to load the vocabulary shards in the Android app"""
+    code_snippet = """
+    // Vocabulary shards: %(directory)s/%(manifest)s maps courses.{courseId}.lessons.{lessonId} to its shard file
+    // (lesson IDs are only unique within a course)
+    private static final String VOCABULARY_DIR = "%(directory)s/";
+    private JSONObject vocabularyManifest;
+
+    // Method to load vocabulary from assets: the current lesson, or every lesson of the course without a lessonId
+    private void loadToeic38VocabularyFromAssets() {
+        try {
+            JSONObject course = loadVocabularyManifest().getJSONObject("courses").optJSONObject(courseId);
+            List<VocabularyItem> items = new ArrayList<>();
+            
+            if (course != null) {
+                JSONObject lessons = course.getJSONObject("lessons");
+                if (lessonId != null) {
+                    if (lessons.has(lessonId)) {
+                        items.addAll(loadVocabularyShard(lessons.getJSONObject(lessonId).getString("shard")));
+                    }
+                } else {
+                    List<JSONObject> courseLessons = new ArrayList<>();
+                    Iterator<String> lessonIds = lessons.keys();
+                    while (lessonIds.hasNext()) {
+                        courseLessons.add(lessons.getJSONObject(lessonIds.next()));
+                    }
+                    Collections.sort(courseLessons, (a, b) ->
+                        Integer.compare(a.optInt("lessonNumber"), b.optInt("lessonNumber")));
+                    for (JSONObject lesson : courseLessons) {
+                        items.addAll(loadVocabularyShard(lesson.getString("shard")));
+                    }
+                }
+            }
+            
+            Log.d(TAG, "Loaded " + items.size() + " vocabulary items from assets");
+            if (items.isEmpty()) {
+                loadSampleVocabulary();
+                return;
+            }
+            vocabularyList.clear();
+            vocabularyList.addAll(items);
+            updateVocabularyUI();
+        } catch (Exception e) {
+            Log.e(TAG, "Error loading vocabulary from assets: " + e.getMessage());
+            loadSampleVocabulary();
+        }
+    }
+    
+    private JSONObject loadVocabularyManifest() throws IOException, JSONException {
+        if (vocabularyManifest == null) {
+            vocabularyManifest = new JSONObject(readAsset(VOCABULARY_DIR + "%(manifest)s"));
+        }
+        return vocabularyManifest;
+    }
+    
+    private List<VocabularyItem> loadVocabularyShard(String shard) throws IOException, JSONException {
+        JSONArray vocabularyArray = new JSONObject(readAsset(VOCABULARY_DIR + shard)).getJSONArray("vocabulary");
+        List<VocabularyItem> items = new ArrayList<>();
+        for (int i = 0; i < vocabularyArray.length(); i++) {
+            JSONObject item = vocabularyArray.getJSONObject(i);
+            items.add(new VocabularyItem(
+                item.optString("english", ""),
+                item.optString("vietnamese", ""),
+                item.optString("phonetic", "")
+            ));
+        }
+        return items;
+    }
+    
+    // Reads a whole asset as UTF-8, gunzipping .gz files
+    private String readAsset(String fileName) throws IOException {
+        try (InputStream asset = getAssets().open(fileName);
+             InputStream in = fileName.endsWith(".gz") ? new GZIPInputStream(asset) : asset) {
+            ByteArrayOutputStream out = new ByteArrayOutputStream();
+            byte[] buffer = new byte[8192];
+            int read;
+            while ((read = in.read(buffer)) != -1) {
+                out.write(buffer, 0, read);
+            }
+            return out.toString("UTF-8");
+        }
+    }
+    
+    // Imports: java.io.ByteArrayOutputStream, java.util.Collections, java.util.Iterator,
+    // java.util.zip.GZIPInputStream
+    """ % {"directory": SHARD_DIRECTORY, "manifest": SHARD_MANIFEST_FILE}
+    
+    # Write the code snippet to a file
+    with open("load_toeic38_vocabulary_code.java", "w", encoding="utf-8") as f:
+        f.write(code_snippet)
+    
+    print("Created Java code snippet in load_toeic38_vocabulary_code.java")
+    print("You can copy this code into VocabularyActivity.java")
+
+def create_database_code_snippet():
+    """Write the Java helper that copies the database asset and queries it off the UI thread"""
+    code_snippet = """package com.example.englishlearningapp.Utils;
+
+import android.content.Context;
+import android.database.Cursor;
+import android.database.sqlite.SQLiteDatabase;
+import android.os.Handler;
+import android.os.Looper;
+import android.util.Log;
+
+import com.example.englishlearningapp.Models.VocabularyItem;
+
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.FileOutputStream;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.InputStreamReader;
+import java.io.OutputStream;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+
+/**
+ * Read-only access to the bundled vocabulary database (assets/%(database)s).
+ *
+ * The asset is copied to the app's database folder the first time and again
+ * whenever assets/%(database)s%(suffix)s holds a different version. Lessons
+ * are read through the (course_id, lesson_id) and lesson_key indexes and
+ * searches use the vocabulary_fts table. Queries run on a background thread and
+ * results are delivered on the main thread.
+ */
+public class VocabularyDatabase {
+    private static final String TAG = "VocabularyDatabase";
+    private static final String DATABASE_NAME = "%(database)s";
+    private static final String VERSION_ASSET = DATABASE_NAME + "%(suffix)s";
+
+    public interface Callback {
+        void onLoaded(List<VocabularyItem> items);
+        void onError(Exception e);
+    }
+
+    private static VocabularyDatabase instance;
+
+    private final Context context;
+    private final ExecutorService executor = Executors.newSingleThreadExecutor();
+    private final Handler mainHandler = new Handler(Looper.getMainLooper());
+    private SQLiteDatabase database;
+
+    public static synchronized VocabularyDatabase getInstance(Context context) {
+        if (instance == null) {
+            instance = new VocabularyDatabase(context.getApplicationContext());
+        }
+        return instance;
+    }
+
+    private VocabularyDatabase(Context context) {
+        this.context = context;
+    }
+
+    /** Vocabulary of one lesson, in lesson order (lesson IDs are only unique within a course) */
+    public void loadLesson(String courseId, String lessonId, Callback callback) {
+        query("SELECT v.english, v.vietnamese, v.phonetic FROM lessons l "
+              + "JOIN vocabulary v ON v.lesson_key = l._id "
+              + "WHERE l.course_id = ? AND l.lesson_id = ? ORDER BY v.position",
+              new String[]{courseId, lessonId}, callback);
+    }
+
+    /** Words whose English or Vietnamese text starts with `text` (accents ignored) */
+    public void search(String text, int limit, Callback callback) {
+        // Only letters and digits reach MATCH, so user input can't form FTS syntax
+        String words = text.replaceAll("[^\\\\p{L}\\\\p{N}]+", " ").trim();
+        if (words.isEmpty()) {
+            mainHandler.post(() -> callback.onLoaded(new ArrayList<>()));
+            return;
+        }
+        String match = words + "*";
+        query("SELECT v.english, v.vietnamese, v.phonetic FROM vocabulary_fts "
+              + "JOIN vocabulary v ON v._id = vocabulary_fts.docid "
+              + "WHERE vocabulary_fts MATCH ? LIMIT " + limit,
+              new String[]{match}, callback);
+    }
+
+    private void query(String sql, String[] args, Callback callback) {
+        executor.execute(() -> {
+            List<VocabularyItem> items = new ArrayList<>();
+            try (Cursor cursor = open().rawQuery(sql, args)) {
+                while (cursor.moveToNext()) {
+                    items.add(new VocabularyItem(cursor.getString(0), cursor.getString(1), cursor.getString(2)));
+                }
+                mainHandler.post(() -> callback.onLoaded(items));
+            } catch (Exception e) {
+                Log.e(TAG, "Error querying vocabulary database: " + e.getMessage());
+                mainHandler.post(() -> callback.onError(e));
+            }
+        });
+    }
+
+    // Called on the executor thread only
+    private SQLiteDatabase open() throws IOException {
+        if (database == null) {
+            File file = context.getDatabasePath(DATABASE_NAME);
+            int assetVersion = readAssetVersion();
+            if (!file.exists() || installedVersion(file) != assetVersion) {
+                copyAsset(file);
+            }
+            database = SQLiteDatabase.openDatabase(file.getPath(), null, SQLiteDatabase.OPEN_READONLY);
+        }
+        return database;
+    }
+
+    private int readAssetVersion() throws IOException {
+        try (BufferedReader reader = new BufferedReader(
+                new InputStreamReader(context.getAssets().open(VERSION_ASSET), "UTF-8"))) {
+            return Integer.parseInt(reader.readLine().trim());
+        }
+    }
+
+    private int installedVersion(File file) {
+        try (SQLiteDatabase db = SQLiteDatabase.openDatabase(file.getPath(), null, SQLiteDatabase.OPEN_READONLY)) {
+            return db.getVersion();
+        } catch (Exception e) {
+            return -1;
+        }
+    }
+
+    private void copyAsset(File file) throws IOException {
+        file.getParentFile().mkdirs();
+        File tmp = new File(file.getPath() + ".tmp");
+        try (InputStream in = context.getAssets().open(DATABASE_NAME);
+             OutputStream out = new FileOutputStream(tmp)) {
+            byte[] buffer = new byte[64 * 1024];
+            int read;
+            while ((read = in.read(buffer)) != -1) {
+                out.write(buffer, 0, read);
+            }
+        }
+        if (!tmp.renameTo(file)) {
+            throw new IOException("Could not install " + file);
+        }
+        Log.d(TAG, "Installed vocabulary database " + file);
+    }
+}
+
+/*
+ * In VocabularyActivity, instead of loadToeic38VocabularyFromAssets():
+ *
+ *     VocabularyDatabase.getInstance(this).loadLesson(courseId, lessonId, new VocabularyDatabase.Callback() {
+ *         @Override
+ *         public void onLoaded(List<VocabularyItem> items) {
+ *             if (items.isEmpty()) {
+ *                 loadSampleVocabulary();
+ *                 return;
+ *             }
+ *             vocabularyList.clear();
+ *             vocabularyList.addAll(items);
+ *             updateVocabularyUI();
+ *         }
+ *
+ *         @Override
+ *         public void onError(Exception e) {
+ *             loadSampleVocabulary();
+ *         }
+ *     });
+ */
+""" % {"database": DEFAULT_DATABASE_FILE, "suffix": VERSION_SUFFIX}
+    
+    with open(DATABASE_CODE_FILE, "w", encoding="utf-8") as f:
+        f.write(code_snippet)
+    
+    print(f"Created Java helper in {DATABASE_CODE_FILE}")
+    print("Copy it into the app's Utils package and load lessons with VocabularyDatabase.loadLesson()")
+
+def main():
+    parser = argparse.ArgumentParser(description="Create the vocabulary assets for the Android app")
+    parser.add_argument("courses", nargs="*", help="Course IDs to include (default: all)")
+    parser.add_argument("--snapshot", default=None,
+                        help="Vocabulary snapshot from fetch_toeic38_vocabulary.py (default: local vocabulary files)")
+    parser.add_argument("--format", choices=["sqlite", "json"], default="sqlite",
+                        help="sqlite: one indexed database; json: a content-addressed shard per lesson")
+    parser.add_argument("--no-gzip", action="store_true", help="Write json shards uncompressed")
+    args = parser.parse_args()
+    
+    if args.format == "json":
+        print("Creating vocabulary data files for Android app...")
+        if create_android_vocabulary_data(args.snapshot, args.courses or None, compress=not args.no_gzip):
+            print("\nSuccess! Vocabulary files have been created in the Android assets folder.")
+            print("You can now implement the code to load these files in your VocabularyActivity.")
+        else:
+            print("\nFailed to create vocabulary files. Please check the error messages above.")
+        return
+    
+    print("Creating vocabulary database for Android app...")
+    if create_android_vocabulary_database(args.snapshot, args.courses or None):
+        print("\nSuccess! The vocabulary database has been created in the Android assets folder.")
+    else:
+        print("\nFailed to create the vocabulary database. Please check the error messages above.")
+
+if __name__ == "__main__":
+    main() 
\ No newline at end of file
@@ -0,0 +1,102 @@
+DEFAULT_PAGE_SIZE = 500
+
+# Special field path Firestore uses for ordering by document path
+DOCUMENT_ID = "__name__"
+
+def iter_query_pages(query, page_size=DEFAULT_PAGE_SIZE, order_fields=(), start_after=None):
+    """Yield lists of snapshots from `query`, one page at a time.
+
+    Pages are ordered by `order_fields` and then by document path, and each
+    page continues from the last snapshot of the previous one. Queries with
+    an inequality filter must list the filtered field in `order_fields`.
+    `start_after` resumes after a snapshot (or dict of cursor values).
+    """
+    ordered = query
+    for field in order_fields:
+        ordered = ordered.order_by(field)
+    ordered = ordered.order_by(DOCUMENT_ID).limit(page_size)
+
+    cursor = start_after
+    while True:
+        page_query = ordered.start_after(cursor) if cursor is not None else ordered
+        page = list(page_query.stream())
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        cursor = page[-1]
+
+def iter_documents(query, page_size=DEFAULT_PAGE_SIZE, order_fields=(), start_after=None):
+    """Yield snapshots from `query` using paged cursor queries"""
+    for page in iter_query_pages(query, page_size, order_fields, start_after):
+        yield from page
+
+def course_id_of(lesson):
+    """ID of the course a lesson snapshot belongs to, or None outside Courses/*/Lessons"""
+    course_ref = lesson.reference.parent.parent
+    if course_ref is None or course_ref.parent.id != "Courses":
+        return None
+    return course_ref.id
+
+def group_by_course(lessons):
+    """Group lesson snapshots ordered by document path into (course_id, [lessons]) pairs.
+
+    Each course's lessons must arrive together, as they do when the stream
+    is ordered by document path; groups are yielded as soon as the next
+    course starts. A stream in any other order raises ValueError when a
+    course shows up again.
+    """
+    current_id = None
+    group = []
+    done = set()
+    for lesson in lessons:
+        course_id = course_id_of(lesson)
+        if course_id is None:
+            continue
+        if course_id != current_id:
+            if course_id in done:
+                raise ValueError(f"Lessons of course {course_id} are not together; order them by document path")
+            if group:
+                yield current_id, group
+                done.add(current_id)
+                group = []
+            current_id = course_id
+        group.append(lesson)
+    if group:
+        yield current_id, group
+
+def iter_lessons_by_course(db, page_size=DEFAULT_PAGE_SIZE, lessons=None):
+    """Yield (course_id, [lesson snapshots]) for every course that has lessons.
+
+    All lessons come from one paged collection-group query over `Lessons`
+    instead of one subcollection query per course. Ordering by document path
+    keeps each course's lessons together, so groups are streamed as soon as
+    they are complete. Pass `lessons` to group another stream of lesson
+    snapshots instead; it must be ordered by document path too.
+    """
+    if lessons is None:
+        lessons = iter_documents(db.collection_group("Lessons"), page_size)
+    return group_by_course(lessons)
+
+def iter_lessons_by_id(db, lesson_ids, page_size=DEFAULT_PAGE_SIZE):
+    """Yield (course_id, [lesson snapshots]) for the lessons with these document IDs in any course.
+
+    Course IDs come from a paged key-only query on Courses and the lessons
+    are fetched by reference, one get_all per page of courses, so no index
+    is needed and lessons are matched by document ID whatever their fields
+    hold. Only courses that have at least one of the lessons are yielded.
+    """
+    courses = db.collection("Courses").select([])
+    for page in iter_query_pages(courses, page_size):
+        refs = [course.reference.collection("Lessons").document(lesson_id)
+                for course in page for lesson_id in lesson_ids]
+        # get_all returns snapshots in no particular order
+        found = {}
+        for lesson in db.get_all(refs):
+            if lesson.exists:
+                found.setdefault(course_id_of(lesson), {})[lesson.id] = lesson
+        for course in page:
+            lessons = found.get(course.id, {})
+            if lessons:
+                yield course.id, [lessons[lesson_id] for lesson_id in lesson_ids if lesson_id in lessons]
@@ -1,101 +1,84 @@
-
-    // Method to load TOEIC38 vocabulary from assets
-    private void loadToeic38VocabularyFromAssets() {
-        try {
-            // Determine the appropriate file to load based on lessonId
-            String assetFileName;
-            if (lessonId != null) {
-                assetFileName = lessonId + "_vocabulary.json";
-            } else {
-                assetFileName = "toeic38_all_vocabulary.json";
-            }
-            
-            Log.d(TAG, "Loading vocabulary from assets: " + assetFileName);
-            
-            // Load vocabulary from assets
-            String jsonString = loadJSONFromAsset(assetFileName);
-            if (jsonString == null) {
-                // Try the combined file if specific lesson file not found
-                jsonString = loadJSONFromAsset("toeic38_all_vocabulary.json");
-                if (jsonString == null) {
-                    Log.e(TAG, "Could not load vocabulary from assets");
-                    loadSampleVocabulary();
-                    return;
-                }
-            }
-            
-            // Parse JSON
-            JSONObject jsonObject = new JSONObject(jsonString);
-            
-            // If lesson-specific file, extract vocabulary array
-            if (lessonId != null && jsonObject.has("vocabulary")) {
-                JSONArray vocabularyArray = jsonObject.getJSONArray("vocabulary");
-                parseVocabularyArray(vocabularyArray);
-            } 
-            // If all vocabulary file, filter by lessonId
-            else if (jsonObject.has("vocabulary")) {
-                JSONArray allVocabulary = jsonObject.getJSONArray("vocabulary");
-                List<VocabularyItem> filteredList = new ArrayList<>();
-                
-                for (int i = 0; i < allVocabulary.length(); i++) {
-                    JSONObject item = allVocabulary.getJSONObject(i);
-                    if (lessonId == null || lessonId.equals(item.optString("lessonId"))) {
-                        VocabularyItem vocabItem = new VocabularyItem(
-                            item.optString("english", ""),
-                            item.optString("vietnamese", ""),
-                            item.optString("phonetic", "")
-                        );
-                        filteredList.add(vocabItem);
-                    }
-                }
-                
-                if (!filteredList.isEmpty()) {
-                    vocabularyList.clear();
-                    vocabularyList.addAll(filteredList);
-                    updateVocabularyUI();
-                    return;
-                }
-            }
-            
-            // If we couldn't load or parse the vocabulary, load sample data
-            if (vocabularyList.isEmpty()) {
-                loadSampleVocabulary();
-            }
-        } catch (Exception e) {
-            Log.e(TAG, "Error loading vocabulary from assets: " + e.getMessage());
-            loadSampleVocabulary();
-        }
-    }
-    
-    private void parseVocabularyArray(JSONArray vocabularyArray) throws JSONException {
-        vocabularyList.clear();
-        
-        for (int i = 0; i < vocabularyArray.length(); i++) {
-            JSONObject item = vocabularyArray.getJSONObject(i);
-            VocabularyItem vocabItem = new VocabularyItem(
-                item.optString("english", ""),
-                item.optString("vietnamese", ""),
-                item.optString("phonetic", "")
-            );
-            vocabularyList.add(vocabItem);
-        }
-        
-        updateVocabularyUI();
-    }
-    
-    private String loadJSONFromAsset(String fileName) {
-        String json = null;
-        try {
-            InputStream is = getAssets().open(fileName);
-            int size = is.available();
-            byte[] buffer = new byte[size];
-            is.read(buffer);
-            is.close();
-            json = new String(buffer, "UTF-8");
-        } catch (IOException e) {
-            Log.e(TAG, "Error loading JSON from assets: " + e.getMessage());
-            return null;
-        }
-        return json;
-    }
+
+    // Vocabulary shards: vocabulary/manifest.json maps courses.{courseId}.lessons.{lessonId} to its shard file
+    // (lesson IDs are only unique within a course)
+    private static final String VOCABULARY_DIR = "vocabulary/";
+    private JSONObject vocabularyManifest;
+
+    // Method to load vocabulary from assets: the current lesson, or every lesson of the course without a lessonId
+    private void loadToeic38VocabularyFromAssets() {
+        try {
+            JSONObject course = loadVocabularyManifest().getJSONObject("courses").optJSONObject(courseId);
+            List<VocabularyItem> items = new ArrayList<>();
+            
+            if (course != null) {
+                JSONObject lessons = course.getJSONObject("lessons");
+                if (lessonId != null) {
+                    if (lessons.has(lessonId)) {
+                        items.addAll(loadVocabularyShard(lessons.getJSONObject(lessonId).getString("shard")));
+                    }
+                } else {
+                    List<JSONObject> courseLessons = new ArrayList<>();
+                    Iterator<String> lessonIds = lessons.keys();
+                    while (lessonIds.hasNext()) {
+                        courseLessons.add(lessons.getJSONObject(lessonIds.next()));
+                    }
+                    Collections.sort(courseLessons, (a, b) ->
+                        Integer.compare(a.optInt("lessonNumber"), b.optInt("lessonNumber")));
+                    for (JSONObject lesson : courseLessons) {
+                        items.addAll(loadVocabularyShard(lesson.getString("shard")));
+                    }
+                }
+            }
+            
+            Log.d(TAG, "Loaded " + items.size() + " vocabulary items from assets");
+            if (items.isEmpty()) {
+                loadSampleVocabulary();
+                return;
+            }
+            vocabularyList.clear();
+            vocabularyList.addAll(items);
+            updateVocabularyUI();
+        } catch (Exception e) {
+            Log.e(TAG, "Error loading vocabulary from assets: " + e.getMessage());
+            loadSampleVocabulary();
+        }
+    }
+    
+    private JSONObject loadVocabularyManifest() throws IOException, JSONException {
+        if (vocabularyManifest == null) {
+            vocabularyManifest = new JSONObject(readAsset(VOCABULARY_DIR + "manifest.json"));
+        }
+        return vocabularyManifest;
+    }
+    
+    private List<VocabularyItem> loadVocabularyShard(String shard) throws IOException, JSONException {
+        JSONArray vocabularyArray = new JSONObject(readAsset(VOCABULARY_DIR + shard)).getJSONArray("vocabulary");
+        List<VocabularyItem> items = new ArrayList<>();
+        for (int i = 0; i < vocabularyArray.length(); i++) {
+            JSONObject item = vocabularyArray.getJSONObject(i);
+            items.add(new VocabularyItem(
+                item.optString("english", ""),
+                item.optString("vietnamese", ""),
+                item.optString("phonetic", "")
+            ));
+        }
+        return items;
+    }
+    
+    // Reads a whole asset as UTF-8, gunzipping .gz files
+    private String readAsset(String fileName) throws IOException {
+        try (InputStream asset = getAssets().open(fileName);
+             InputStream in = fileName.endsWith(".gz") ? new GZIPInputStream(asset) : asset) {
+            ByteArrayOutputStream out = new ByteArrayOutputStream();
+            byte[] buffer = new byte[8192];
+            int read;
+            while ((read = in.read(buffer)) != -1) {
+                out.write(buffer, 0, read);
+            }
+            return out.toString("UTF-8");
+        }
+    }
+    
+    // Imports: java.io.ByteArrayOutputStream, java.util.Collections, java.util.Iterator,
+    // java.util.zip.GZIPInputStream
     
\ No newline at end of file
@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+DEFAULT_CHECKPOINT_FILE = "video_url_migration.checkpoint.json"
+
+# Field path Firestore uses for the document path in cursors
+DOCUMENT_ID = "__name__"
+
+class MigrationCheckpoint:
+    """Progress of a multi-stage migration, kept in a local JSON state file.
+
+    Each stage stores the cursor of the last document it finished, together
+    with the query strategy the cursor belongs to, or is marked complete.
+    A run with resume=True skips completed stages and restarts the others
+    right after their cursor, so only the remaining documents are read.
+
+    Progress is saved atomically at most every `save_interval` seconds and
+    whenever save(force=True) is called. Work done after the last save is
+    repeated on resume, which is harmless for idempotent rewrites. With
+    path=None nothing is persisted. Stages may advance from different threads.
+    """
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_FILE, target=None, resume=False, save_interval=5.0):
+        self.path = path
+        self.save_interval = save_interval
+        self.resumed = False
+        # Whether this run wrote the state file
+        self.saved = False
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._lock = threading.RLock()
+        self.state = {"target": target, "started": datetime.now(timezone.utc).isoformat(), "stages": {}}
+
+        if resume and path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get("target") == target:
+                self.state = saved
+                self.resumed = True
+            else:
+                print(f"Checkpoint {path} is for target {saved.get('target')}, starting from the beginning")
+
+    def _stage(self, stage):
+        return self.state["stages"].setdefault(stage, {})
+
+    def is_complete(self, stage):
+        return self.state["stages"].get(stage, {}).get("complete", False)
+
+    def position(self, stage, strategy, db=None):
+        """Cursor to resume `stage` after, or None to start from the beginning.
+
+        A cursor saved under another query strategy orders documents
+        differently, so it is discarded. With `db` the saved document path is
+        turned back into a reference, as Firestore expects for __name__.
+        """
+        saved = self.state["stages"].get(stage, {})
+        cursor = saved.get("cursor")
+        if cursor is None or saved.get("strategy") != strategy:
+            return None
+        cursor = dict(cursor)
+        if db is not None and DOCUMENT_ID in cursor:
+            cursor[DOCUMENT_ID] = db.document(cursor[DOCUMENT_ID])
+        return cursor
+
+    def info(self, stage, key, default=None):
+        return self.state["stages"].get(stage, {}).get(key, default)
+
+    def advance(self, stage, strategy, cursor, **info):
+        """Record that every document up to `cursor` has been handled"""
+        with self._lock:
+            entry = self._stage(stage)
+            entry.update(info, strategy=strategy, cursor=cursor)
+            self._dirty = True
+            self.save()
+
+    def complete(self, stage):
+        with self._lock:
+            entry = self._stage(stage)
+            entry.pop("cursor", None)
+            entry["complete"] = True
+            self._dirty = True
+            self.save(force=True)
+
+    def restart(self, stage):
+        """Leave `stage` to be run again from the beginning, e.g. when some documents could not be written"""
+        with self._lock:
+            entry = self._stage(stage)
+            entry.pop("cursor", None)
+            entry.pop("complete", None)
+            self._dirty = True
+            self.save(force=True)
+
+    def save(self, force=False):
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            if not force and time.monotonic() - self._last_save < self.save_interval:
+                return
+            self.state["saved"] = datetime.now(timezone.utc).isoformat()
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, indent=2, default=str)
+            os.replace(tmp_path, self.path)
+            self.saved = True
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+    def clear(self):
+        """Remove the state file once the whole migration has finished"""
+        self._dirty = False
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def print_summary(self, stages):
+        for stage in stages:
+            if self.is_complete(stage):
+                status = "complete"
+            elif self.info(stage, "cursor"):
+                status = f"resumes after {self.info(stage, 'cursor')[DOCUMENT_ID]}"
+            else:
+                status = "not started"
+            print(f"  {stage}: {status}")
@@ -0,0 +1,376 @@
+import argparse
+import fnmatch
+import re
+import time
+from datetime import datetime, timedelta, timezone
+
+from firestore_backend import connect, delete_field_sentinel
+from firestore_batch_writer import BatchWriter
+from firestore_rate_limiter import RateLimiter
+from change_log import ChangeLogWriter, iter_change_log
+from scan_executor import ScanExecutor, DEFAULT_SCAN_WORKERS
+
+# Documents fetched per get_all() call
+READ_CHUNK_SIZE = 300
+# Documents changed this long after the logged change are assumed to be edited since
+DEFAULT_GRACE_SECONDS = 60
+
+# Stands for a field that does not exist
+MISSING = object()
+
+# A concrete field path as written to change logs, e.g. partQuestions[0][3].videoUrl
+FIELD_STEP = re.compile(r"\[(\d+)\]|([^.\[\]]+)")
+
+# Lines of the free-text video_url_updates_*.log files
+LEGACY_HEADER = re.compile(r"^Video URL Update Log - (\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)")
+LEGACY_COMPLETED = re.compile(r"^Completed at: (\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)")
+LEGACY_COURSE = re.compile(r"^Course: (.+?)(?: - .*)?$")
+LEGACY_COLLECTION = re.compile(r"^Collection: (.+?)\s*$")
+LEGACY_TEST = re.compile(r"^Test: (.+?)\s*$")
+LEGACY_LESSON = re.compile(r"^\s+- Lesson: (.+?)\s*$")
+LEGACY_QUESTION = re.compile(r"^\s+- Question: (.+?)\s*$")
+LEGACY_TEST_QUESTION = re.compile(r"^\s+- Question in part (\d+), index (\d+)")
+LEGACY_OLD = re.compile(r"^\s+Old URL: (.*?)\s*$")
+LEGACY_NEW = re.compile(r"^\s+New URL: (.*?)\s*$")
+LEGACY_ADDED = re.compile(r"^\s+Added URL: (.*?)\s*$")
+LEGACY_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def _legacy_time(text):
+    # The old scripts wrote local time; assume the log was made in this machine's time zone
+    return datetime.strptime(text, LEGACY_TIME_FORMAT).astimezone(timezone.utc)
+
+def is_legacy_log(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                return not line.lstrip().startswith("{")
+    return False
+
+def parse_legacy_log(path):
+    """Change records, in change-log form, from a free-text video URL update log.
+
+    The old scripts only wrote the start and end time of a run, so every
+    record gets the end time ("Completed at") as its timestamp, or None when
+    the run never finished.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    finished = None
+    for line in lines:
+        match = LEGACY_COMPLETED.match(line)
+        if match:
+            finished = _legacy_time(match.group(1)).isoformat()
+
+    records = []
+    collection = None
+    doc_id = None
+    field = "videoUrl"
+    old = None
+    for line in lines:
+        match = LEGACY_COURSE.match(line)
+        if match:
+            collection = f"Courses/{match.group(1)}/Lessons"
+            continue
+        match = LEGACY_COLLECTION.match(line)
+        if match:
+            collection = match.group(1)
+            continue
+        match = LEGACY_TEST.match(line)
+        if match:
+            collection, doc_id = "Tests", match.group(1)
+            continue
+        match = LEGACY_LESSON.match(line) or LEGACY_QUESTION.match(line)
+        if match:
+            doc_id, field, old = match.group(1), "videoUrl", None
+            continue
+        match = LEGACY_TEST_QUESTION.match(line)
+        if match:
+            # The log counts parts and questions from 1
+            part, index = int(match.group(1)) - 1, int(match.group(2)) - 1
+            field, old = f"partQuestions[{part}][{index}].videoUrl", None
+            continue
+        match = LEGACY_OLD.match(line)
+        if match:
+            old = None if match.group(1) == "None" else match.group(1)
+            continue
+
+        match = LEGACY_NEW.match(line)
+        created = False
+        if not match:
+            match = LEGACY_ADDED.match(line)
+            created = True
+        if match and collection and doc_id:
+            record = {"ts": finished, "collection": collection, "doc": doc_id, "field": field}
+            if created:
+                record["created"] = True
+            else:
+                record["old"] = old
+            record["new"] = match.group(1)
+            records.append(record)
+    return records
+
+def log_started(path):
+    """When the run that wrote a log started, so logs can be undone newest-last"""
+    if is_legacy_log(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            match = LEGACY_HEADER.match(f.readline())
+        return _legacy_time(match.group(1)) if match else datetime.min.replace(tzinfo=timezone.utc)
+    for record in iter_change_log(path):
+        return datetime.fromisoformat(record["ts"])
+    return datetime.min.replace(tzinfo=timezone.utc)
+
+def read_change_records(path):
+    if is_legacy_log(path):
+        return iter(parse_legacy_log(path))
+    return iter_change_log(path)
+
+class RollbackEntry:
+    """What one field has to go back to, and what it should hold now"""
+
+    __slots__ = ("old", "expected", "ts")
+
+    def __init__(self, old, expected, ts):
+        self.old = old
+        self.expected = expected
+        self.ts = ts
+
+def build_rollback_index(log_paths, path_pattern=None):
+    """Map document path -> {field path: RollbackEntry} from change logs.
+
+    Logs are read oldest run first. When several logs changed the same
+    field, it goes back to the value before the first change and is
+    expected to still hold the value of the last one.
+    """
+    index = {}
+    for path in sorted(log_paths, key=log_started):
+        for record in read_change_records(path):
+            doc_path = f"{record['collection']}/{record['doc']}"
+            if path_pattern and not fnmatch.fnmatchcase(doc_path, path_pattern):
+                continue
+            ts = datetime.fromisoformat(record["ts"]) if record.get("ts") else None
+            expected = MISSING if record.get("deleted") else record.get("new")
+            fields = index.setdefault(doc_path, {})
+            entry = fields.get(record["field"])
+            if entry is None:
+                old = MISSING if record.get("created") else record.get("old")
+                fields[record["field"]] = RollbackEntry(old, expected, ts)
+            else:
+                entry.expected = expected
+                entry.ts = ts or entry.ts
+    return index
+
+def parse_field(field):
+    return [int(index) if index else name for index, name in FIELD_STEP.findall(field)]
+
+def get_value(data, steps):
+    for step in steps:
+        if isinstance(step, int):
+            if not isinstance(data, list) or step >= len(data):
+                return MISSING
+        elif not isinstance(data, dict) or step not in data:
+            return MISSING
+        data = data[step]
+    return data
+
+def set_value(data, steps, value):
+    """Set (or with MISSING remove) the value at `steps`; the parents must exist"""
+    for step in steps[:-1]:
+        data = data[step]
+    if value is MISSING:
+        data.pop(steps[-1], None)
+    else:
+        data[steps[-1]] = value
+
+class RollbackResult:
+    def __init__(self):
+        self.docs_read = 0
+        self.docs_restored = 0
+        self.fields_restored = 0
+        self.already_restored = 0
+        self.fields_changed_since = 0
+        self.docs_modified_since = 0
+        self.docs_missing = 0
+        self.conflicts = 0
+
+class Rollback:
+    """Restore the old values recorded in change logs.
+
+    Documents are fetched in chunks of READ_CHUNK_SIZE with get_all() on a
+    ScanExecutor, and the restores go through one BatchWriter, so a full
+    rollback costs about as many round trips as the run it undoes. A field
+    is only restored while it still holds the value the log says was
+    written, and a document is left alone when it was updated more than
+    `grace` after the logged change, unless check_times is False. Each
+    update carries the document's update time as a precondition, so edits
+    made during the rollback are not overwritten either.
+    """
+
+    def __init__(self, db, index, limiter=None, change_log=None, max_workers=DEFAULT_SCAN_WORKERS,
+                 grace=timedelta(seconds=DEFAULT_GRACE_SECONDS), check_times=True, dry_run=False, verbose=True):
+        self.db = db
+        self.index = index
+        self.limiter = limiter or RateLimiter()
+        self.change_log = change_log
+        self.max_workers = max_workers
+        self.grace = grace
+        self.check_times = check_times
+        self.dry_run = dry_run
+        self.verbose = verbose
+        self.delete_field = delete_field_sentinel(db)
+        self.result = RollbackResult()
+
+    def run(self):
+        result = self.result
+        writer = None if self.dry_run else BatchWriter(self.db, limiter=self.limiter, verbose=False)
+        paths = sorted(self.index)
+        chunks = (paths[start:start + READ_CHUNK_SIZE] for start in range(0, len(paths), READ_CHUNK_SIZE))
+        restored = []
+        try:
+            with ScanExecutor(self.max_workers) as executor:
+                for _, (counts, changes) in executor.map(lambda chunk, log: self._restore_chunk(chunk, writer, log),
+                                                         chunks):
+                    for key, value in counts.items():
+                        setattr(result, key, getattr(result, key) + value)
+                    restored.extend(changes)
+        finally:
+            try:
+                if writer:
+                    writer.close()
+            finally:
+                self._record(restored, writer)
+        return result
+
+    def _record(self, restored, writer):
+        # Only what was actually written counts, and goes to the change log
+        result = self.result
+        conflicts = set(writer.conflicts) if writer else set()
+        result.conflicts = len(conflicts)
+        for doc_path, changes in restored:
+            if doc_path in conflicts:
+                continue
+            result.docs_restored += 1
+            result.fields_restored += len(changes)
+            if self.change_log and not self.dry_run:
+                collection_path, doc_id = doc_path.rsplit('/', 1)
+                for field, current, old in changes:
+                    self.change_log.record(collection_path, doc_id, field,
+                                           None if current is MISSING else current,
+                                           None if old is MISSING else old,
+                                           created=current is MISSING, deleted=old is MISSING)
+
+    def _restore_chunk(self, paths, writer, log):
+        counts = {"docs_read": 0, "already_restored": 0, "fields_changed_since": 0,
+                  "docs_modified_since": 0, "docs_missing": 0}
+        restored = []
+        for snapshot in self.db.get_all([self.db.document(path) for path in paths]):
+            counts["docs_read"] += 1
+            doc_path = snapshot.reference.path
+            if not snapshot.exists:
+                counts["docs_missing"] += 1
+                log(f"  Skipped {doc_path}: document no longer exists")
+                continue
+
+            entries = self.index[doc_path]
+            data = snapshot.to_dict()
+            updates = {}
+            changes = []
+            for field, entry in entries.items():
+                steps = parse_field(field)
+                current = get_value(data, steps)
+                if current == entry.old or (current is MISSING and entry.old is MISSING):
+                    counts["already_restored"] += 1
+                    continue
+                if not (current == entry.expected or (current is MISSING and entry.expected is MISSING)):
+                    counts["fields_changed_since"] += 1
+                    log(f"  Skipped {doc_path} {field}: now {current!r}, not the logged {entry.expected!r}")
+                    continue
+                if any(isinstance(step, int) for step in steps):
+                    # Array elements can't be addressed, so the whole top-level field is written back
+                    set_value(data, steps, entry.old)
+                    updates[steps[0]] = data[steps[0]]
+                else:
+                    updates[field] = self.delete_field if entry.old is MISSING else entry.old
+                changes.append((field, current, entry.old))
+
+            if not changes:
+                continue
+            # Checked only now, so fields that were already restored don't count as edits
+            logged_times = [entry.ts for entry in entries.values() if entry.ts is not None]
+            if (self.check_times and logged_times and snapshot.update_time is not None
+                    and snapshot.update_time > max(logged_times) + self.grace):
+                counts["docs_modified_since"] += 1
+                log(f"  Skipped {doc_path}: modified at {snapshot.update_time}, after the logged change")
+                continue
+            if self.verbose:
+                for field, current, old in changes:
+                    shown = "(removed)" if old is MISSING else old
+                    log(f"  Restoring {doc_path} {field}: {shown}")
+            if writer:
+                writer.update(snapshot.reference, updates,
+                              option=self.db.write_option(last_update_time=snapshot.update_time))
+            restored.append((doc_path, changes))
+        return counts, restored
+
+def print_report(result, dry_run=False):
+    verb = "would be restored" if dry_run else "restored"
+    print(f"\nRollback: {result.fields_restored} fields in {result.docs_restored} documents {verb} "
+          f"({result.docs_read} documents read)")
+    if result.already_restored:
+        print(f"  {result.already_restored} fields already held their old value")
+    if result.fields_changed_since:
+        print(f"  {result.fields_changed_since} fields skipped: their value changed after the logged update")
+    if result.docs_modified_since:
+        print(f"  {result.docs_modified_since} documents skipped: modified after the logged update "
+              f"(use --ignore-times to restore them anyway)")
+    if result.docs_missing:
+        print(f"  {result.docs_missing} documents no longer exist")
+    if result.conflicts:
+        print(f"  {result.conflicts} documents skipped: edited while the rollback ran")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Undo field changes recorded in change logs (JSON Lines or the old video_url_updates_*.log files)")
+    parser.add_argument("logs", nargs="+", help="Change logs to undo; several logs are undone together")
+    parser.add_argument("--path", help="Only restore documents matching this path pattern, e.g. 'Courses/*/Lessons/*'")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be restored without writing")
+    parser.add_argument("--ignore-times", action="store_true",
+                        help="Also restore documents updated after the logged change, as long as the field "
+                             "still holds the logged value")
+    parser.add_argument("--grace", type=float, default=DEFAULT_GRACE_SECONDS,
+                        help="Seconds an update may trail the logged change and still count as that change")
+    parser.add_argument("--workers", type=int, default=DEFAULT_SCAN_WORKERS,
+                        help="Document chunks read in parallel")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build_rollback_index(args.logs, args.path)
+    fields = sum(len(entries) for entries in index.values())
+    print(f"Indexed {fields} changed fields in {len(index)} documents from {len(args.logs)} logs "
+          f"in {time.perf_counter() - start:.1f}s")
+    if not index:
+        return
+
+    db = connect()
+    limiter = RateLimiter()
+    log_file = f"rollback_changes_{time.strftime('%Y%m%d_%H%M%S')}.jsonl"
+    change_log = None if args.dry_run else ChangeLogWriter(log_file)
+    rollback = Rollback(db, index, limiter, change_log, max_workers=args.workers,
+                        grace=timedelta(seconds=args.grace), check_times=not args.ignore_times,
+                        dry_run=args.dry_run)
+    try:
+        rollback.run()
+    except Exception as e:
+        print(f"Rollback stopped early: {e}")
+    finally:
+        if change_log:
+            change_log.close()
+
+    print_report(rollback.result, args.dry_run)
+    print(f"Finished in {time.perf_counter() - start:.1f}s")
+    limiter.print_stats()
+    if change_log:
+        print(f"Change log created: {log_file} ({change_log.records_written} records)")
+
+if __name__ == "__main__":
+    main()
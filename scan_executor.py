@@ -0,0 +1,78 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_SCAN_WORKERS = 8
+
+class TaskLog:
+    """Progress output of one task, buffered until the task's turn comes"""
+
+    def __init__(self):
+        self.lines = []
+
+    def __call__(self, *args, sep=" "):
+        self.lines.append(sep.join(str(arg) for arg in args))
+
+class ScanExecutor:
+    """Run independent scan tasks (collections, courses) on a bounded thread pool.
+
+    map() calls func(item, log) for every item on up to `max_workers`
+    threads and yields (item, result) in the order the items were given.
+    Tasks print progress through `log` instead of print(); each task's lines
+    are written out just before its result is yielded, so the console reads
+    as if the tasks had run one after another. At most `max_workers * 2`
+    tasks are in flight, which keeps memory bounded when items come from a
+    stream. Workers share whatever client and limiter func closes over; the
+    Firestore client, RateLimiter, BatchWriter and ChangeLogWriter are all
+    safe to use from several threads.
+
+    If a task raises, its log is written and the exception is re-raised when
+    its turn comes; tasks already running are finished first.
+    """
+
+    def __init__(self, max_workers=DEFAULT_SCAN_WORKERS):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scan")
+        self._print_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    def _emit(self, log):
+        with self._print_lock:
+            for line in log.lines:
+                print(line)
+
+    def map(self, func, items):
+        in_flight = deque()
+        window = self.max_workers * 2
+
+        def finish_oldest():
+            item, log, future = in_flight.popleft()
+            try:
+                result = future.result()
+            finally:
+                self._emit(log)
+            return item, result
+
+        try:
+            for item in items:
+                log = TaskLog()
+                in_flight.append((item, log, self._executor.submit(func, item, log)))
+                if len(in_flight) >= window:
+                    yield finish_oldest()
+            while in_flight:
+                yield finish_oldest()
+        finally:
+            # Don't leave tasks running behind an abandoned generator
+            for _, _, future in in_flight:
+                future.cancel()
@@ -0,0 +1,332 @@
+import argparse
+import json
+import sqlite3
+import time
+from datetime import datetime, timezone
+from firestore_backend import connect
+from firestore_batch_writer import UPDATED_AT_FIELD
+from lesson_iterator import iter_query_pages, iter_lessons_by_course, DEFAULT_PAGE_SIZE
+from test_sharding import CHUNKS_COLLECTION
+
+DEFAULT_CACHE_FILE = "firestore_cache.sqlite"
+
+# Cached scopes: name -> (kind, collection ID). A "collection" scope is a
+# top-level collection, a "group" scope every collection with that ID.
+SCOPES = {
+    "Courses": ("collection", "Courses"),
+    "Lessons": ("group", "Lessons"),
+    "Tests": ("collection", "Tests"),
+    "Vocabulary": ("group", "Vocabulary"),
+    CHUNKS_COLLECTION: ("group", CHUNKS_COLLECTION),
+}
+
+# Documents fetched per get_all() call when reconciling
+GET_ALL_CHUNK = 300
+
+def scope_of(path):
+    """Name of the cached scope a document path belongs to, or None"""
+    parts = path.split("/")
+    for name, (kind, collection_id) in SCOPES.items():
+        if parts[-2] == collection_id and (kind == "group" or len(parts) == 2):
+            return name
+    return None
+
+def updated_at(snapshot):
+    """The updatedAt timestamp of a snapshot, or None"""
+    data = snapshot.to_dict() or {}
+    stamp = data.get(UPDATED_AT_FIELD)
+    return stamp if isinstance(stamp, datetime) else None
+
+def _encode(value):
+    # Firestore timestamps (e.g. updatedAt) survive the round trip through JSON
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    return str(value)
+
+def _decode(obj):
+    if len(obj) == 1 and "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+class CachedSnapshot:
+    """Read-only stand-in for a DocumentSnapshot served from the cache"""
+
+    def __init__(self, reference, blob, update_time=None):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = blob is not None
+        self.update_time = datetime.fromisoformat(update_time) if update_time else None
+        self._blob = blob
+
+    def to_dict(self):
+        return json.loads(self._blob, object_hook=_decode) if self._blob is not None else None
+
+    def get(self, field_path):
+        value = self.to_dict() or {}
+        for part in field_path.split("."):
+            value = value[part]
+        return value
+
+class SnapshotCache:
+    """Local SQLite copy of Firestore collections, kept fresh with an updatedAt watermark.
+
+    The first sync of a scope reads all of it. Later syncs query only the
+    documents whose updatedAt (set by BatchWriter on every write) is newer
+    than the highest one seen, then a key-only scan compares every
+    document's update time with the cached one: deleted documents are
+    dropped, and ones added or edited without updatedAt are re-fetched
+    with get_all().
+
+    documents() and get() serve from the cache, syncing the scope first
+    unless it was synced in this process or less than `max_age` seconds ago
+    (catalog_mirror keeps the sync time current while it runs).
+    Collection-group scopes need a single-field index on updatedAt with
+    collection-group scope in Firestore.
+    """
+
+    def __init__(self, db, path=DEFAULT_CACHE_FILE, page_size=DEFAULT_PAGE_SIZE, max_age=0, verbose=True):
+        self.db = db
+        self.path = path
+        self.page_size = page_size
+        self.max_age = max_age
+        self.verbose = verbose
+        self.reads = 0
+        self._fresh = set()
+        self.conn = sqlite3.connect(path)
+        # Readers in other processes keep working while a mirror writes
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS documents ("
+                              "path TEXT PRIMARY KEY, scope TEXT NOT NULL, data TEXT NOT NULL, update_time TEXT)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS documents_scope ON documents (scope, path)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS scopes ("
+                              "scope TEXT PRIMARY KEY, watermark TEXT, synced TEXT)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        self.conn.close()
+
+    def query(self, scope):
+        kind, collection_id = SCOPES[scope]
+        if kind == "group":
+            return self.db.collection_group(collection_id)
+        return self.db.collection(collection_id)
+
+    def _state(self, scope):
+        return self.conn.execute("SELECT watermark, synced FROM scopes WHERE scope = ?", (scope,)).fetchone()
+
+    def _cached_count(self, scope):
+        return self.conn.execute("SELECT COUNT(*) FROM documents WHERE scope = ?", (scope,)).fetchone()[0]
+
+    def store(self, scope, snapshot):
+        """Upsert one snapshot; return "added", "modified" or None when the cached copy is current.
+
+        The caller commits (e.g. with `with cache.conn:`).
+        """
+        update_time = snapshot.update_time.isoformat() if snapshot.update_time else None
+        row = self.conn.execute("SELECT update_time FROM documents WHERE path = ?",
+                                (snapshot.reference.path,)).fetchone()
+        if row is not None and row[0] == update_time and update_time is not None:
+            return None
+        self.conn.execute("INSERT OR REPLACE INTO documents (path, scope, data, update_time) VALUES (?, ?, ?, ?)",
+                          (snapshot.reference.path, scope,
+                           json.dumps(snapshot.to_dict(), ensure_ascii=False, separators=(",", ":"), default=_encode),
+                           update_time))
+        return "added" if row is None else "modified"
+
+    def remove(self, path):
+        """Delete one cached document; return whether it was cached. The caller commits."""
+        return self.conn.execute("DELETE FROM documents WHERE path = ?", (path,)).rowcount > 0
+
+    def cached_paths(self, scope):
+        return {row[0] for row in self.conn.execute("SELECT path FROM documents WHERE scope = ?", (scope,))}
+
+    def mark_synced(self, scope, watermark=None):
+        """Record that `scope` is current now, keeping the highest updatedAt watermark"""
+        state = self._state(scope)
+        if state is not None and state[0]:
+            saved = datetime.fromisoformat(state[0])
+            watermark = saved if watermark is None or saved > watermark else watermark
+        self.conn.execute("INSERT OR REPLACE INTO scopes (scope, watermark, synced) VALUES (?, ?, ?)",
+                          (scope, watermark.isoformat() if watermark else None,
+                           datetime.now(timezone.utc).isoformat()))
+
+    def _store(self, scope, snapshots, stats):
+        """Upsert snapshots; return the highest updatedAt among them"""
+        watermark = None
+        for snapshot in snapshots:
+            if not snapshot.exists:
+                continue
+            stamp = updated_at(snapshot)
+            if stamp is not None and (watermark is None or stamp > watermark):
+                watermark = stamp
+            if self.store(scope, snapshot):
+                stats["changed"] += 1
+        return watermark
+
+    def _read_pages(self, query, order_fields=()):
+        empty = True
+        for page in iter_query_pages(query, self.page_size, order_fields):
+            self.reads += len(page)
+            empty = False
+            yield page
+        if empty:
+            # An empty query is still billed one read
+            self.reads += 1
+
+    def _delete_missing(self, scope, paths, stats):
+        gone = [(path,) for path in self.cached_paths(scope) if path not in paths]
+        self.conn.executemany("DELETE FROM documents WHERE path = ?", gone)
+        stats["deleted"] += len(gone)
+
+    def _full_sync(self, scope, stats):
+        watermark = None
+        paths = set()
+        for page in self._read_pages(self.query(scope)):
+            paths.update(snapshot.reference.path for snapshot in page)
+            stamp = self._store(scope, page, stats)
+            if stamp is not None and (watermark is None or stamp > watermark):
+                watermark = stamp
+        self._delete_missing(scope, paths, stats)
+        return watermark
+
+    def _incremental_sync(self, scope, watermark, stats):
+        query = self.query(scope)
+        # Without a watermark every stamped document is newer than the last sync
+        changed = query.where(UPDATED_AT_FIELD, ">", watermark) if watermark is not None else query
+        for page in self._read_pages(changed, (UPDATED_AT_FIELD,)):
+            stamp = self._store(scope, page, stats)
+            if stamp is not None and (watermark is None or stamp > watermark):
+                watermark = stamp
+
+        # Key-only scan: deleted documents, and ones added or edited without updatedAt
+        current = {}
+        for page in self._read_pages(query.select([])):
+            for snapshot in page:
+                current[snapshot.reference.path] = snapshot.update_time.isoformat() if snapshot.update_time else None
+        self._delete_missing(scope, current, stats)
+        cached = dict(self.conn.execute("SELECT path, update_time FROM documents WHERE scope = ?", (scope,)))
+        stale = sorted(path for path, update_time in current.items()
+                       if path not in cached or update_time is None or cached[path] != update_time)
+        if stale or stats["deleted"]:
+            stats["mode"] = "reconciled"
+        for start in range(0, len(stale), GET_ALL_CHUNK):
+            refs = [self.db.document(path) for path in stale[start:start + GET_ALL_CHUNK]]
+            self.reads += len(refs)
+            stamp = self._store(scope, self.db.get_all(refs), stats)
+            if stamp is not None and (watermark is None or stamp > watermark):
+                watermark = stamp
+        return watermark
+
+    def sync(self, scope, full=False):
+        """Bring one scope up to date; return {"scope", "mode", "changed", "deleted", "reads"}"""
+        state = self._state(scope)
+        full = full or state is None
+        stats = {"scope": scope, "mode": "full" if full else "incremental", "changed": 0, "deleted": 0}
+        reads_before = self.reads
+        with self.conn:
+            if full:
+                watermark = self._full_sync(scope, stats)
+            else:
+                saved = datetime.fromisoformat(state[0]) if state[0] else None
+                watermark = self._incremental_sync(scope, saved, stats)
+            self.mark_synced(scope, watermark)
+        stats["reads"] = self.reads - reads_before
+        self._fresh.add(scope)
+        if self.verbose:
+            print(f"Cache {scope}: {stats['mode']} sync, {stats['changed']} changed, "
+                  f"{stats['deleted']} deleted, {stats['reads']} reads")
+        return stats
+
+    def ensure_fresh(self, scope):
+        if scope in self._fresh:
+            return
+        state = self._state(scope)
+        if state is not None and self.max_age:
+            age = (datetime.now(timezone.utc) - datetime.fromisoformat(state[1])).total_seconds()
+            if age < self.max_age:
+                self._fresh.add(scope)
+                return
+        self.sync(scope)
+
+    def documents(self, scope):
+        """Yield the cached snapshots of a scope, ordered by path"""
+        self.ensure_fresh(scope)
+        last = ""
+        while True:
+            rows = self.conn.execute("SELECT path, data, update_time FROM documents WHERE scope = ? AND path > ? "
+                                     "ORDER BY path LIMIT ?", (scope, last, self.page_size)).fetchall()
+            for path, blob, update_time in rows:
+                yield CachedSnapshot(self.db.document(path), blob, update_time)
+            if len(rows) < self.page_size:
+                return
+            last = rows[-1][0]
+
+    def get(self, path):
+        """Snapshot of one document, from the cache when its scope is cached"""
+        scope = scope_of(path)
+        if scope is None:
+            self.reads += 1
+            return self.db.document(path).get()
+        self.ensure_fresh(scope)
+        return self.get_cached(path)
+
+    def get_cached(self, path):
+        """Cached snapshot of one document without syncing; exists is False when it isn't cached"""
+        row = self.conn.execute("SELECT data, update_time FROM documents WHERE path = ?", (path,)).fetchone()
+        return CachedSnapshot(self.db.document(path), *(row or (None,)))
+
+    def discard(self, path):
+        """Drop a document this process deleted, so later reads in the same run don't serve it"""
+        with self.conn:
+            self.remove(path)
+
+    def lessons_by_course(self):
+        """(course_id, [lesson snapshots]) pairs like lesson_iterator.iter_lessons_by_course"""
+        return iter_lessons_by_course(self.db, lessons=self.documents("Lessons"))
+
+def open_cache(db, path, full_sync=False, max_age=0):
+    """SnapshotCache for the --cache/--full-sync/--cache-max-age flags the scripts share, or None without a path"""
+    if not path:
+        return None
+    cache = SnapshotCache(db, path, max_age=max_age)
+    if full_sync:
+        for scope in SCOPES:
+            cache.sync(scope, full=True)
+    return cache
+
+def add_cache_arguments(parser):
+    parser.add_argument("--cache", nargs="?", const=DEFAULT_CACHE_FILE, default=None,
+                        help=f"Serve reads from a local snapshot cache (default file: {DEFAULT_CACHE_FILE})")
+    parser.add_argument("--full-sync", action="store_true",
+                        help="Re-read every cached collection instead of only changed documents")
+    parser.add_argument("--cache-max-age", type=float, default=0,
+                        help="Serve a scope without syncing if it was synced this many seconds ago "
+                             "(e.g. while catalog_mirror.py is running)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the local Firestore snapshot cache")
+    parser.add_argument("scopes", nargs="*", default=list(SCOPES), help=f"Scopes to sync (default: {', '.join(SCOPES)})")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_FILE, help="Cache file")
+    parser.add_argument("--full", action="store_true", help="Re-read every document instead of only changed ones")
+    args = parser.parse_args()
+
+    unknown = [scope for scope in args.scopes if scope not in SCOPES]
+    if unknown:
+        parser.error(f"Unknown scopes: {', '.join(unknown)} (expected: {', '.join(SCOPES)})")
+
+    db = connect(["firebase_config.json", "scripts/firebase_config.json"])
+    start = time.perf_counter()
+    with SnapshotCache(db, args.cache) as cache:
+        for scope in args.scopes:
+            cache.sync(scope, full=args.full)
+        print(f"Synced {len(args.scopes)} scopes in {time.perf_counter() - start:.2f}s, {cache.reads} reads")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+
+DEFAULT_MANIFEST_FILE = "upload_manifest.json"
+
+# Fields that change on every run without the content itself changing
+VOLATILE_FIELDS = ("lastUpdated",)
+
+def content_hash(data, volatile_fields=VOLATILE_FIELDS):
+    """SHA-256 of the canonical JSON form of a document, ignoring volatile fields"""
+    stable = {key: value for key, value in data.items() if key not in volatile_fields}
+    payload = json.dumps(stable, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class SyncManifest:
+    """Local record of the content hash of every uploaded document.
+
+    check() tells whether a document was added or changed since the last
+    run; documents recorded before but not checked in this run are reported
+    by removed(). New hashes only replace the old ones when commit() is
+    called after the writes succeeded, so a failed upload is retried in full
+    next time.
+    """
+
+    def __init__(self, path=DEFAULT_MANIFEST_FILE):
+        self.path = path
+        self.hashes = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.hashes = json.load(f)
+
+        self._pending = {}
+        self._seen = set()
+        self.added = 0
+        self.changed = 0
+        self.unchanged = 0
+
+    def check(self, doc_path, data):
+        """Return True if the document at doc_path has to be written"""
+        digest = content_hash(data)
+        self._seen.add(doc_path)
+        previous = self.hashes.get(doc_path)
+        if previous == digest:
+            self.unchanged += 1
+            return False
+        if previous is None:
+            self.added += 1
+        else:
+            self.changed += 1
+        self._pending[doc_path] = digest
+        return True
+
+    def removed(self):
+        """Paths recorded in the manifest that were not part of this run"""
+        return sorted(path for path in self.hashes if path not in self._seen)
+
+    def commit(self):
+        """Record this run's hashes and save the manifest atomically"""
+        for path in self.removed():
+            del self.hashes[path]
+        self.hashes.update(self._pending)
+        self._pending = {}
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.hashes, f, sort_keys=True, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def print_summary(self, removed_count):
+        print(f"Incremental sync: {self.added} added, {self.changed} changed, "
+              f"{removed_count} removed, {self.unchanged} unchanged")
@@ -0,0 +1,58 @@
+# Sharded test layout:
+#   Tests/{testId}                          header: metadata plus a manifest of chunk IDs per section
+#   Tests/{testId}/QuestionChunks/{chunkId} up to QUESTION_CHUNK_SIZE questions of one section
+# The header stays small however large the test is, clients can page one chunk
+# at a time, and writers can update a single chunk.
+
+SHARDED_LAYOUT = "sharded"
+CHUNKS_COLLECTION = "QuestionChunks"
+QUESTION_CHUNK_SIZE = 50
+
+def chunk_id_for(section, chunk_index):
+    # Zero-padded so chunk IDs sort in question order
+    return f"{section}_{chunk_index:04d}"
+
+def shard_test(test, chunk_size=QUESTION_CHUNK_SIZE):
+    """Split a test with a `questions` map into (header, [(chunk_id, chunk), ...])"""
+    header = {key: value for key, value in test.items() if key != "questions"}
+    header["layout"] = SHARDED_LAYOUT
+    header["chunkSize"] = chunk_size
+
+    sections = {}
+    chunks = []
+    for section, questions in test.get("questions", {}).items():
+        chunk_ids = []
+        for start in range(0, len(questions), chunk_size):
+            chunk_index = start // chunk_size
+            chunk_id = chunk_id_for(section, chunk_index)
+            chunks.append((chunk_id, {
+                "testId": test["testId"],
+                "section": section,
+                "chunkIndex": chunk_index,
+                "startIndex": start,
+                "questions": questions[start:start + chunk_size]
+            }))
+            chunk_ids.append(chunk_id)
+        sections[section] = {
+            "questionCount": len(questions),
+            "chunkIds": chunk_ids
+        }
+
+    header["sections"] = sections
+    return header, chunks
+
+def is_sharded(test_data):
+    return test_data.get("layout") == SHARDED_LAYOUT
+
+def load_chunk(test_ref, chunk_id, cache=None):
+    """Fetch the questions of one chunk, from a SnapshotCache when one is given"""
+    chunk_ref = test_ref.collection(CHUNKS_COLLECTION).document(chunk_id)
+    snapshot = cache.get(chunk_ref.path) if cache is not None else chunk_ref.get()
+    if not snapshot.exists:
+        return []
+    return snapshot.to_dict().get("questions", [])
+
+def iter_section_questions(test_ref, header, section):
+    """Yield the questions of a section, fetching chunks lazily in order"""
+    for chunk_id in header.get("sections", {}).get(section, {}).get("chunkIds", []):
+        yield from load_chunk(test_ref, chunk_id)
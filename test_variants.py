@@ -0,0 +1,195 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    # Only needed to generate variants; checked when a generator is created
+    np = None
+
+from distractor_pool import VocabularyPool
+from course_pool import course_seed
+from generate_toeic38_test_data import (
+    create_test_data, create_listening_questions, create_reading_questions, create_writing_questions,
+    create_speaking_questions, load_course_vocabularies, load_vocabulary_data,
+    DEFAULT_COURSE_ID, TOEIC38_TOPIC, QUESTIONS_PER_PART
+)
+
+WRONG_OPTIONS = 3
+# Variants built per vectorized pass; bounds the size of the index arrays
+DEFAULT_BATCH_SIZE = 1000
+
+# Part -> (question builder, field the wrong options are drawn from). Speaking
+# questions keep their own fixed responses, which are only reordered.
+PART_BUILDERS = {
+    'part_1': (create_listening_questions, 'english'),
+    'part_2': (create_reading_questions, 'vietnamese'),
+    'part_3': (create_writing_questions, 'english'),
+    'part_4': (create_speaking_questions, None),
+}
+
+def numpy_seed(seed, course_id):
+    """Integer seed for NumPy derived from the run seed and course ID like course_seed()"""
+    digest = hashlib.sha256(course_seed(seed, course_id).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+def distinct_draws(rng, shape, population, k):
+    """Array of shape + (k,) holding k distinct integers from range(population) per row.
+
+    Each column is a uniform draw among the values not taken yet: draw from
+    a range one shorter per column and step over the values already taken,
+    smallest first. That is O(k^2) array operations and no per-row Python.
+    """
+    out = np.empty(shape + (k,), dtype=np.int64)
+    for j in range(k):
+        draw = rng.integers(0, population - j, size=shape)
+        if j:
+            taken = np.sort(out[..., :j], axis=-1)
+            for column in range(j):
+                draw += draw >= taken[..., column]
+        out[..., j] = draw
+    return out
+
+class _PartBank:
+    """Every question one part can ask, one per word, plus its answer arrays"""
+
+    def __init__(self, part_id, part, questions, field, pool):
+        self.part_id = part_id
+        self.title = part['title']
+        self.description = part['description']
+        self.questions = questions
+        self.field = field
+        if field is None:
+            # Own responses: options index into each question's option list
+            self.answers = None
+            self.option_count = min(len(q['options']) for q in questions) if questions else 0
+            self.correct = np.array([q['correctAnswer'] for q in questions], dtype=np.int64)
+        else:
+            self.answers = pool.pools[field].answers
+            index = {answer: i for i, answer in enumerate(self.answers)}
+            self.option_count = 1 + min(WRONG_OPTIONS, len(self.answers) - 1)
+            self.correct = np.array([index[q['options'][q['correctAnswer']]] for q in questions], dtype=np.int64)
+
+class VariantGenerator:
+    """Randomized forms of one course's test, built with NumPy index arrays.
+
+    The question builders from generate_toeic38_test_data run once, over the
+    whole vocabulary pool, to give a bank of one question per word and part.
+    A batch of variants is then a few arrays: which bank questions each form
+    asks (sampled without replacement), which wrong answers each question
+    offers (sampled from the part's deduplicated answers, never the correct
+    one) and the order of the options. Only turning the arrays into question
+    dicts is done per question, while the variants are streamed out.
+
+    The same seed, course and batch size give the same variants; they differ
+    from the single test create_test_data builds.
+    """
+
+    def __init__(self, vocabulary_data, course_id=DEFAULT_COURSE_ID, topic=TOEIC38_TOPIC, seed=None,
+                 questions_per_part=QUESTIONS_PER_PART):
+        if np is None:
+            raise RuntimeError("Generating test variants needs NumPy: pip install numpy")
+        self.course_id = course_id
+        self.questions_per_part = questions_per_part
+        base = create_test_data(vocabulary_data, course_id, topic, seed=seed)
+        self.header = {key: value for key, value in base.items() if key != 'parts'}
+
+        pool = VocabularyPool.seeded(vocabulary_data, seed, course_id)
+        self.banks = []
+        for part_id, (builder, field) in PART_BUILDERS.items():
+            questions = builder(vocabulary_data, pool, count=len(pool))
+            self.banks.append(_PartBank(part_id, base['parts'][part_id], questions, field, pool))
+        self.rng = np.random.default_rng(numpy_seed(seed, course_id))
+
+    def _draw_part(self, bank, n):
+        """Index arrays for one part of n variants: (picks, options, correct position)"""
+        asked = min(self.questions_per_part, len(bank.questions))
+        picks = distinct_draws(self.rng, (n,), len(bank.questions), asked)
+        correct = bank.correct[picks]
+        width = bank.option_count
+
+        if bank.answers is None:
+            options = np.broadcast_to(np.arange(width), (n, asked, width))
+        else:
+            # Wrong answers from the pool minus the correct one, shifted past it
+            wrong = distinct_draws(self.rng, (n, asked), len(bank.answers) - 1, width - 1)
+            wrong += wrong >= correct[..., None]
+            options = np.concatenate([correct[..., None], wrong], axis=-1)
+
+        order = np.argsort(self.rng.random((n, asked, width)), axis=-1)
+        options = np.take_along_axis(options, order, axis=-1)
+        if bank.answers is None:
+            position = np.argmax(options == correct[..., None], axis=-1)
+        else:
+            # The correct answer was put in column 0 before shuffling
+            position = np.argmax(order == 0, axis=-1)
+        return picks.tolist(), options.tolist(), position.tolist()
+
+    def iter_variants(self, count, batch_size=DEFAULT_BATCH_SIZE):
+        """Yield `count` test forms as dicts shaped like create_test_data's output"""
+        number = 0
+        while number < count:
+            n = min(batch_size, count - number)
+            drawn = [(bank, *self._draw_part(bank, n)) for bank in self.banks]
+            for row in range(n):
+                parts = {}
+                for bank, picks, options, positions in drawn:
+                    questions = []
+                    for pick, option_row, position in zip(picks[row], options[row], positions[row]):
+                        question = dict(bank.questions[pick])
+                        source = bank.answers if bank.answers is not None else question['options']
+                        question['options'] = [source[i] for i in option_row]
+                        question['correctAnswer'] = position
+                        questions.append(question)
+                    parts[bank.part_id] = {'title': bank.title, 'description': bank.description,
+                                           'questions': questions}
+                yield dict(self.header, variantId=f"{self.course_id}_variant_{number + 1}",
+                           variant=number + 1, parts=parts)
+                number += 1
+
+def write_variants(path, variants):
+    """Write variants as JSON Lines, one form per line; return how many were written"""
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for variant in variants:
+            f.write(json.dumps(variant, ensure_ascii=False, separators=(",", ":")) + "\n")
+            written += 1
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate randomized test forms (variants) per course")
+    parser.add_argument("courses", nargs="*", default=[DEFAULT_COURSE_ID],
+                        help=f"Course IDs to build variants for (default: {DEFAULT_COURSE_ID})")
+    parser.add_argument("--all", action="store_true", help="Build variants for every course with vocabulary")
+    parser.add_argument("--variants", type=int, default=100, help="Test forms per course")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (same seed gives the same variants)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Variants drawn per vectorized pass (part of what the seed reproduces)")
+    parser.add_argument("--output-dir", default=".", help="Where the <courseId>_variants.jsonl files are written")
+    args = parser.parse_args()
+
+    if np is None:
+        print("Generating test variants needs NumPy. Install it with: pip install numpy")
+        sys.exit(1)
+
+    if args.courses == [DEFAULT_COURSE_ID] and not args.all:
+        courses = {DEFAULT_COURSE_ID: {'topic': TOEIC38_TOPIC, 'lessons': load_vocabulary_data()}}
+    else:
+        courses = load_course_vocabularies(None if args.all else args.courses)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    for course_id, course in courses.items():
+        start = time.perf_counter()
+        generator = VariantGenerator(course['lessons'], course_id, course['topic'], seed=args.seed)
+        path = os.path.join(args.output_dir, f"{course_id}_variants.jsonl")
+        written = write_variants(path, generator.iter_variants(args.variants, args.batch_size))
+        elapsed = time.perf_counter() - start
+        print(f"{course_id}: {written} variants written to {path} in {elapsed:.2f}s "
+              f"({written / elapsed if elapsed > 0 else 0:.0f} variants/sec)")
+
+if __name__ == "__main__":
+    main()
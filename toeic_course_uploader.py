@@ -1,326 +1,499 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
-import json
-import re
-import random
-from datetime import datetime
-
-# Initialize Firebase
-def initialize_firebase():
-    cred = credentials.Certificate("scripts/firebase_config.json")
-    firebase_admin.initialize_app(cred)
-    db = firestore.client()
-    return db
-
-# Parse TOEIC dataset
-def parse_toeic_dataset(file_path):
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
-    
-    # Split content by topics
-    topics = re.split(r'TOPIC \d+: |TOEIC \d+: ', content)[1:]
-    topic_names = re.findall(r'(TOPIC \d+: |TOEIC \d+: )([^\n]+)', content)
-    topic_names = [name[1].strip() for name in topic_names]
-    
-    topic_data = []
-    for i, topic in enumerate(topics):
-        # Extract vocabulary items
-        vocab_items = []
-        lines = topic.strip().split('\n')
-        
-        j = 0
-        while j < len(lines):
-            line = lines[j].strip()
-            if not line:
-                j += 1
-                continue
-            
-            # Check if this line contains a vocabulary word
-            if re.match(r'^[a-zA-Z]', line) and "=" not in line and ":" not in line:
-                word = line.strip()
-                
-                # Skip empty lines
-                while j+1 < len(lines) and not lines[j+1].strip():
-                    j += 1
-                
-                # Next line should be part of speech or meaning
-                j += 1
-                meaning = ""
-                example = ""
-                
-                # Collect meaning and examples
-                while j < len(lines) and (not re.match(r'^[a-zA-Z]', lines[j].strip()) or "=" in lines[j] or ":" in lines[j] or lines[j].strip() == ""):
-                    if lines[j].strip():
-                        if "(v)" in lines[j] or "(n)" in lines[j] or "(adj)" in lines[j]:
-                            meaning = lines[j].strip()
-                        elif "Ex:" in lines[j]:
-                            example = lines[j].replace("Ex:", "").strip()
-                        elif example == "" and "(" not in lines[j] and meaning != "":
-                            example = lines[j].strip()
-                    j += 1
-                    if j < len(lines) and re.match(r'^[a-zA-Z]', lines[j].strip()) and "=" not in lines[j] and ":" not in lines[j]:
-                        break
-                
-                # Add vocabulary item
-                if word and meaning:
-                    vocab_items.append({
-                        "english": word,
-                        "vietnamese": meaning,
-                        "example": example
-                    })
-                
-                j -= 1  # Go back one line to not skip the next word
-            j += 1
-        
-        topic_data.append({
-            "name": topic_names[i] if i < len(topic_names) else f"TOEIC Topic {i+1}",
-            "vocabulary": vocab_items
-        })
-    
-    return topic_data
-
-# Create lessons from vocabulary (5 words per lesson)
-def create_lessons(topic_data):
-    all_courses = []
-    
-    for topic_idx, topic in enumerate(topic_data):
-        course_id = f"toeic{topic_idx+1}"
-        course_name = topic['name']
-        
-        # Create lessons (5 words per lesson)
-        lessons = []
-        vocab = topic['vocabulary']
-        
-        for i in range(0, len(vocab), 5):
-            lesson_vocab = vocab[i:i+5]
-            lesson_number = i // 5 + 1
-            
-            lesson = {
-                "lessonId": f"{course_id}_lesson_{lesson_number}",
-                "lessonNumber": lesson_number,
-                "title": f"{course_name} - Lesson {lesson_number}",
-                "description": f"Learn 5 essential TOEIC vocabulary words for {course_name}",
-                "duration": "15:00",
-                "isLocked": False,
-                "courseId": course_id,
-                "videoUrl": f"https://www.youtube.com/watch?v=example{topic_idx+1}_{lesson_number}",
-                "vocabulary": lesson_vocab,
-                "vocabulary_count": len(lesson_vocab)
-            }
-            
-            lessons.append(lesson)
-        
-        # Create course
-        course = {
-            "courseId": course_id,
-            "title": f"TOEIC {topic_idx+1}: {course_name}",
-            "description": f"Master essential vocabulary for {course_name} in this comprehensive TOEIC course.",
-            "category": "TOEIC Vocabulary",
-            "imageUrl": f"https://example.com/images/toeic_{topic_idx+1}.jpg",
-            "duration": f"{len(lessons) * 15} minutes",
-            "instructor": "Amanda Peterson",
-            "language": "English",
-            "level": "Beginner to Intermediate",
-            "lastUpdated": datetime.now().strftime("%B %Y"),
-            "favoriteCount": random.randint(200, 500),
-            "lessons": lessons
-        }
-        
-        all_courses.append(course)
-    
-    return all_courses
-
-# Create test questions for vocabulary
-def create_test_questions(courses):
-    all_tests = []
-    
-    for course in courses:
-        course_id = course["courseId"]
-        test_id = f"{course_id}_test"
-        
-        listening_questions = []
-        reading_questions = []
-        speaking_questions = []
-        writing_questions = []
-        
-        # Collect all vocabulary from all lessons
-        all_vocab = []
-        for lesson in course["lessons"]:
-            all_vocab.extend(lesson["vocabulary"])
-        
-        # Create listening questions
-        for vocab in all_vocab:
-            english_word = vocab["english"]
-            vietnamese_meaning = vocab["vietnamese"]
-            
-            # Multiple choice listening question
-            options = [vocab["vietnamese"]]
-            # Add wrong options from other vocabulary
-            wrong_options = [v["vietnamese"] for v in all_vocab if v != vocab]
-            random.shuffle(wrong_options)
-            options.extend(wrong_options[:3])
-            random.shuffle(options)
-            
-            question = {
-                "questionId": f"listening_{english_word.replace(' ', '_')}",
-                "questionText": f"Listen and choose the correct meaning for: {english_word}",
-                "audioUrl": f"https://example.com/audio/{english_word.replace(' ', '_')}.mp3",
-                "options": options,
-                "correctAnswer": vietnamese_meaning,
-                "explanation": f"The word '{english_word}' means '{vietnamese_meaning}' in Vietnamese."
-            }
-            
-            listening_questions.append(question)
-        
-        # Create reading questions
-        for vocab in all_vocab:
-            english_word = vocab["english"]
-            vietnamese_meaning = vocab["vietnamese"]
-            example = vocab["example"] if vocab["example"] else f"This is an example with the word {english_word}."
-            
-            blank_example = example.replace(english_word, "_____")
-            
-            # Fill in the blank
-            options = [english_word]
-            wrong_options = [v["english"] for v in all_vocab if v != vocab]
-            random.shuffle(wrong_options)
-            options.extend(wrong_options[:3])
-            random.shuffle(options)
-            
-            question = {
-                "questionId": f"reading_{english_word.replace(' ', '_')}",
-                "questionText": f"Choose the correct word to complete the sentence: {blank_example}",
-                "options": options,
-                "correctAnswer": english_word,
-                "explanation": f"The correct word is '{english_word}', which means '{vietnamese_meaning}' in Vietnamese."
-            }
-            
-            reading_questions.append(question)
-        
-        # Create speaking questions
-        for vocab in all_vocab:
-            english_word = vocab["english"]
-            
-            question = {
-                "questionId": f"speaking_{english_word.replace(' ', '_')}",
-                "questionText": f"Pronounce the word: {english_word}",
-                "wordToSpeak": english_word,
-                "audioUrlReference": f"https://example.com/audio/{english_word.replace(' ', '_')}_reference.mp3",
-                "explanation": f"Practice pronouncing '{english_word}' correctly."
-            }
-            
-            speaking_questions.append(question)
-        
-        # Create writing questions
-        for vocab in all_vocab:
-            english_word = vocab["english"]
-            vietnamese_meaning = vocab["vietnamese"]
-            
-            question = {
-                "questionId": f"writing_{english_word.replace(' ', '_')}",
-                "questionText": f"Write the English word for: {vietnamese_meaning}",
-                "correctAnswer": english_word,
-                "explanation": f"The English word for '{vietnamese_meaning}' is '{english_word}'."
-            }
-            
-            writing_questions.append(question)
-        
-        # Create complete test
-        test = {
-            "testId": test_id,
-            "courseId": course_id,
-            "title": f"Test for {course['title']}",
-            "description": f"Comprehensive test covering vocabulary from {course['title']}",
-            "duration": "30:00",
-            "passScore": 70,
-            "questions": {
-                "listening": listening_questions,
-                "reading": reading_questions,
-                "speaking": speaking_questions,
-                "writing": writing_questions
-            }
-        }
-        
-        all_tests.append(test)
-    
-    return all_tests
-
-# Upload courses and tests to Firebase
-def upload_to_firebase(db, courses, tests):
-    # Upload courses
-    for course in courses:
-        course_ref = db.collection("Courses").document(course["courseId"])
-        
-        # Create a copy of course without lessons for the main document
-        course_data = course.copy()
-        lessons = course_data.pop("lessons")
-        
-        # Upload course document
-        course_ref.set(course_data)
-        print(f"Uploaded course: {course['courseId']}")
-        
-        # Upload lessons as subcollection
-        for lesson in lessons:
-            lesson_data = lesson.copy()
-            vocabulary = lesson_data.pop("vocabulary")
-            
-            # Upload lesson document
-            lesson_ref = course_ref.collection("Lessons").document(lesson["lessonId"])
-            lesson_ref.set(lesson_data)
-            print(f"Uploaded lesson: {lesson['lessonId']}")
-            
-            # Store vocabulary in the lesson document field instead of subcollection
-            # This avoids the need for a subcollection inside another subcollection
-            vocab_field = []
-            for vocab in vocabulary:
-                vocab_id = f"{vocab['english'].replace(' ', '_')}"
-                vocab_item = vocab.copy()
-                vocab_item["id"] = vocab_id
-                vocab_field.append(vocab_item)
-            
-            # Update the lesson document with vocabulary array
-            lesson_ref.update({
-                "vocabularyItems": vocab_field
-            })
-            print(f"Added {len(vocabulary)} vocabulary items to lesson: {lesson['lessonId']}")
-    
-    # Upload tests
-    for test in tests:
-        test_ref = db.collection("Tests").document(test["testId"])
-        
-        # Store questions directly in the test document
-        test_ref.set(test)
-        print(f"Uploaded test: {test['testId']}")
-
-def main():
-    # Path to the dataset file
-    dataset_file = "c:\\Users\\ADMIN\\Downloads\\dataset for english app.txt"
-    
-    # Check if file exists
-    if not os.path.isfile(dataset_file):
-        print(f"Dataset file not found: {dataset_file}")
-        return
-    
-    print("Initializing Firebase...")
-    db = initialize_firebase()
-    
-    print("Parsing TOEIC dataset...")
-    topic_data = parse_toeic_dataset(dataset_file)
-    print(f"Found {len(topic_data)} topics with vocabulary")
-    
-    print("Creating courses and lessons...")
-    courses = create_lessons(topic_data)
-    print(f"Created {len(courses)} courses")
-    
-    print("Creating test questions...")
-    tests = create_test_questions(courses)
-    print(f"Created {len(tests)} tests")
-    
-    print("Uploading to Firebase...")
-    upload_to_firebase(db, courses, tests)
-    
-    print("Done!")
-
-if __name__ == "__main__":
+import os
+import json
+import re
+import sys
+import random
+import argparse
+import contextlib
+import itertools
+from collections import deque
+from datetime import datetime
+from firestore_backend import connect, server_timestamp_sentinel
+from firestore_batch_writer import BatchWriter, DEFAULT_MAX_WORKERS, UPDATED_AT_FIELD
+from distractor_pool import DistractorPool
+from course_pool import (course_seed, ordered_map, stream_json_array, buffered, DEFAULT_GENERATION_WORKERS,
+                         DEFAULT_QUEUE_SIZE)
+from sync_manifest import SyncManifest, DEFAULT_MANIFEST_FILE
+from test_sharding import shard_test, CHUNKS_COLLECTION
+
+DEFAULT_DATASET_FILE = "c:\\Users\\ADMIN\\Downloads\\dataset for english app.txt"
+
+# Seed used for test generation in incremental mode, so unchanged courses produce unchanged tests
+DEFAULT_SYNC_SEED = 0
+
+# Initialize Firebase
+def initialize_firebase():
+    return connect(["scripts/firebase_config.json"])
+
+# Precompiled patterns for the dataset tokenizer
+TOPIC_MARKER = re.compile(r'TOPIC \d+: |TOEIC \d+: ')
+WORD_START = re.compile(r'[a-zA-Z]')
+MEANING_TAGS = ("(v)", "(n)", "(adj)")
+
+class _TopicBuilder:
+    """State machine that collects the vocabulary items of a single topic"""
+
+    def __init__(self, name):
+        self.topic = {"name": name, "vocabulary": []}
+        self.word = None
+        self.meaning = ""
+        self.example = ""
+
+    def add_line(self, line):
+        line = line.strip()
+        if not line:
+            return
+        
+        # A line starting with a letter and without "=" or ":" starts a new word
+        if WORD_START.match(line) and "=" not in line and ":" not in line:
+            self._finish_word()
+            self.word = line
+            self.meaning = ""
+            self.example = ""
+        elif self.word is not None:
+            # Lines after the word hold its part of speech/meaning and example
+            if any(tag in line for tag in MEANING_TAGS):
+                self.meaning = line
+            elif "Ex:" in line:
+                self.example = line.replace("Ex:", "").strip()
+            elif self.example == "" and "(" not in line and self.meaning != "":
+                self.example = line
+
+    def _finish_word(self):
+        if self.word and self.meaning:
+            self.topic["vocabulary"].append({
+                "english": self.word,
+                "vietnamese": self.meaning,
+                "example": self.example
+            })
+        self.word = None
+
+    def finish(self):
+        self._finish_word()
+        return self.topic
+
+def _open_dataset(file_path):
+    # "-" reads the dataset from stdin
+    if file_path == "-":
+        return contextlib.nullcontext(sys.stdin)
+    return open(file_path, 'r', encoding='utf-8')
+
+# Stream topics from one or more TOEIC dataset files
+def iter_toeic_topics(file_paths):
+    """Yield one {"name", "vocabulary"} topic at a time.
+
+    Files are read line by line, so memory use is bounded by the largest
+    topic rather than the size of the dataset. `file_paths` may be a single
+    path or a list of paths; "-" stands for stdin.
+    """
+    if isinstance(file_paths, str):
+        file_paths = [file_paths]
+    
+    topic_count = 0
+    for file_path in file_paths:
+        with _open_dataset(file_path) as file:
+            builder = None  # Text before the first topic marker is ignored
+            for line in file:
+                # A marker may appear anywhere in a line; the text after it is the topic name
+                segments = TOPIC_MARKER.split(line)
+                for index, segment in enumerate(segments):
+                    if index > 0:
+                        if builder is not None:
+                            yield builder.finish()
+                        topic_count += 1
+                        builder = _TopicBuilder(segment.strip() or f"TOEIC Topic {topic_count}")
+                    if builder is not None:
+                        builder.add_line(segment)
+            
+            if builder is not None:
+                yield builder.finish()
+
+# Parse TOEIC dataset
+def parse_toeic_dataset(file_path):
+    return list(iter_toeic_topics(file_path))
+
+def iter_courses(topic_data):
+    """Yield one course, with its lessons, per topic as the topics arrive"""
+    for topic_idx, topic in enumerate(topic_data):
+        course_id = f"toeic{topic_idx+1}"
+        course_name = topic['name']
+        
+        # Create lessons (5 words per lesson)
+        lessons = []
+        vocab = topic['vocabulary']
+        
+        for i in range(0, len(vocab), 5):
+            lesson_vocab = vocab[i:i+5]
+            lesson_number = i // 5 + 1
+            
+            lesson = {
+                "lessonId": f"{course_id}_lesson_{lesson_number}",
+                "lessonNumber": lesson_number,
+                "title": f"{course_name} - Lesson {lesson_number}",
+                "description": f"Learn 5 essential TOEIC vocabulary words for {course_name}",
+                "duration": "15:00",
+                "isLocked": False,
+                "courseId": course_id,
+                "videoUrl": f"https://www.youtube.com/watch?v=example{topic_idx+1}_{lesson_number}",
+                "vocabulary": lesson_vocab,
+                "vocabulary_count": len(lesson_vocab)
+            }
+            
+            lessons.append(lesson)
+        
+        # Create course
+        course = {
+            "courseId": course_id,
+            "title": f"TOEIC {topic_idx+1}: {course_name}",
+            "description": f"Master essential vocabulary for {course_name} in this comprehensive TOEIC course.",
+            "category": "TOEIC Vocabulary",
+            "imageUrl": f"https://example.com/images/toeic_{topic_idx+1}.jpg",
+            "duration": f"{len(lessons) * 15} minutes",
+            "instructor": "Amanda Peterson",
+            "language": "English",
+            "level": "Beginner to Intermediate",
+            "lastUpdated": datetime.now().strftime("%B %Y"),
+            # Seeded by the course ID so the value is stable between runs
+            "favoriteCount": random.Random(course_id).randint(200, 500),
+            "lessons": lessons
+        }
+        
+        yield course
+
+# Create the test for one course's vocabulary
+def create_course_test(course, rng):
+    """Build the test of one course, drawing every random choice from `rng`.
+
+    Wrong options come from per-course DistractorPools, so generation is
+    linear in the number of words.
+    """
+    course_id = course["courseId"]
+    test_id = f"{course_id}_test"
+    
+    listening_questions = []
+    reading_questions = []
+    speaking_questions = []
+    writing_questions = []
+    
+    # Collect all vocabulary from all lessons
+    all_vocab = []
+    for lesson in course["lessons"]:
+        all_vocab.extend(lesson["vocabulary"])
+    
+    # Candidate answers are collected once per course
+    meaning_pool = DistractorPool([v["vietnamese"] for v in all_vocab], rng)
+    word_pool = DistractorPool([v["english"] for v in all_vocab], rng)
+    
+    # Create listening questions
+    for vocab in all_vocab:
+        english_word = vocab["english"]
+        vietnamese_meaning = vocab["vietnamese"]
+        
+        # Multiple choice listening question
+        options = [vocab["vietnamese"]]
+        # Add wrong options from other vocabulary
+        options.extend(meaning_pool.sample(vietnamese_meaning, 3))
+        rng.shuffle(options)
+        
+        question = {
+            "questionId": f"listening_{english_word.replace(' ', '_')}",
+            "questionText": f"Listen and choose the correct meaning for: {english_word}",
+            "audioUrl": f"https://example.com/audio/{english_word.replace(' ', '_')}.mp3",
+            "options": options,
+            "correctAnswer": vietnamese_meaning,
+            "explanation": f"The word '{english_word}' means '{vietnamese_meaning}' in Vietnamese."
+        }
+        
+        listening_questions.append(question)
+    
+    # Create reading questions
+    for vocab in all_vocab:
+        english_word = vocab["english"]
+        vietnamese_meaning = vocab["vietnamese"]
+        example = vocab["example"] if vocab["example"] else f"This is an example with the word {english_word}."
+        
+        blank_example = example.replace(english_word, "_____")
+        
+        # Fill in the blank
+        options = [english_word]
+        options.extend(word_pool.sample(english_word, 3))
+        rng.shuffle(options)
+        
+        question = {
+            "questionId": f"reading_{english_word.replace(' ', '_')}",
+            "questionText": f"Choose the correct word to complete the sentence: {blank_example}",
+            "options": options,
+            "correctAnswer": english_word,
+            "explanation": f"The correct word is '{english_word}', which means '{vietnamese_meaning}' in Vietnamese."
+        }
+        
+        reading_questions.append(question)
+    
+    # Create speaking questions
+    for vocab in all_vocab:
+        english_word = vocab["english"]
+        
+        question = {
+            "questionId": f"speaking_{english_word.replace(' ', '_')}",
+            "questionText": f"Pronounce the word: {english_word}",
+            "wordToSpeak": english_word,
+            "audioUrlReference": f"https://example.com/audio/{english_word.replace(' ', '_')}_reference.mp3",
+            "explanation": f"Practice pronouncing '{english_word}' correctly."
+        }
+        
+        speaking_questions.append(question)
+    
+    # Create writing questions
+    for vocab in all_vocab:
+        english_word = vocab["english"]
+        vietnamese_meaning = vocab["vietnamese"]
+        
+        question = {
+            "questionId": f"writing_{english_word.replace(' ', '_')}",
+            "questionText": f"Write the English word for: {vietnamese_meaning}",
+            "correctAnswer": english_word,
+            "explanation": f"The English word for '{vietnamese_meaning}' is '{english_word}'."
+        }
+        
+        writing_questions.append(question)
+    
+    # Create complete test
+    test = {
+        "testId": test_id,
+        "courseId": course_id,
+        "title": f"Test for {course['title']}",
+        "description": f"Comprehensive test covering vocabulary from {course['title']}",
+        "duration": "30:00",
+        "passScore": 70,
+        "questions": {
+            "listening": listening_questions,
+            "reading": reading_questions,
+            "speaking": speaking_questions,
+            "writing": writing_questions
+        }
+    }
+    
+    return test
+
+def _course_test_task(task):
+    # Module-level so it can run on a process pool
+    course, seed = task
+    return create_course_test(course, random.Random(course_seed(seed, course["courseId"])))
+
+# Create test questions for vocabulary
+def create_test_questions(courses, seed=None):
+    """Build one test per course.
+
+    Passing a seed makes the output repeatable; each course then gets its
+    own generator, so a course's test only changes when that course changes.
+    """
+    rng = random.Random(seed)
+    all_tests = []
+    
+    for course in courses:
+        if seed is not None:
+            all_tests.append(_course_test_task((course, seed)))
+        else:
+            all_tests.append(create_course_test(course, rng))
+    
+    return all_tests
+
+def iter_course_tests(courses, seed, max_workers=DEFAULT_GENERATION_WORKERS):
+    """Yield (course, test) for every course, generating the tests on a process pool.
+
+    Courses are pulled from `courses` only as generation slots free up, so
+    this works on an unbounded stream of courses.
+    """
+    waiting = deque()
+    
+    def tasks():
+        for course in courses:
+            waiting.append(course)
+            yield course, seed
+    
+    for test in ordered_map(_course_test_task, tasks(), max_workers):
+        yield waiting.popleft(), test
+
+# Build the lesson document with its vocabulary merged in, so each lesson is a single write
+def build_lesson_document(lesson):
+    lesson_data = lesson.copy()
+    vocabulary = lesson_data.pop("vocabulary")
+    
+    # Store vocabulary in the lesson document field instead of subcollection
+    # This avoids the need for a subcollection inside another subcollection
+    vocab_field = []
+    for vocab in vocabulary:
+        vocab_id = f"{vocab['english'].replace(' ', '_')}"
+        vocab_item = vocab.copy()
+        vocab_item["id"] = vocab_id
+        vocab_field.append(vocab_item)
+    
+    lesson_data["vocabularyItems"] = vocab_field
+    return lesson_data
+
+# Upload courses and tests to Firebase
+def upload_to_firebase(db, courses, tests, bulk=True, max_workers=DEFAULT_MAX_WORKERS, manifest=None,
+                       shard_tests=True):
+    """Upload courses, lessons and tests.
+
+    In bulk mode writes are grouped into batches of up to 500 and committed
+    concurrently by up to `max_workers` threads; otherwise every document is
+    written with its own blocking set call.
+
+    With a SyncManifest only documents whose content hash changed are
+    written, and documents that disappeared from the dataset are deleted.
+
+    Tests are stored in the sharded layout from test_sharding (a small
+    header plus fixed-size question chunks) unless shard_tests is False.
+    """
+    items = itertools.chain(((course, None) for course in courses), ((None, test) for test in tests))
+    return upload_stream(db, items, bulk=bulk, max_workers=max_workers, manifest=manifest,
+                         shard_tests=shard_tests)
+
+def upload_stream(db, items, bulk=True, max_workers=DEFAULT_MAX_WORKERS, manifest=None, shard_tests=True):
+    """Upload (course, test) pairs as they arrive; either may be None.
+
+    Works like upload_to_firebase, but holds on to nothing once an item's
+    writes are queued, so it can consume a generator of any length.
+    Returns (courses, tests) uploaded.
+    """
+    writer = BatchWriter(db, max_workers=max_workers) if bulk else None
+    
+    def write(ref, data):
+        if manifest is not None and not manifest.check(ref.path, data):
+            return False
+        if writer:
+            writer.set(ref, data)
+        else:
+            ref.set(dict(data, **{UPDATED_AT_FIELD: server_timestamp_sentinel(db)}))
+        return True
+    
+    def delete(ref):
+        if writer:
+            writer.delete(ref)
+        else:
+            ref.delete()
+    
+    course_count = 0
+    test_count = 0
+    for course, test in items:
+        if course is not None:
+            upload_course(db, write, course)
+            course_count += 1
+        if test is not None:
+            upload_test(db, write, test, shard_tests)
+            test_count += 1
+    
+    removed = manifest.removed() if manifest is not None else []
+    for doc_path in removed:
+        delete(db.document(doc_path))
+        print(f"Deleted removed document: {doc_path}")
+    
+    if writer:
+        writer.close()
+        writer.print_summary()
+    
+    # Only record the new hashes once every write has succeeded
+    if manifest is not None:
+        manifest.commit()
+        manifest.print_summary(len(removed))
+    return course_count, test_count
+
+def upload_course(db, write, course):
+    course_ref = db.collection("Courses").document(course["courseId"])
+    
+    # Create a copy of course without lessons for the main document
+    course_data = course.copy()
+    lessons = course_data.pop("lessons")
+    
+    # Upload course document
+    if write(course_ref, course_data):
+        print(f"Uploaded course: {course['courseId']}")
+    
+    # Upload lessons as subcollection
+    lessons_written = 0
+    for lesson in lessons:
+        lesson_ref = course_ref.collection("Lessons").document(lesson["lessonId"])
+        lessons_written += write(lesson_ref, build_lesson_document(lesson))
+    if lessons_written:
+        print(f"Uploaded {lessons_written} lessons for course: {course['courseId']}")
+
+def upload_test(db, write, test, shard_tests=True):
+    test_ref = db.collection("Tests").document(test["testId"])
+    
+    if not shard_tests:
+        # Store questions directly in the test document
+        if write(test_ref, test):
+            print(f"Uploaded test: {test['testId']}")
+        return
+    
+    # Small header document plus one document per chunk of questions
+    header, chunks = shard_test(test)
+    written = write(test_ref, header)
+    for chunk_id, chunk in chunks:
+        written += write(test_ref.collection(CHUNKS_COLLECTION).document(chunk_id), chunk)
+    if written:
+        print(f"Uploaded test: {test['testId']} ({written} of {len(chunks) + 1} documents)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse the TOEIC dataset and upload courses and tests to Firebase")
+    parser.add_argument("datasets", nargs="*", default=[DEFAULT_DATASET_FILE],
+                        help="TOEIC vocabulary dataset files, or - to read from stdin")
+    parser.add_argument("--sequential", action="store_true",
+                        help="Write documents one at a time instead of in concurrent batches")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="Maximum number of batch commits running at the same time")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Random seed for test generation (same seed gives the same tests)")
+    parser.add_argument("--gen-workers", type=int, default=DEFAULT_GENERATION_WORKERS,
+                        help="Processes generating tests in parallel (the tests don't depend on it)")
+    parser.add_argument("--save-tests",
+                        help="Also write the generated tests to this JSON file as they are created")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="Topics/courses each pipeline stage may run ahead of the next")
+    parser.add_argument("--single-document-tests", action="store_true",
+                        help="Store each test with all of its questions in one document instead of sharding it")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only write documents that were added, changed or removed since the last sync")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_FILE,
+                        help="Content-hash manifest used by --incremental")
+    args = parser.parse_args()
+    
+    # Incremental sync needs repeatable tests to detect unchanged ones
+    if args.incremental and args.seed is None:
+        args.seed = DEFAULT_SYNC_SEED
+    
+    # Check if the dataset files exist
+    for dataset_file in args.datasets:
+        if dataset_file != "-" and not os.path.isfile(dataset_file):
+            print(f"Dataset file not found: {dataset_file}")
+            return
+    
+    print("Initializing Firebase...")
+    db = initialize_firebase()
+    
+    if args.seed is None:
+        args.seed = random.randrange(2**32)
+        print(f"Test generation seed: {args.seed} (pass --seed {args.seed} to get the same tests again)")
+    
+    # parse -> build courses -> generate tests -> upload, each stage on its own
+    # thread with a bounded queue in between, so course 1 is uploaded while
+    # later topics are still being parsed and memory doesn't grow with the dataset
+    print("Parsing, building and uploading courses and tests...")
+    topics = buffered(iter_toeic_topics(args.datasets), args.queue_size, name="parse")
+    courses = buffered(iter_courses(topics), args.queue_size, name="lessons")
+    course_tests = iter_course_tests(courses, args.seed, max_workers=args.gen_workers)
+    if args.save_tests:
+        course_tests = stream_json_array(args.save_tests, course_tests, key=lambda pair: pair[1])
+    course_tests = buffered(course_tests, args.queue_size, name="tests")
+    
+    manifest = SyncManifest(args.manifest) if args.incremental else None
+    course_count, test_count = upload_stream(db, course_tests, bulk=not args.sequential,
+                                             max_workers=args.workers, manifest=manifest,
+                                             shard_tests=not args.single_document_tests)
+    
+    print(f"Uploaded {course_count} courses and {test_count} tests")
+    print("Done!")
+
+if __name__ == "__main__":
     main() 
\ No newline at end of file
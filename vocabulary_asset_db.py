@@ -0,0 +1,163 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+from generate_toeic38_test_data import load_course_vocabularies
+
+DEFAULT_DATABASE_FILE = "vocabulary.db"
+# Asset holding the database version, so the app can tell when to copy a new database
+VERSION_SUFFIX = ".version"
+
+SCHEMA = """
+CREATE TABLE android_metadata (locale TEXT);
+CREATE TABLE courses (
+    course_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL
+);
+-- Words point at their lesson by integer key, which keeps rows and indexes
+-- small; look lessons up by (course_id, lesson_id) and join. Lesson IDs are
+-- only unique within a course
+CREATE TABLE lessons (
+    _id INTEGER PRIMARY KEY,
+    course_id TEXT NOT NULL,
+    lesson_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    lesson_number INTEGER NOT NULL,
+    UNIQUE (course_id, lesson_id)
+);
+CREATE TABLE vocabulary (
+    _id INTEGER PRIMARY KEY,
+    lesson_key INTEGER NOT NULL REFERENCES lessons (_id),
+    position INTEGER NOT NULL,
+    english TEXT NOT NULL,
+    vietnamese TEXT NOT NULL,
+    phonetic TEXT NOT NULL DEFAULT '',
+    example TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX lessons_course ON lessons (course_id, lesson_number);
+CREATE INDEX vocabulary_lesson ON vocabulary (lesson_key, position);
+-- FTS4 rather than FTS5: the SQLite bundled with Android only has FTS3/FTS4.
+-- External content, so the words are stored once; docid = vocabulary._id
+CREATE VIRTUAL TABLE vocabulary_fts USING fts4(content="vocabulary", english, vietnamese, tokenize=unicode61);
+"""
+
+def clean_vocabulary_item(item):
+    """(english, vietnamese, phonetic, example) with whitespace stripped, or None without both words"""
+    english = (item.get("english") or "").strip()
+    vietnamese = (item.get("vietnamese") or "").strip()
+    if not english or not vietnamese:
+        return None
+    return english, vietnamese, (item.get("phonetic") or "").strip(), (item.get("example") or "").strip()
+
+def load_vocabulary_snapshot(path):
+    """Courses from a fetch_toeic38_vocabulary.py snapshot: {courseId: {title, lessons: {lessonId: {...}}}}"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["courses"]
+
+def load_local_courses(course_ids=None):
+    """Courses from the local vocabulary files, in the snapshot form"""
+    courses = {}
+    for course_id, course in load_course_vocabularies(course_ids).items():
+        courses[course_id] = {"title": course["topic"], "lessons": course["lessons"]}
+    return courses
+
+def database_version(path):
+    """user_version of an existing database file, or None"""
+    if not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        conn.close()
+
+def build_vocabulary_database(courses, path=DEFAULT_DATABASE_FILE):
+    """Write every course's vocabulary to one SQLite file; return (lessons, words, version).
+
+    The file is built next to `path` and moved into place when complete.
+    Its user_version (also written to path + VERSION_SUFFIX) is derived
+    from everything stored (course and lesson titles, lesson numbers and
+    words), so it only changes when the content does; an
+    existing file with the same version is left alone, so the asset is
+    not repackaged.
+    """
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    digest = hashlib.sha256()
+    lesson_count = word_count = 0
+
+    conn = sqlite3.connect(tmp_path)
+    built = False
+    try:
+        conn.executescript(SCHEMA)
+        conn.execute("INSERT INTO android_metadata VALUES ('en_US')")
+        for course_id, course in sorted(courses.items()):
+            course_title = course.get("title") or course_id
+            conn.execute("INSERT INTO courses VALUES (?, ?)", (course_id, course_title))
+            lessons = sorted(course["lessons"].items(),
+                             key=lambda pair: pair[1].get("lessonNumber") or 0)
+            for number, (lesson_id, lesson) in enumerate(lessons, 1):
+                title = lesson.get("title") or lesson_id
+                lesson_number = lesson.get("lessonNumber") or number
+                lesson_key = conn.execute("INSERT INTO lessons (lesson_id, course_id, title, lesson_number) "
+                                          "VALUES (?, ?, ?, ?)",
+                                          (lesson_id, course_id, title, lesson_number)).lastrowid
+                words = [word for word in map(clean_vocabulary_item, lesson.get("vocabulary", [])) if word]
+                conn.executemany("INSERT INTO vocabulary (lesson_key, position, english, vietnamese, phonetic, example) "
+                                 "VALUES (?, ?, ?, ?, ?, ?)",
+                                 [(lesson_key, position) + word for position, word in enumerate(words)])
+                digest.update(json.dumps([course_id, course_title, lesson_id, title, lesson_number, words],
+                                         ensure_ascii=False).encode("utf-8"))
+                lesson_count += 1
+                word_count += len(words)
+        conn.execute("INSERT INTO vocabulary_fts (vocabulary_fts) VALUES ('rebuild')")
+        conn.execute("INSERT INTO vocabulary_fts (vocabulary_fts) VALUES ('optimize')")
+        version = int.from_bytes(digest.digest()[:4], "big") & 0x7FFFFFFF
+        conn.execute(f"PRAGMA user_version = {version}")
+        conn.commit()
+        conn.execute("VACUUM")
+        built = True
+    finally:
+        conn.close()
+        if not built:
+            os.remove(tmp_path)
+
+    if database_version(path) == version:
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, path)
+    version_path = path + VERSION_SUFFIX
+    current = None
+    if os.path.exists(version_path):
+        with open(version_path, "r", encoding="utf-8") as f:
+            current = f.read().strip()
+    if current != str(version):
+        with open(version_path, "w", encoding="utf-8") as f:
+            f.write(str(version))
+    return lesson_count, word_count, version
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the SQLite vocabulary database for the Android app")
+    parser.add_argument("courses", nargs="*", help="Course IDs to include (default: all)")
+    parser.add_argument("--snapshot", default=None,
+                        help="Vocabulary snapshot from fetch_toeic38_vocabulary.py (default: local vocabulary files)")
+    parser.add_argument("--output", default=DEFAULT_DATABASE_FILE, help="Database file to write")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        courses = load_vocabulary_snapshot(args.snapshot)
+        if args.courses:
+            courses = {course_id: courses[course_id] for course_id in args.courses if course_id in courses}
+    else:
+        courses = load_local_courses(args.courses or None)
+
+    lessons, words, version = build_vocabulary_database(courses, args.output)
+    print(f"Wrote {len(courses)} courses, {lessons} lessons, {words} words to {args.output} "
+          f"({os.path.getsize(args.output) / 1024:.0f} KB, version {version})")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
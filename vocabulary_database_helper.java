@@ -0,0 +1,165 @@
+package com.example.englishlearningapp.Utils;
+
+import android.content.Context;
+import android.database.Cursor;
+import android.database.sqlite.SQLiteDatabase;
+import android.os.Handler;
+import android.os.Looper;
+import android.util.Log;
+
+import com.example.englishlearningapp.Models.VocabularyItem;
+
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.FileOutputStream;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.InputStreamReader;
+import java.io.OutputStream;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+
+/**
+ * Read-only access to the bundled vocabulary database (assets/vocabulary.db).
+ *
+ * The asset is copied to the app's database folder the first time and again
+ * whenever assets/vocabulary.db.version holds a different version. Lessons
+ * are read through the (course_id, lesson_id) and lesson_key indexes and
+ * searches use the vocabulary_fts table. Queries run on a background thread and
+ * results are delivered on the main thread.
+ */
+public class VocabularyDatabase {
+    private static final String TAG = "VocabularyDatabase";
+    private static final String DATABASE_NAME = "vocabulary.db";
+    private static final String VERSION_ASSET = DATABASE_NAME + ".version";
+
+    public interface Callback {
+        void onLoaded(List<VocabularyItem> items);
+        void onError(Exception e);
+    }
+
+    private static VocabularyDatabase instance;
+
+    private final Context context;
+    private final ExecutorService executor = Executors.newSingleThreadExecutor();
+    private final Handler mainHandler = new Handler(Looper.getMainLooper());
+    private SQLiteDatabase database;
+
+    public static synchronized VocabularyDatabase getInstance(Context context) {
+        if (instance == null) {
+            instance = new VocabularyDatabase(context.getApplicationContext());
+        }
+        return instance;
+    }
+
+    private VocabularyDatabase(Context context) {
+        this.context = context;
+    }
+
+    /** Vocabulary of one lesson, in lesson order (lesson IDs are only unique within a course) */
+    public void loadLesson(String courseId, String lessonId, Callback callback) {
+        query("SELECT v.english, v.vietnamese, v.phonetic FROM lessons l "
+              + "JOIN vocabulary v ON v.lesson_key = l._id "
+              + "WHERE l.course_id = ? AND l.lesson_id = ? ORDER BY v.position",
+              new String[]{courseId, lessonId}, callback);
+    }
+
+    /** Words whose English or Vietnamese text starts with `text` (accents ignored) */
+    public void search(String text, int limit, Callback callback) {
+        // Only letters and digits reach MATCH, so user input can't form FTS syntax
+        String words = text.replaceAll("[^\\p{L}\\p{N}]+", " ").trim();
+        if (words.isEmpty()) {
+            mainHandler.post(() -> callback.onLoaded(new ArrayList<>()));
+            return;
+        }
+        String match = words + "*";
+        query("SELECT v.english, v.vietnamese, v.phonetic FROM vocabulary_fts "
+              + "JOIN vocabulary v ON v._id = vocabulary_fts.docid "
+              + "WHERE vocabulary_fts MATCH ? LIMIT " + limit,
+              new String[]{match}, callback);
+    }
+
+    private void query(String sql, String[] args, Callback callback) {
+        executor.execute(() -> {
+            List<VocabularyItem> items = new ArrayList<>();
+            try (Cursor cursor = open().rawQuery(sql, args)) {
+                while (cursor.moveToNext()) {
+                    items.add(new VocabularyItem(cursor.getString(0), cursor.getString(1), cursor.getString(2)));
+                }
+                mainHandler.post(() -> callback.onLoaded(items));
+            } catch (Exception e) {
+                Log.e(TAG, "Error querying vocabulary database: " + e.getMessage());
+                mainHandler.post(() -> callback.onError(e));
+            }
+        });
+    }
+
+    // Called on the executor thread only
+    private SQLiteDatabase open() throws IOException {
+        if (database == null) {
+            File file = context.getDatabasePath(DATABASE_NAME);
+            int assetVersion = readAssetVersion();
+            if (!file.exists() || installedVersion(file) != assetVersion) {
+                copyAsset(file);
+            }
+            database = SQLiteDatabase.openDatabase(file.getPath(), null, SQLiteDatabase.OPEN_READONLY);
+        }
+        return database;
+    }
+
+    private int readAssetVersion() throws IOException {
+        try (BufferedReader reader = new BufferedReader(
+                new InputStreamReader(context.getAssets().open(VERSION_ASSET), "UTF-8"))) {
+            return Integer.parseInt(reader.readLine().trim());
+        }
+    }
+
+    private int installedVersion(File file) {
+        try (SQLiteDatabase db = SQLiteDatabase.openDatabase(file.getPath(), null, SQLiteDatabase.OPEN_READONLY)) {
+            return db.getVersion();
+        } catch (Exception e) {
+            return -1;
+        }
+    }
+
+    private void copyAsset(File file) throws IOException {
+        file.getParentFile().mkdirs();
+        File tmp = new File(file.getPath() + ".tmp");
+        try (InputStream in = context.getAssets().open(DATABASE_NAME);
+             OutputStream out = new FileOutputStream(tmp)) {
+            byte[] buffer = new byte[64 * 1024];
+            int read;
+            while ((read = in.read(buffer)) != -1) {
+                out.write(buffer, 0, read);
+            }
+        }
+        if (!tmp.renameTo(file)) {
+            throw new IOException("Could not install " + file);
+        }
+        Log.d(TAG, "Installed vocabulary database " + file);
+    }
+}
+
+/*
+ * In VocabularyActivity, instead of loadToeic38VocabularyFromAssets():
+ *
+ *     VocabularyDatabase.getInstance(this).loadLesson(courseId, lessonId, new VocabularyDatabase.Callback() {
+ *         @Override
+ *         public void onLoaded(List<VocabularyItem> items) {
+ *             if (items.isEmpty()) {
+ *                 loadSampleVocabulary();
+ *                 return;
+ *             }
+ *             vocabularyList.clear();
+ *             vocabularyList.addAll(items);
+ *             updateVocabularyUI();
+ *         }
+ *
+ *         @Override
+ *         public void onError(Exception e) {
+ *             loadSampleVocabulary();
+ *         }
+ *     });
+ */